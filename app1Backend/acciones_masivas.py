@@ -0,0 +1,153 @@
+"""
+Acciones masivas sobre los listados (HTML y admin).
+
+Marcar cincuenta donaciones como 'Recibida', asignar un técnico a un grupo
+de reacondicionamientos o cerrar varias asignaciones como 'Entregada' era
+un UpdateView por fila. Aquí cada acción es UN UPDATE ... WHERE pk IN (...):
+
+- Validado en la misma sentencia: el WHERE incluye los estados de origen
+  permitidos (TRANSICIONES). Las filas que no cumplen se omiten y se
+  informan; las demás se actualizan igual.
+- update() no emite señales: la auditoría, el feed de cambios (y la caché
+  de la API), los eventos en vivo y el índice de facetas se informan UNA vez
+  por lote, igual que en eliminacion.py. Lo mismo el aviso al técnico: un
+  correo con todos los equipos asignados, no uno por equipo.
+"""
+import collections
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from . import auditoria, eventos, facetas
+from .archivo import ESTADOS_REACONDICIONAMIENTO_CERRADOS
+from .cambios import registrar_cambios
+from .models import Asignacion, Donacion, Reacondicionamiento, Usuario
+from .services import notificar_asignacion_tecnico
+
+Resultado = collections.namedtuple('Resultado', ['actualizados', 'omitidos'])
+
+# Estado destino -> estados de origen desde los que se puede llegar
+TRANSICIONES = {
+    Donacion: {
+        'Recibida': ['Pendiente'],
+        'Cancelada': ['Pendiente'],
+    },
+    Asignacion: {
+        'Match': ['Pendiente'],
+        'Entregada': ['Pendiente', 'Match'],
+        'Rechazada': ['Pendiente', 'Match'],
+    },
+}
+
+# Acciones que ofrece cada listado HTML: valor del <select> -> etiqueta
+ACCIONES_LISTADO = {
+    'donacion': {f'estado:{estado}': f'Marcar como {estado}' for estado in TRANSICIONES[Donacion]},
+    'asignacion': {f'estado:{estado}': f'Marcar como {estado}' for estado in TRANSICIONES[Asignacion]},
+    'reacondicionamiento': {'tecnico': 'Asignar técnico'},
+}
+MODELOS_LISTADO = {
+    'donacion': Donacion,
+    'asignacion': Asignacion,
+    'reacondicionamiento': Reacondicionamiento,
+}
+
+
+# =========================================================
+# ACTUALIZACIÓN POR LOTE
+# =========================================================
+
+def _informar(modelo, antes, valores, usuario):
+    # Lo que harían los receptores post_save, una vez por lote
+    ids = list(antes)
+    if modelo in auditoria.MODELOS_AUDITADOS.values():
+        nuevos = {columna: auditoria.serializable(valor) for columna, valor in valores.items()}
+        auditoria.registrar_lote(modelo, 'Modificacion', {
+            pk: {campo: [anteriores[campo], nuevo] for campo, nuevo in nuevos.items() if anteriores[campo] != nuevo}
+            for pk, anteriores in antes.items()
+        }, usuario)
+    registrar_cambios(modelo, ids, 'Modificacion')
+    eventos.publicar_lote(modelo, ids, 'actualizado')
+    if modelo in facetas.MODELOS_INDICE:
+        transaction.on_commit(facetas.invalidar_indice)
+
+def _actualizar(queryset, permitidos, valores, usuario):
+    """
+    UPDATE de `valores` ({attname: valor}) sobre las filas de `queryset` que
+    cumplen `permitidos`.
+    Retorna (Resultado, IDs actualizados).
+    """
+    modelo = queryset.model
+    columnas = list(valores)
+    seleccionados = set(queryset.values_list('pk', flat=True))
+    with transaction.atomic():
+        # Valores previos para la auditoría; select_for_update evita que cambien antes del UPDATE
+        antes = {
+            fila[0]: {columna: auditoria.serializable(valor) for columna, valor in zip(columnas, fila[1:])}
+            for fila in (
+                modelo._base_manager.select_for_update()
+                .filter(permitidos, pk__in=seleccionados)
+                .values_list('pk', *columnas)
+            )
+        }
+        ids = list(antes)
+        if ids:
+            # La validación (permitidos) se repite en el WHERE: la sentencia misma la garantiza
+            modelo._base_manager.filter(permitidos, pk__in=ids).update(**valores)
+            _informar(modelo, antes, valores, usuario)
+    return Resultado(len(ids), len(seleccionados) - len(ids)), ids
+
+def cambiar_estado(queryset, estado, usuario=None):
+    """Lleva a `estado` las filas cuyo estado actual lo permite (ver TRANSICIONES)."""
+    transiciones = TRANSICIONES[queryset.model]
+    if estado not in transiciones:
+        raise ValidationError(f"Estado no permitido para una acción masiva: {estado}.")
+    resultado, _ = _actualizar(queryset, Q(estado__in=transiciones[estado]), {'estado': estado}, usuario)
+    return resultado
+
+def asignar_tecnico(queryset, tecnico, usuario=None):
+    """
+    Asigna `tecnico` a los reacondicionamientos aún abiertos y le envía un
+    solo correo con todos los equipos asignados.
+    """
+    if tecnico.rol != 'Tecnico' or not tecnico.is_active:
+        raise ValidationError(f"{tecnico.get_full_name()} no es un técnico activo.")
+    # Una asignación del administrador es firme: deja de ser un reclamo de la cola que pueda liberarse
+    resultado, ids = _actualizar(
+        queryset, ~Q(estado_final__in=ESTADOS_REACONDICIONAMIENTO_CERRADOS),
+        {'id_tecnico_id': tecnico.pk, 'fecha_reclamo': None}, usuario,
+    )
+    if ids:
+        equipos = Reacondicionamiento.objects.select_related('id_equipo').filter(pk__in=ids).order_by('pk')
+        notificar_asignacion_tecnico(tecnico, [r.id_equipo for r in equipos])
+    return resultado
+
+
+# =========================================================
+# ACCIONES DE LOS LISTADOS HTML
+# =========================================================
+
+def aplicar(listado, accion, ids, tecnico_id=None, usuario=None):
+    """
+    Ejecuta la acción `accion` (clave de ACCIONES_LISTADO) del listado sobre
+    los IDs marcados. Lanza ValidationError si la acción o el técnico no son válidos.
+    """
+    if accion not in ACCIONES_LISTADO.get(listado, {}):
+        raise ValidationError("Acción no válida.")
+    queryset = MODELOS_LISTADO[listado].objects.filter(pk__in=ids)
+    if accion == 'tecnico':
+        try:
+            tecnico = Usuario.objects.filter(pk=int(tecnico_id)).first()
+        except (TypeError, ValueError):
+            tecnico = None
+        if tecnico is None:
+            raise ValidationError("Seleccione el técnico a asignar.")
+        return asignar_tecnico(queryset, tecnico, usuario)
+    return cambiar_estado(queryset, accion.split(':', 1)[1], usuario)
+
+def resumen(resultado):
+    """Mensaje para el usuario con lo actualizado y lo omitido."""
+    texto = f"{resultado.actualizados} registro(s) actualizado(s)."
+    if resultado.omitidos:
+        texto += f" {resultado.omitidos} omitido(s): su estado actual no permite la acción."
+    return texto
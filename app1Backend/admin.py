@@ -1,9 +1,154 @@
+from django import forms
 from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import (
     Institucion, Usuario, Donacion, Equipo,
-    Asignacion, DetalleAsignacion, Reacondicionamiento, Soporte
+    Asignacion, DetalleAsignacion, Reacondicionamiento, Soporte, Tarea, CertificadoEntrega
 )
 from django.contrib.auth.admin import UserAdmin
+from . import acciones_masivas, certificados
+
+# =========================================================
+# Utilidades para tablas grandes
+# =========================================================
+
+# Sobre este número de filas (según las estadísticas del motor) se muestra
+# un conteo estimado en vez de ejecutar COUNT(*) sobre toda la tabla.
+UMBRAL_CONTEO_ESTIMADO = 100_000
+
+# Máximo de opciones que muestra un filtro lateral
+LIMITE_OPCIONES_FILTRO = 50
+
+
+def conteo_estimado(modelo):
+    """
+    Filas aproximadas de la tabla según las estadísticas del motor.
+    Retorna None si el motor no las ofrece (ej: SQLite).
+    """
+    tabla = modelo._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [tabla],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [tabla])
+        else:
+            return None
+        fila = cursor.fetchone()
+    return int(fila[0]) if fila and fila[0] is not None else None
+
+
+class PaginadorConteoEstimado(Paginator):
+    """
+    Paginador del admin que evita el COUNT(*) completo en tablas grandes:
+    si el listado no tiene filtros ni búsqueda y la tabla supera el umbral,
+    usa el conteo estimado. Con filtros se cuenta normalmente.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where and not queryset.query.distinct:
+            estimado = conteo_estimado(queryset.model)
+            if estimado is not None and estimado >= UMBRAL_CONTEO_ESTIMADO:
+                return estimado
+        return super().count
+
+
+class AdminTablaGrande(admin.ModelAdmin):
+    """Base para tablas que pueden crecer mucho (cientos de miles de filas)."""
+    paginator = PaginadorConteoEstimado
+    # Evita el segundo COUNT(*) de la tabla completa cuando hay filtros activos
+    show_full_result_count = False
+
+
+class InstitucionDonanteFilter(admin.SimpleListFilter):
+    """
+    Filtro por institución donante acotado: lista solo instituciones de tipo
+    Donante/Ambas desde la tabla institucion (pequeña), sin DISTINCT sobre
+    los equipos, y filtra por la FK indexada en vez de por nombre.
+    Muestra hasta LIMITE_OPCIONES_FILTRO opciones y un buscador (nombre o RUT)
+    para llegar a las demás; avisa cuando la lista está incompleta.
+    """
+    title = 'Institución Donante'
+    parameter_name = 'donante'
+    parametro_busqueda = 'donante_buscar'
+    template = 'app1Backend/admin_filtro_busqueda.html'
+    limite = LIMITE_OPCIONES_FILTRO
+
+    def __init__(self, request, params, model, model_admin):
+        # Se retira antes que el admin lo tome como un lookup de campo
+        self.busqueda = params.pop(self.parametro_busqueda, [''])[-1].strip()
+        self.hay_mas = False
+        super().__init__(request, params, model, model_admin)
+
+    def lookups(self, request, model_admin):
+        instituciones = Institucion.objects.filter(tipo__in=['Donante', 'Ambas'])
+        if self.busqueda:
+            instituciones = instituciones.filter(Q(nombre__icontains=self.busqueda) | Q(rut__icontains=self.busqueda))
+        opciones = list(instituciones.order_by('nombre').values_list('rut', 'nombre')[:self.limite + 1])
+        self.hay_mas = len(opciones) > self.limite
+        opciones = opciones[:self.limite]
+        # La institución seleccionada se muestra aunque no esté entre las opciones
+        if self.value() and all(rut != self.value() for rut, _ in opciones):
+            opciones += list(Institucion.objects.filter(rut=self.value()).values_list('rut', 'nombre'))
+        return opciones
+
+    def has_output(self):
+        # El buscador se muestra aunque la búsqueda no encuentre instituciones
+        return True
+
+    def expected_parameters(self):
+        return [self.parameter_name, self.parametro_busqueda]
+
+    def choices(self, changelist):
+        # Parámetros actuales del listado que conserva el formulario del buscador
+        self.parametros_conservados = [
+            (nombre, valor) for nombre, valor in changelist.params.items()
+            if nombre not in (self.parameter_name, self.parametro_busqueda)
+        ]
+        return super().choices(changelist)
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(id_donacion__rut_institucion_id=self.value())
+        return queryset
+
+
+# =========================================================
+# Acciones masivas (un solo UPDATE validado, ver acciones_masivas.py)
+# =========================================================
+
+def _informar_accion(modeladmin, request, resultado):
+    nivel = messages.SUCCESS if resultado.actualizados else messages.WARNING
+    modeladmin.message_user(request, acciones_masivas.resumen(resultado), nivel)
+
+def accion_cambiar_estado(estado):
+    """Acción del admin que lleva las filas seleccionadas a `estado`, si su estado actual lo permite."""
+    def accion(modeladmin, request, queryset):
+        _informar_accion(modeladmin, request, acciones_masivas.cambiar_estado(queryset, estado, request.user))
+    # El nombre identifica la acción en el formulario del listado: debe ser único por estado
+    accion.__name__ = f'marcar_{estado.lower()}'
+    return admin.action(description=f'Marcar como {estado}')(accion)
+
+
+class AsignarTecnicoActionForm(ActionForm):
+    """Formulario de acciones con el técnico a asignar (lo usa la acción asignar_tecnico)."""
+    tecnico = forms.ModelChoiceField(
+        queryset=Usuario.objects.filter(rol='Tecnico', is_active=True).order_by('nombre', 'apellido'),
+        required=False, label='Técnico',
+    )
+
+
 # =========================================================
 # Custom ModelAdmin para cada modelo
 # =========================================================
@@ -71,27 +216,33 @@ class UsuarioAdmin(UserAdmin): # <-- CAMBIA ModelAdmin por UserAdmin
             super().delete_queryset(request, queryset)
 
 @admin.register(Donacion)
-class DonacionAdmin(admin.ModelAdmin):
+class DonacionAdmin(AdminTablaGrande):
     # Para ForeignKeys, se usa __nombre_del_campo para mostrar algo útil
     list_display = ('id_donacion', 'rut_institucion', 'fecha_oferta', 'estado', 'total_equipos')
+    # JOIN con institución en la misma consulta del listado (su __str__ muestra el nombre)
+    list_select_related = ('rut_institucion',)
     search_fields = ('rut_institucion__nombre', 'rut_institucion__rut', 'id_donacion')
     list_filter = ('estado', 'fecha_oferta')
     ordering = ('-fecha_oferta',)
-    # Muestra la ForeignKey como un campo de búsqueda en lugar de un select simple
-    raw_id_fields = ('rut_institucion',)
+    # Selector con búsqueda (usa search_fields de InstitucionAdmin) en lugar de un select simple
+    autocomplete_fields = ('rut_institucion',)
+    actions = [accion_cambiar_estado(estado) for estado in acciones_masivas.TRANSICIONES[Donacion]]
 
 @admin.register(Equipo)
-class EquipoAdmin(admin.ModelAdmin):
+class EquipoAdmin(AdminTablaGrande):
     list_display = ('id_equipo', 'tipo', 'marca', 'modelo', 'num_serie', 'get_institucion_donante')
+    # Equipo JOIN Donacion JOIN Institucion en una sola consulta (antes: 2 consultas por fila)
+    list_select_related = ('id_donacion__rut_institucion',)
     search_fields = ('num_serie', 'marca', 'modelo', 'id_donacion__rut_institucion__nombre')
-    list_filter = ('tipo', 'marca', 'id_donacion__rut_institucion__nombre')
-    ordering = ('tipo', 'marca')
+    list_filter = ('tipo', 'marca', InstitucionDonanteFilter)
+    # Orden por PK (indexada): ordenar por tipo/marca obligaba a ordenar la tabla completa
+    ordering = ('-id_equipo',)
     raw_id_fields = ('id_donacion',)
 
     # Método para obtener la institución donante a través de la donación
+    @admin.display(description='Institución Donante', ordering='id_donacion__rut_institucion__nombre')
     def get_institucion_donante(self, obj):
         return obj.id_donacion.rut_institucion.nombre if obj.id_donacion and obj.id_donacion.rut_institucion else 'N/A'
-    get_institucion_donante.short_description = 'Institución Donante'
 
 
 # --- Inlines (para tablas de detalle) ---
@@ -106,14 +257,16 @@ class DetalleAsignacionInline(admin.TabularInline):
 
 
 @admin.register(Asignacion)
-class AsignacionAdmin(admin.ModelAdmin):
+class AsignacionAdmin(AdminTablaGrande):
     list_display = ('id_asignacion', 'rut_institucion_receptora', 'fecha_solicitud', 'cantidad_solicitada', 'estado')
+    list_select_related = ('rut_institucion_receptora',)
     search_fields = ('rut_institucion_receptora__nombre', 'rut_institucion_receptora__rut', 'id_asignacion')
     list_filter = ('estado', 'fecha_solicitud')
     ordering = ('-fecha_solicitud',)
-    raw_id_fields = ('rut_institucion_receptora',)
+    autocomplete_fields = ('rut_institucion_receptora',)
     # Incluye el detalle de los equipos asignados
     inlines = [DetalleAsignacionInline]
+    actions = [accion_cambiar_estado(estado) for estado in acciones_masivas.TRANSICIONES[Asignacion]]
 
 
 # DetalleAsignacionAdmin solo si se quiere gestionar por separado, pero no es recomendable si se usa Inline
@@ -125,19 +278,80 @@ class AsignacionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Reacondicionamiento)
-class ReacondicionamientoAdmin(admin.ModelAdmin):
+class ReacondicionamientoAdmin(AdminTablaGrande):
     list_display = ('id_equipo', 'id_tecnico', 'taller_asignado', 'estado_final', 'fecha_inicio', 'fecha_fin')
+    list_select_related = ('id_equipo', 'id_tecnico')
     search_fields = ('id_equipo__num_serie', 'id_equipo__marca', 'id_tecnico__nombre', 'taller_asignado')
     list_filter = ('estado_final', 'taller_asignado', 'fecha_inicio', 'fecha_fin')
     ordering = ('estado_final', 'taller_asignado')
     # id_equipo y id_tecnico son ForeignKeys/OneToOneFields, se usan raw_id_fields
     raw_id_fields = ('id_equipo', 'id_tecnico')
+    action_form = AsignarTecnicoActionForm
+    actions = ['asignar_tecnico']
+
+    @admin.action(description='Asignar el técnico elegido a los seleccionados')
+    def asignar_tecnico(self, request, queryset):
+        try:
+            tecnico = AsignarTecnicoActionForm.base_fields['tecnico'].clean(request.POST.get('tecnico'))
+        except ValidationError:
+            tecnico = None
+        if tecnico is None:
+            self.message_user(request, "Seleccione el técnico a asignar junto a la acción.", messages.ERROR)
+            return
+        _informar_accion(self, request, acciones_masivas.asignar_tecnico(queryset, tecnico, request.user))
 
 
 @admin.register(Soporte)
-class SoporteAdmin(admin.ModelAdmin):
+class SoporteAdmin(AdminTablaGrande):
     list_display = ('id_soporte', 'id_asignacion', 'tipo', 'id_tecnico', 'fecha_evento')
+    # El __str__ de Asignacion muestra el nombre de la institución receptora
+    list_select_related = ('id_asignacion__rut_institucion_receptora', 'id_tecnico')
     search_fields = ('id_asignacion__id_asignacion', 'id_tecnico__nombre', 'descripcion')
     list_filter = ('tipo', 'fecha_evento')
     ordering = ('-fecha_evento',)
-    raw_id_fields = ('id_asignacion', 'id_tecnico')
\ No newline at end of file
+    raw_id_fields = ('id_asignacion', 'id_tecnico')
+
+@admin.register(Tarea)
+class TareaAdmin(AdminTablaGrande):
+    list_display = ('id_tarea', 'nombre', 'estado', 'prioridad', 'intentos', 'ejecutar_desde', 'fecha_fin', 'trabajador')
+    list_filter = ('estado', 'nombre')
+    search_fields = ('nombre',)
+    ordering = ('-id_tarea',)
+    readonly_fields = ('intentos', 'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'error', 'trabajador')
+    actions = ['reintentar']
+
+    @admin.action(description='Reintentar las tareas seleccionadas')
+    def reintentar(self, request, queryset):
+        cantidad = queryset.exclude(estado='En Curso').update(
+            estado='Pendiente', intentos=0, ejecutar_desde=timezone.now(), error='',
+        )
+        self.message_user(request, f"{cantidad} tarea(s) devuelta(s) a la cola.", messages.SUCCESS)
+
+@admin.register(CertificadoEntrega)
+class CertificadoEntregaAdmin(AdminTablaGrande):
+    # Los genera certificados.py: aquí solo se consultan y verifican
+    list_display = ('id_asignacion', 'rut_institucion', 'fecha_entrega', 'total_equipos', 'fecha_generacion')
+    search_fields = ('=id_asignacion', 'rut_institucion')
+    date_hierarchy = 'fecha_entrega'
+    ordering = ('-fecha_entrega', '-id_asignacion')
+    actions = ['verificar_firmas']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Verificar la firma de los certificados seleccionados')
+    def verificar_firmas(self, request, queryset):
+        resultado = certificados.verificar(queryset)
+        invalidos = sorted(id_asignacion for id_asignacion, valido in resultado.items() if not valido)
+        if invalidos:
+            self.message_user(
+                request,
+                f"{len(invalidos)} certificado(s) ya no corresponden a su asignación "
+                f"(regenérelos): {', '.join(f'#{id_asignacion}' for id_asignacion in invalidos)}.",
+                messages.WARNING,
+            )
+        else:
+            self.message_user(request, f"{len(resultado)} certificado(s) verificado(s) correctamente.", messages.SUCCESS)
@@ -0,0 +1,227 @@
+"""
+Resúmenes diarios (rollups) para las estadísticas del sistema.
+
+Las tablas Resumen*Diario guardan un registro por día y dimensión
+(institución, técnico o tipo de soporte). Se recalculan por rangos de fechas
+en lotes de N días, cada lote en su propia transacción, de modo que un
+backfill de varios años nunca carga más de un lote en memoria y puede
+reanudarse desde la marca de agua (EstadoResumen) si se interrumpe.
+
+Las vistas de estadísticas (HTML y API) leen solo las tablas de resumen.
+"""
+import datetime
+import itertools
+
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import (
+    Institucion, Usuario, Donacion, Reacondicionamiento, Soporte,
+    ResumenDonacionDiario, ResumenReacondicionamientoDiario, ResumenSoporteDiario,
+    EstadoResumen, ReacondicionamientoArchivado, SoporteArchivado,
+)
+
+# Días hacia atrás que se vuelven a procesar en cada corrida incremental,
+# para capturar registros editados después (ej: fecha_fin cargada tarde).
+DIAS_REPROCESO = 7
+DIAS_POR_LOTE = 30
+
+
+# =========================================================
+# CÁLCULO DE CADA RESUMEN PARA UN RANGO [desde, hasta]
+# =========================================================
+
+def _resumir_donaciones(desde, hasta):
+    ResumenDonacionDiario.objects.filter(fecha__range=(desde, hasta)).delete()
+    filas = (
+        Donacion.objects
+        .filter(fecha_oferta__range=(desde, hasta))
+        .values('fecha_oferta', 'rut_institucion_id')
+        .annotate(total=Count('id_donacion'), equipos=Sum('total_equipos'))
+        .order_by()
+    )
+    ResumenDonacionDiario.objects.bulk_create([
+        ResumenDonacionDiario(
+            fecha=fila['fecha_oferta'],
+            rut_institucion=fila['rut_institucion_id'],
+            total_donaciones=fila['total'],
+            total_equipos=fila['equipos'] or 0,
+        )
+        for fila in filas
+    ])
+
+def _resumir_reacondicionamientos(desde, hasta):
+    ResumenReacondicionamientoDiario.objects.filter(fecha__range=(desde, hasta)).delete()
+    # La resta de fechas no es portable entre SQLite y MySQL: se acumula en Python,
+    # recorriendo solo las columnas necesarias del lote con un cursor (iterator).
+    acumulado = {}
+    # Los registros archivados también cuentan (ver archivo.py)
+    filas = itertools.chain.from_iterable(
+        modelo.objects
+        .filter(fecha_fin__range=(desde, hasta))
+        .values_list('fecha_fin', 'id_tecnico_id', 'estado_final', 'fecha_inicio')
+        .iterator(chunk_size=2000)
+        for modelo in (Reacondicionamiento, ReacondicionamientoArchivado)
+    )
+    for fecha_fin, id_tecnico, estado_final, fecha_inicio in filas:
+        fila = acumulado.setdefault((fecha_fin, id_tecnico), [0, 0, 0, 0])
+        if estado_final == 'Reacondicionado':
+            fila[0] += 1
+        elif estado_final == 'Irreparable':
+            fila[1] += 1
+        if fecha_inicio and fecha_inicio <= fecha_fin:
+            fila[2] += (fecha_fin - fecha_inicio).days
+            fila[3] += 1
+
+    ResumenReacondicionamientoDiario.objects.bulk_create([
+        ResumenReacondicionamientoDiario(
+            fecha=fecha, id_tecnico=id_tecnico,
+            total_reacondicionados=valores[0], total_irreparables=valores[1],
+            dias_reparacion=valores[2], reparaciones_medidas=valores[3],
+        )
+        for (fecha, id_tecnico), valores in acumulado.items()
+    ])
+
+def _resumir_soportes(desde, hasta):
+    ResumenSoporteDiario.objects.filter(fecha__range=(desde, hasta)).delete()
+    acumulado = {}
+    for modelo in (Soporte, SoporteArchivado):
+        filas = (
+            modelo.objects
+            .filter(fecha_evento__range=(desde, hasta))
+            .values('fecha_evento', 'tipo')
+            .annotate(total=Count('id_soporte'))
+            .order_by()
+        )
+        for fila in filas:
+            clave = (fila['fecha_evento'], fila['tipo'])
+            acumulado[clave] = acumulado.get(clave, 0) + fila['total']
+    ResumenSoporteDiario.objects.bulk_create([
+        ResumenSoporteDiario(fecha=fecha, tipo=tipo, total_tickets=total)
+        for (fecha, tipo), total in acumulado.items()
+    ])
+
+
+# Nombre del resumen -> (función de cálculo, modelos origen (activo y archivo), campo fecha origen)
+RESUMENES = {
+    'donaciones': (_resumir_donaciones, [Donacion], 'fecha_oferta'),
+    'reacondicionamientos': (_resumir_reacondicionamientos, [Reacondicionamiento, ReacondicionamientoArchivado], 'fecha_fin'),
+    'soportes': (_resumir_soportes, [Soporte, SoporteArchivado], 'fecha_evento'),
+}
+
+
+# =========================================================
+# CARGA POR LOTES E INCREMENTAL
+# =========================================================
+
+def procesar_rango(nombre, desde, hasta, dias_por_lote=DIAS_POR_LOTE):
+    """
+    Recalcula el resumen `nombre` entre `desde` y `hasta` en lotes de días.
+    Cada lote se confirma por separado y avanza la marca de agua,
+    así un backfill interrumpido se retoma donde quedó.
+    Genera (yield) cada rango procesado para poder informar el avance.
+    """
+    funcion = RESUMENES[nombre][0]
+    inicio = desde
+    while inicio <= hasta:
+        fin = min(inicio + datetime.timedelta(days=dias_por_lote - 1), hasta)
+        with transaction.atomic():
+            funcion(inicio, fin)
+            EstadoResumen.objects.update_or_create(nombre=nombre, defaults={'ultima_fecha': fin})
+        yield inicio, fin
+        inicio = fin + datetime.timedelta(days=1)
+
+def rango_incremental(nombre, dias_reproceso=DIAS_REPROCESO):
+    """
+    Calcula el rango pendiente de un resumen: desde la marca de agua (menos
+    unos días de reproceso) hasta hoy. Si nunca se ha procesado, parte en la
+    fecha más antigua de la tabla origen. Retorna None si no hay datos.
+    """
+    hoy = timezone.localdate()
+    estado = EstadoResumen.objects.filter(nombre=nombre).first()
+    if estado:
+        return estado.ultima_fecha - datetime.timedelta(days=dias_reproceso), hoy
+
+    _, modelos, campo = RESUMENES[nombre]
+    fechas = [modelo.objects.aggregate(primera=Min(campo))['primera'] for modelo in modelos]
+    fechas = [fecha for fecha in fechas if fecha is not None]
+    if not fechas:
+        return None
+    primera = min(fechas)
+    return primera, hoy
+
+
+# =========================================================
+# LECTURA (SOLO DESDE LAS TABLAS DE RESUMEN)
+# =========================================================
+
+def _filtrar_fechas(queryset, desde, hasta):
+    if desde:
+        queryset = queryset.filter(fecha__gte=desde)
+    if hasta:
+        queryset = queryset.filter(fecha__lte=hasta)
+    return queryset
+
+def tendencias_mensuales(desde=None, hasta=None):
+    """Agrega los resúmenes diarios por mes. Retorna un dict listo para JSON o template."""
+    donaciones = list(
+        _filtrar_fechas(ResumenDonacionDiario.objects, desde, hasta)
+        .annotate(mes=TruncMonth('fecha'))
+        .values('mes', 'rut_institucion')
+        .annotate(donaciones=Sum('total_donaciones'), equipos=Sum('total_equipos'))
+        .order_by('mes', 'rut_institucion')
+    )
+    reacondicionamientos = list(
+        _filtrar_fechas(ResumenReacondicionamientoDiario.objects, desde, hasta)
+        .annotate(mes=TruncMonth('fecha'))
+        .values('mes', 'id_tecnico')
+        .annotate(
+            reacondicionados=Sum('total_reacondicionados'),
+            irreparables=Sum('total_irreparables'),
+            dias=Sum('dias_reparacion'),
+            medidas=Sum('reparaciones_medidas'),
+        )
+        .order_by('mes', 'id_tecnico')
+    )
+    soportes = list(
+        _filtrar_fechas(ResumenSoporteDiario.objects, desde, hasta)
+        .annotate(mes=TruncMonth('fecha'))
+        .values('mes', 'tipo')
+        .annotate(tickets=Sum('total_tickets'))
+        .order_by('mes', 'tipo')
+    )
+
+    # Los nombres se resuelven con una consulta por dimensión (in_bulk), no por fila
+    instituciones = Institucion.objects.in_bulk({fila['rut_institucion'] for fila in donaciones})
+    tecnicos = Usuario.objects.in_bulk({fila['id_tecnico'] for fila in reacondicionamientos if fila['id_tecnico']})
+
+    return {
+        'donaciones': [
+            {
+                'mes': fila['mes'].strftime('%Y-%m'),
+                'rut_institucion': fila['rut_institucion'],
+                'institucion': instituciones[fila['rut_institucion']].nombre if fila['rut_institucion'] in instituciones else fila['rut_institucion'],
+                'donaciones': fila['donaciones'],
+                'equipos': fila['equipos'],
+            }
+            for fila in donaciones
+        ],
+        'reacondicionamientos': [
+            {
+                'mes': fila['mes'].strftime('%Y-%m'),
+                'id_tecnico': fila['id_tecnico'],
+                'tecnico': tecnicos[fila['id_tecnico']].get_full_name() if fila['id_tecnico'] in tecnicos else 'No asignado',
+                'reacondicionados': fila['reacondicionados'],
+                'irreparables': fila['irreparables'],
+                'dias_promedio_reparacion': round(fila['dias'] / fila['medidas'], 1) if fila['medidas'] else None,
+            }
+            for fila in reacondicionamientos
+        ],
+        'soportes': [
+            {'mes': fila['mes'].strftime('%Y-%m'), 'tipo': fila['tipo'], 'tickets': fila['tickets']}
+            for fila in soportes
+        ],
+        'actualizado': {estado.nombre: estado.ultima_fecha.isoformat() for estado in EstadoResumen.objects.all()},
+    }
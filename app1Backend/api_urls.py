@@ -0,0 +1,30 @@
+"""
+Rutas de la API REST (namespace 'api').
+
+Se incluyen desde proyectoBackend/urls.py con include(): DRF, los
+serializers y los viewsets se importan junto con el URLconf, en la primera
+petición de cada proceso (no en django.setup()).
+"""
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+
+from . import api_views
+
+app_name = 'api'
+
+# Configuración del Router de la API
+router = DefaultRouter()
+router.register(r'instituciones', api_views.InstitucionViewSet)
+router.register(r'usuarios', api_views.UsuarioViewSet)
+router.register(r'donaciones', api_views.DonacionViewSet)
+router.register(r'equipos', api_views.EquipoViewSet)
+router.register(r'asignaciones', api_views.AsignacionViewSet)
+router.register(r'reacondicionamientos', api_views.ReacondicionamientoViewSet)
+router.register(r'soportes', api_views.SoporteViewSet)
+
+urlpatterns = [
+    # Vistas que no son del router (van antes)
+    path('estadisticas/', api_views.EstadisticasAPIView.as_view(), name='estadisticas'),
+    # Feed de cambios para sincronización incremental (?since=<cursor>)
+    path('cambios/', api_views.CambiosAPIView.as_view(), name='cambios'),
+] + router.urls
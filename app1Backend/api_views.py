@@ -1,35 +1,219 @@
-from rest_framework import viewsets
-from .models import Institucion, Usuario, Donacion, Equipo, Asignacion, Reacondicionamiento, Soporte
+import datetime
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import (
+    Institucion, Usuario, Donacion, Equipo, Asignacion, Reacondicionamiento, Soporte,
+    AsignacionArchivada, ReacondicionamientoArchivado, SoporteArchivado,
+)
 from .serializers import (
     InstitucionSerializer, UsuarioSerializer, DonacionSerializer, 
-    EquipoSerializer, AsignacionSerializer, ReacondicionamientoSerializer, SoporteSerializer
+    EquipoSerializer, AsignacionSerializer, ReacondicionamientoSerializer, SoporteSerializer,
+    AsignacionArchivadaSerializer, ReacondicionamientoArchivadoSerializer, SoporteArchivadoSerializer,
 )
+from .analitica import tendencias_mensuales
+from .archivo import archivados, incluir_archivados
+from .cache_api import RespuestaCacheadaMixin
+from .cambios import RECURSOS, LIMITE_POR_DEFECTO, CursorVencido, leer_cambios
+from .especificaciones import filtrar_por_especificaciones
+from .facetas import seleccion_de, filtrar_por_facetas, contar_facetas
+from .imagenes import encolar_optimizacion
+
+
+class ArchivadosMixin:
+    """
+    Con ?archivados=1 el listado agrega, después de los activos, los registros
+    archivados más recientes (con "archivado": true, hasta LIMITE_LISTADO y
+    filtrados con ?q como el listado HTML), y el detalle busca también en el
+    archivo. Los archivados son de solo lectura.
+    """
+    modelo_archivado = None
+    serializer_archivado = None
+
+    def list(self, request, *args, **kwargs):
+        respuesta = super().list(request, *args, **kwargs)
+        if incluir_archivados(request.query_params):
+            filas = archivados(self.modelo_archivado, request.query_params.get('q'))
+            respuesta.data = list(respuesta.data) + self.serializer_archivado(filas, many=True).data
+        return respuesta
+
+    def retrieve(self, request, *args, **kwargs):
+        if incluir_archivados(request.query_params):
+            try:
+                pk = int(kwargs[self.lookup_field])
+            except ValueError:
+                # Un pk no numérico tampoco existe entre los activos: super() responde 404
+                pk = None
+            archivado = self.modelo_archivado.objects.filter(pk=pk).first() if pk is not None else None
+            if archivado is not None:
+                return Response(self.serializer_archivado(archivado).data)
+        return super().retrieve(request, *args, **kwargs)
 
 
-class InstitucionViewSet(viewsets.ModelViewSet):
+class InstitucionViewSet(RespuestaCacheadaMixin, viewsets.ModelViewSet):
     queryset = Institucion.objects.all()
     serializer_class = InstitucionSerializer
 
-class UsuarioViewSet(viewsets.ModelViewSet):
+class UsuarioViewSet(RespuestaCacheadaMixin, viewsets.ModelViewSet):
     queryset = Usuario.objects.all()
     serializer_class = UsuarioSerializer
 
-class DonacionViewSet(viewsets.ModelViewSet):
+class DonacionViewSet(RespuestaCacheadaMixin, viewsets.ModelViewSet):
     queryset = Donacion.objects.all()
     serializer_class = DonacionSerializer
 
-class EquipoViewSet(viewsets.ModelViewSet):
+class EquipoViewSet(RespuestaCacheadaMixin, viewsets.ModelViewSet):
+    """
+    Acepta ?ram_min, ?ram_max, ?almacenamiento_min, ?almacenamiento_max (en GB)
+    y ?almacenamiento_tipo (SSD, HDD, eMMC) sobre las columnas normalizadas,
+    y las facetas ?tipo, ?marca, ?institucion, ?estado y ?ram (repetibles).
+    /api/equipos/facetas/ retorna los conteos por faceta para los mismos filtros.
+    """
     queryset = Equipo.objects.all()
     serializer_class = EquipoSerializer
+    # Las facetas filtran por la institución donante y el estado de reacondicionamiento
+    modelos_cache = [Equipo, Donacion, Reacondicionamiento]
 
-class AsignacionViewSet(viewsets.ModelViewSet):
+    def _filtros(self):
+        # Queryset sin facetas (base de los conteos) y la selección de facetas
+        try:
+            queryset = filtrar_por_especificaciones(super().get_queryset(), self.request.query_params)
+            return queryset, seleccion_de(self.request.query_params)
+        except ValueError as error:
+            raise ValidationError({str(error): "Valor no válido."})
+
+    def get_queryset(self):
+        queryset, seleccion = self._filtros()
+        return filtrar_por_facetas(queryset, seleccion)
+
+    def perform_create(self, serializer):
+        encolar_optimizacion(serializer.save())
+
+    def perform_update(self, serializer):
+        equipo = serializer.save()
+        if 'imagen' in serializer.validated_data:
+            encolar_optimizacion(equipo)
+
+    @action(detail=False)
+    def facetas(self, request):
+        queryset, seleccion = self._filtros()
+        return Response(contar_facetas(queryset, seleccion, filtrado=bool(queryset.query.where)))
+
+class AsignacionViewSet(RespuestaCacheadaMixin, ArchivadosMixin, viewsets.ModelViewSet):
     queryset = Asignacion.objects.all()
     serializer_class = AsignacionSerializer
+    modelo_archivado = AsignacionArchivada
+    serializer_archivado = AsignacionArchivadaSerializer
 
-class ReacondicionamientoViewSet(viewsets.ModelViewSet):
+class ReacondicionamientoViewSet(RespuestaCacheadaMixin, ArchivadosMixin, viewsets.ModelViewSet):
     queryset = Reacondicionamiento.objects.all()
     serializer_class = ReacondicionamientoSerializer
+    modelo_archivado = ReacondicionamientoArchivado
+    serializer_archivado = ReacondicionamientoArchivadoSerializer
 
-class SoporteViewSet(viewsets.ModelViewSet):
+class SoporteViewSet(RespuestaCacheadaMixin, ArchivadosMixin, viewsets.ModelViewSet):
     queryset = Soporte.objects.all()
-    serializer_class = SoporteSerializer
\ No newline at end of file
+    serializer_class = SoporteSerializer
+    modelo_archivado = SoporteArchivado
+    serializer_archivado = SoporteArchivadoSerializer
+
+    def perform_update(self, serializer):
+        # La primera edición cuenta como primera respuesta (SLA), igual que en SoporteUpdateView
+        serializer.instance.registrar_respuesta()
+        serializer.save()
+
+
+class EstadisticasAPIView(APIView):
+    """
+    Tendencias mensuales (donaciones, reacondicionamientos, soportes).
+    Lee solo las tablas de resumen; acepta ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD.
+    """
+
+    def _fecha(self, nombre):
+        valor = self.request.query_params.get(nombre)
+        if not valor:
+            return None
+        try:
+            return datetime.date.fromisoformat(valor)
+        except ValueError:
+            raise ValidationError({nombre: 'Formato de fecha inválido, use YYYY-MM-DD.'})
+
+    @method_decorator(cache_control(private=True, max_age=300))
+    def get(self, request):
+        return Response(tendencias_mensuales(self._fecha('desde'), self._fecha('hasta')))
+
+
+class CambiosAPIView(APIView):
+    """
+    Feed de cambios para sincronizar sistemas externos sin descargar tablas completas.
+
+    GET /api/cambios/?since=<cursor>&limit=<n>&recursos=equipos,asignaciones
+    Retorna altas y modificaciones (con el estado actual del objeto) y
+    eliminaciones (sin datos), en orden de confirmación. El cliente guarda
+    `cursor` y lo envía como `since` en la siguiente llamada; si `hay_mas`
+    es verdadero debe seguir pidiendo. Un cursor ya purgado responde 410
+    y el cliente debe resincronizar desde cero (since=0).
+    """
+    SERIALIZERS = {
+        'instituciones': InstitucionSerializer,
+        'usuarios': UsuarioSerializer,
+        'donaciones': DonacionSerializer,
+        'equipos': EquipoSerializer,
+        'asignaciones': AsignacionSerializer,
+        'reacondicionamientos': ReacondicionamientoSerializer,
+        'soportes': SoporteSerializer,
+    }
+
+    def _entero(self, nombre, defecto):
+        valor = self.request.query_params.get(nombre)
+        if not valor:
+            return defecto
+        try:
+            numero = int(valor)
+        except ValueError:
+            raise ValidationError({nombre: 'Debe ser un número entero.'})
+        if numero < 0:
+            raise ValidationError({nombre: 'Debe ser mayor o igual a 0.'})
+        return numero
+
+    def _recursos(self):
+        valor = self.request.query_params.get('recursos')
+        if not valor:
+            return None
+        recursos = [recurso.strip() for recurso in valor.split(',') if recurso.strip()]
+        invalidos = [recurso for recurso in recursos if recurso not in RECURSOS]
+        if invalidos:
+            raise ValidationError({'recursos': f"Recursos desconocidos: {', '.join(invalidos)}."})
+        return recursos
+
+    def get(self, request):
+        since = self._entero('since', 0)
+        try:
+            cambios, objetos, cursor, hay_mas = leer_cambios(
+                since, self._entero('limit', LIMITE_POR_DEFECTO), self._recursos()
+            )
+        except CursorVencido as e:
+            return Response(
+                {'detail': 'El cursor ya no está disponible; resincronice con since=0.', 'primer_cursor': e.args[0]},
+                status=status.HTTP_410_GONE,
+            )
+
+        resultado = []
+        for cambio in cambios:
+            objeto = objetos.get(cambio.recurso, {}).get(cambio.objeto_id)
+            # Modificado y luego eliminado (la eliminación aún no entra en esta página)
+            eliminado = cambio.operacion == 'Eliminacion' or objeto is None
+            resultado.append({
+                'cursor': cambio.id_cambio,
+                'recurso': cambio.recurso,
+                'id': cambio.objeto_id,
+                'operacion': 'Eliminacion' if eliminado else cambio.operacion,
+                'fecha': cambio.fecha,
+                'datos': None if eliminado else self.SERIALIZERS[cambio.recurso](objeto, context={'request': request}).data,
+            })
+        return Response({'cursor': cursor, 'hay_mas': hay_mas, 'cambios': resultado})
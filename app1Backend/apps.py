@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class App1BackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app1Backend'
+
+    def ready(self):
+        # Registra los receptores de señales de auditoría, del feed de cambios, de eventos en vivo
+        # y de invalidación del índice de facetas y de los datos de referencia
+        from . import auditoria, cambios, eventos, facetas, referencias  # noqa: F401
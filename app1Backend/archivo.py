@@ -0,0 +1,153 @@
+"""
+Archivo de registros cerrados.
+
+Soportes resueltos, asignaciones entregadas (con sus detalles) y
+reacondicionamientos terminados hace más de ARCHIVO_DIAS se mueven a tablas
+*_archivado con el mismo ID. Así los listados, búsquedas y la API recorren
+solo los registros activos; los archivados se consultan con ?archivados=1.
+
+- Se procesa por lotes de IDs; cada lote (copia + eliminación) es una
+  transacción. Si el proceso se interrumpe, basta con volver a ejecutarlo:
+  lo pendiente sigue cumpliendo el criterio y lo ya movido no.
+- La eliminación en las tablas activas es directa (sin señales): archivar no
+  es una eliminación para la auditoría ni para los eventos en vivo. Sí se
+  informa al feed de cambios, porque el registro deja el recurso de la API.
+- Una asignación se archiva solo cuando ya no le quedan soportes activos;
+  por eso los soportes se archivan antes.
+"""
+import collections
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .cambios import registrar_cambios
+from .models import (
+    Asignacion, DetalleAsignacion, Reacondicionamiento, Soporte,
+    AsignacionArchivada, DetalleAsignacionArchivado, ReacondicionamientoArchivado, SoporteArchivado,
+)
+
+LOTE = 1000
+# Filas archivadas que muestran los listados HTML y la API (las más recientes)
+LIMITE_LISTADO = 500
+ESTADOS_REACONDICIONAMIENTO_CERRADOS = ['Reacondicionado', 'Irreparable']
+
+
+def _inicio_del_dia(fecha):
+    return timezone.make_aware(datetime.datetime.combine(fecha, datetime.time.min))
+
+def _soportes_cerrados(corte):
+    # Por la fecha de resolución: un ticket antiguo resuelto hace poco sigue en los
+    # indicadores de SLA. Los resueltos antes del ciclo de vida no la tienen (0010)
+    # y se archivan por la fecha del evento, como antes.
+    return Soporte.objects.filter(estado='Resuelto').filter(
+        Q(fecha_resolucion__lt=_inicio_del_dia(corte))
+        | Q(fecha_resolucion__isnull=True, fecha_evento__lt=corte)
+    )
+
+def _asignaciones_cerradas(corte):
+    return (
+        Asignacion.objects
+        .filter(estado='Entregada', fecha_solicitud__lt=corte)
+        .exclude(Exists(DetalleAsignacion.objects.filter(id_asignacion=OuterRef('pk'), fecha_entrega__gte=corte)))
+        .exclude(Exists(Soporte.objects.filter(id_asignacion=OuterRef('pk'))))
+    )
+
+def _reacondicionamientos_cerrados(corte):
+    return Reacondicionamiento.objects.filter(
+        estado_final__in=ESTADOS_REACONDICIONAMIENTO_CERRADOS,
+        fecha_fin__lt=corte,
+    )
+
+
+Archivo = collections.namedtuple('Archivo', ['modelo', 'archivo', 'cerrados', 'origenes', 'hijos', 'busqueda'])
+Hijo = collections.namedtuple('Hijo', ['modelo', 'archivo', 'campo', 'origenes'])
+
+# Nombre -> configuración, en el orden en que se archivan.
+# `origenes`: columna del archivo -> lookup en el modelo activo, cuando difieren.
+# `busqueda`: campos del archivo en los que busca `q` (icontains), como el listado activo.
+ARCHIVOS = {
+    'soportes': Archivo(
+        Soporte, SoporteArchivado, _soportes_cerrados,
+        {
+            'id_asignacion': 'id_asignacion_id',
+            'rut_institucion_receptora_id': 'id_asignacion__rut_institucion_receptora_id',
+        },
+        [],
+        ['id_soporte', 'descripcion', 'id_tecnico__nombre', 'id_asignacion'],
+    ),
+    'asignaciones': Archivo(
+        Asignacion, AsignacionArchivada, _asignaciones_cerradas, {},
+        [Hijo(DetalleAsignacion, DetalleAsignacionArchivado, 'id_asignacion', {'id_asignacion': 'id_asignacion_id'})],
+        ['id_asignacion', 'rut_institucion_receptora__nombre', 'rut_institucion_receptora__rut'],
+    ),
+    'reacondicionamientos': Archivo(
+        Reacondicionamiento, ReacondicionamientoArchivado, _reacondicionamientos_cerrados, {}, [],
+        ['id_equipo__id_equipo', 'id_equipo__num_serie', 'id_tecnico__nombre'],
+    ),
+}
+POR_MODELO_ARCHIVADO = {config.archivo: config for config in ARCHIVOS.values()}
+
+
+# =========================================================
+# ARCHIVADO POR LOTES
+# =========================================================
+
+def fecha_corte(dias=None):
+    dias = settings.ARCHIVO_DIAS if dias is None else dias
+    return timezone.localdate() - datetime.timedelta(days=dias)
+
+def _copiar(queryset, archivo, origenes, ahora):
+    campos = [campo.attname for campo in archivo._meta.concrete_fields if campo.attname != 'fecha_archivado']
+    filas = queryset.values_list(*[origenes.get(campo, campo) for campo in campos])
+    archivo.objects.bulk_create([archivo(fecha_archivado=ahora, **dict(zip(campos, fila))) for fila in filas])
+
+def _eliminar(queryset):
+    # DELETE directo: sin cargar los objetos ni emitir señales (ver docstring del módulo)
+    queryset._raw_delete(queryset.db)
+
+def archivar(nombre, corte, lote=LOTE):
+    """
+    Mueve al archivo los registros de `nombre` cerrados antes de `corte`.
+    Genera (yield) la cantidad movida en cada lote confirmado.
+    """
+    config = ARCHIVOS[nombre]
+    while True:
+        with transaction.atomic():
+            ids = list(config.cerrados(corte).order_by('pk').values_list('pk', flat=True)[:lote])
+            if not ids:
+                return
+            ahora = timezone.now()
+            _copiar(config.modelo.objects.filter(pk__in=ids), config.archivo, config.origenes, ahora)
+            # Los hijos primero: sus FK apuntan al registro activo
+            for hijo in config.hijos:
+                hijos = hijo.modelo.objects.filter(**{f'{hijo.campo}__in': ids})
+                _copiar(hijos, hijo.archivo, hijo.origenes, ahora)
+                _eliminar(hijos)
+            _eliminar(config.modelo.objects.filter(pk__in=ids))
+            registrar_cambios(config.modelo, ids, 'Eliminacion')
+        yield len(ids)
+
+
+# =========================================================
+# LECTURA
+# =========================================================
+
+def incluir_archivados(parametros):
+    """True si la petición pide incluir los registros archivados (?archivados=1)."""
+    return parametros.get('archivados', '').lower() in ('1', 'true', 'si')
+
+def archivados(modelo_archivado, query=None, relaciones=()):
+    """
+    Los LIMITE_LISTADO registros más recientes de `modelo_archivado`, filtrados
+    con la búsqueda `query` sobre sus campos de `busqueda`.
+    """
+    queryset = modelo_archivado.objects.select_related(*relaciones)
+    if query:
+        condicion = Q()
+        for campo in POR_MODELO_ARCHIVADO[modelo_archivado].busqueda:
+            condicion |= Q(**{f'{campo}__icontains': query})
+        queryset = queryset.filter(condicion)
+    return queryset.order_by('-pk')[:LIMITE_LISTADO]
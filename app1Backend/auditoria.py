@@ -0,0 +1,160 @@
+"""
+Auditoría de cambios (historial solo de inserción) para Equipo, Donacion y Soporte.
+
+- Antes de guardar una instancia existente (pre_save) se lee UNA vez la
+  fila guardada, solo los campos que se van a escribir: esa es la foto.
+  Cargar instancias (listados, API, admin) no cuesta nada; antes se tomaba
+  una foto de cada instancia cargada, aunque nunca se guardara.
+- Al guardar o eliminar (post_save / post_delete) se calcula la diferencia
+  campo a campo contra esa foto (al eliminar, contra la propia instancia).
+- Durante una petición los registros se acumulan en un buffer y el
+  AuditoriaMiddleware los escribe con UN solo bulk_create al terminar.
+  Fuera de una petición (shell, comandos) se escriben de inmediato.
+"""
+import contextvars
+
+from django.db.models.signals import pre_save, post_save, post_delete
+
+from .models import Donacion, Equipo, Soporte, RegistroAuditoria
+
+# Modelos auditados, por nombre (se usa también en la URL del historial)
+MODELOS_AUDITADOS = {
+    'equipo': Equipo,
+    'donacion': Donacion,
+    'soporte': Soporte,
+}
+
+_buffer = contextvars.ContextVar('auditoria_buffer', default=None)
+_request = contextvars.ContextVar('auditoria_request', default=None)
+
+
+# =========================================================
+# BUFFER POR PETICIÓN
+# =========================================================
+
+def iniciar_buffer(request=None):
+    """Activa el buffer para la petición actual. Retorna los tokens para restaurar."""
+    return _buffer.set([]), _request.set(request)
+
+def vaciar_buffer(tokens):
+    """Escribe los registros acumulados (un solo INSERT) y desactiva el buffer."""
+    registros = _buffer.get() or []
+    _buffer.reset(tokens[0])
+    _request.reset(tokens[1])
+    if registros:
+        RegistroAuditoria.objects.bulk_create(registros)
+    return len(registros)
+
+def _usuario_actual():
+    # Se lee request.user al momento del cambio: DRF lo reemplaza al autenticar (Basic/Session)
+    usuario = getattr(_request.get(), 'user', None)
+    if usuario is None or not getattr(usuario, 'is_authenticated', False):
+        return None
+    return usuario
+
+def _registrar(instancia, accion, cambios):
+    usuario = _usuario_actual()
+    registro = RegistroAuditoria(
+        modelo=instancia._meta.model_name,
+        objeto_id=str(instancia.pk),
+        accion=accion,
+        cambios=cambios,
+        usuario=usuario,
+        usuario_email=usuario.email if usuario else None,
+    )
+    buffer = _buffer.get()
+    if buffer is None:
+        registro.save()
+    else:
+        buffer.append(registro)
+
+def registrar_lote(modelo, accion, cambios_por_objeto, usuario=None):
+    """
+    Registra varios objetos de una operación masiva (update / eliminación por
+    lotes) sin instanciarlos ni pasar por las señales: un solo INSERT, o el
+    buffer de la petición. `cambios_por_objeto` es {pk: {campo: [antes, despues]}}.
+    """
+    usuario = usuario or _usuario_actual()
+    registros = [
+        RegistroAuditoria(
+            modelo=modelo._meta.model_name,
+            objeto_id=str(pk),
+            accion=accion,
+            cambios=cambios,
+            usuario=usuario,
+            usuario_email=usuario.email if usuario else None,
+        )
+        for pk, cambios in cambios_por_objeto.items()
+    ]
+    buffer = _buffer.get()
+    if buffer is None:
+        RegistroAuditoria.objects.bulk_create(registros)
+    else:
+        buffer.extend(registros)
+
+
+# =========================================================
+# FOTO Y DIFERENCIAS
+# =========================================================
+
+def serializable(valor):
+    """Valor apto para el JSON del historial (archivo -> nombre, fecha -> ISO)."""
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    if hasattr(valor, 'name'):  # FieldFile / ImageFieldFile
+        return valor.name or None
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return str(valor)
+
+def _valor(campo, instancia):
+    """Valor serializable del campo (FK -> id, archivo -> nombre, fecha -> ISO)."""
+    return serializable(campo.value_from_object(instancia))
+
+def _campos_cargados(instancia, update_fields=None):
+    # Los campos diferidos (.only()/.defer()) se omiten: leerlos dispararía una consulta
+    return [
+        campo for campo in instancia._meta.concrete_fields
+        if campo.attname in instancia.__dict__ and (update_fields is None or campo.name in update_fields)
+    ]
+
+def _foto(instancia, update_fields=None):
+    return {campo.attname: _valor(campo, instancia) for campo in _campos_cargados(instancia, update_fields)}
+
+def _foto_guardada(instancia, update_fields=None):
+    """Los mismos campos que _foto(), leídos de la fila guardada ({} si ya no existe)."""
+    campos = [campo.name for campo in _campos_cargados(instancia, update_fields)]
+    guardada = type(instancia)._base_manager.only(*campos).filter(pk=instancia.pk).first()
+    return _foto(guardada, update_fields) if guardada is not None else {}
+
+def _diferencias(antes, despues):
+    return {
+        campo: [antes.get(campo), valor]
+        for campo, valor in despues.items()
+        if antes.get(campo) != valor
+    }
+
+
+def _tomar_foto(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Las instancias nuevas no tienen estado previo: no se consulta nada
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._auditoria_foto = _foto_guardada(instance, update_fields)
+
+def _auditar_guardado(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    antes = {} if created else instance.__dict__.pop('_auditoria_foto', {})
+    cambios = _diferencias(antes, _foto(instance, update_fields))
+    if created or cambios:
+        _registrar(instance, 'Creacion' if created else 'Modificacion', cambios)
+
+def _auditar_eliminacion(sender, instance, **kwargs):
+    _registrar(instance, 'Eliminacion', {campo: [valor, None] for campo, valor in _foto(instance).items()})
+
+
+# Se conectan solo a los modelos auditados para no agregar costo al resto
+for _modelo in MODELOS_AUDITADOS.values():
+    pre_save.connect(_tomar_foto, sender=_modelo, dispatch_uid=f'auditoria_foto_{_modelo._meta.model_name}')
+    post_save.connect(_auditar_guardado, sender=_modelo, dispatch_uid=f'auditoria_save_{_modelo._meta.model_name}')
+    post_delete.connect(_auditar_eliminacion, sender=_modelo, dispatch_uid=f'auditoria_delete_{_modelo._meta.model_name}')
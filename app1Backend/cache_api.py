@@ -0,0 +1,131 @@
+"""
+Caché de respuestas de la API (list y retrieve de los viewsets).
+
+Los dashboards consultan /api/equipos/, /api/soportes/, /api/asignaciones/...
+cada pocos segundos y casi siempre reciben lo mismo. La respuesta JSON ya
+renderizada (bytes) se guarda en la caché bajo una clave con:
+
+- la ruta y los parámetros GET (ordenados),
+- el rol y is_staff del usuario (las respuestas pueden depender del rol),
+- la GENERACIÓN actual de cada modelo del que depende el viewset.
+
+Invalidación por generaciones, sin adivinar TTL: cada modelo tiene un
+contador en la caché que se incrementa al confirmar cualquier cambio. Un
+cambio no borra claves; las respuestas viejas simplemente dejan de pedirse
+y la caché las desaloja. El contador se incrementa desde
+cambios.registrar_cambios, que ya reciben tanto las señales post_save /
+post_delete como las operaciones masivas (update, bulk_create, archivo).
+
+Los contadores viven en el backend de caché: con varios procesos (varios
+workers web, runworker) este debe ser compartido (ver CACHES en settings).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+# Sin importar DRF: cambios.py carga este módulo al iniciar y DRF solo se carga con la API
+from django.template.response import SimpleTemplateResponse
+
+from .metricas import registrar_cache
+
+CLAVE_GENERACION = 'api_generacion:{modelo}'
+CLAVE_RESPUESTA = 'api_respuesta:{huella}'
+
+
+# =========================================================
+# GENERACIONES
+# =========================================================
+
+def _clave_generacion(modelo):
+    return CLAVE_GENERACION.format(modelo=modelo._meta.label_lower)
+
+def _generacion_nueva():
+    # Si la caché desaloja un contador, el valor nuevo no puede repetir uno ya usado
+    # (volverían a servirse respuestas viejas): se parte desde el reloj en nanosegundos
+    return time.time_ns()
+
+def generaciones(modelos):
+    """Generación actual de cada modelo, en una sola lectura a la caché."""
+    claves = [_clave_generacion(modelo) for modelo in modelos]
+    actuales = cache.get_many(claves)
+    faltantes = {clave: _generacion_nueva() for clave in claves if clave not in actuales}
+    if faltantes:
+        cache.set_many(faltantes, None)
+        actuales.update(faltantes)
+    return [actuales[clave] for clave in claves]
+
+def _incrementar(modelo):
+    # Un valor nuevo en vez de incr(): en la caché de archivos incr() es leer y escribir, y
+    # dos procesos que invalidan a la vez escribirían el mismo número (se perdería un cambio)
+    cache.set(_clave_generacion(modelo), _generacion_nueva(), None)
+
+def invalidar(modelo):
+    """
+    Invalida las respuestas que dependen de `modelo` al confirmar la transacción.
+    Antes del COMMIT otra petición aún leería los datos viejos y los guardaría
+    bajo la generación nueva.
+    """
+    transaction.on_commit(lambda: _incrementar(modelo))
+
+
+# =========================================================
+# MIXIN PARA LOS VIEWSETS
+# =========================================================
+
+class RespuestaCacheadaMixin:
+    """
+    Cachea list y retrieve (GET, respuesta JSON 200). `modelos_cache` son los
+    modelos de los que depende la respuesta; por defecto el del queryset.
+    Agrega X-Cache: HIT/MISS para diagnóstico.
+    """
+    modelos_cache = None
+    _clave_cache = None
+
+    def get_modelos_cache(self):
+        return self.modelos_cache or [self.queryset.model]
+
+    def _clave(self, request):
+        usuario = request.user
+        partes = [
+            request.path,
+            sorted(request.query_params.lists()),
+            getattr(usuario, 'rol', ''),
+            usuario.is_staff,
+            generaciones(self.get_modelos_cache()),
+        ]
+        return CLAVE_RESPUESTA.format(huella=hashlib.sha1(repr(partes).encode()).hexdigest())
+
+    def _responder(self, request, generar, *args, **kwargs):
+        # Solo JSON: la API navegable (HTML) muestra formularios y datos de la sesión
+        if request.accepted_renderer.format != 'json':
+            return generar(request, *args, **kwargs)
+        # La clave (con las generaciones) se calcula ANTES de consultar: si algo cambia
+        # durante la consulta, la respuesta queda bajo la generación anterior y no se reutiliza
+        clave = self._clave(request)
+        contenido = cache.get(clave)
+        registrar_cache('api', acierto=contenido is not None)
+        if contenido is not None:
+            respuesta = HttpResponse(contenido, content_type=request.accepted_media_type)
+            respuesta['X-Cache'] = 'HIT'
+            return respuesta
+        self._clave_cache = clave
+        return generar(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self._responder(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._responder(request, super().retrieve, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._clave_cache and isinstance(response, SimpleTemplateResponse) and response.status_code == 200:
+            response.render()
+            # Los listados enormes (ej: todos los equipos) no se guardan: desalojarían todo lo demás
+            if len(response.content) <= settings.CACHE_API_MAX_BYTES:
+                cache.set(self._clave_cache, response.content, None)
+            response['X-Cache'] = 'MISS'
+        return response
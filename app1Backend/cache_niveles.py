@@ -0,0 +1,252 @@
+"""
+Caché en dos niveles y cálculo protegido contra estampidas.
+
+CacheEnNiveles (backend de CACHES['default']):
+- Nivel local: un LRU en la memoria del proceso (MAX_ENTRIES entradas), que
+  evita leer el archivo o ir a la red en las claves más usadas. Cada entrada
+  vive a lo sumo SEGUNDOS_LOCAL: es el desfase máximo con lo que otro proceso
+  escribió en la caché compartida.
+- Nivel compartido: otro alias de CACHES (COMPARTIDA), común a todos los
+  procesos (FileBasedCache por defecto; Redis o Memcached en producción).
+  Todas las escrituras van a este nivel.
+
+Los números (contadores de generación de cache_api.py, versión del índice de
+facetas) NO se guardan en el nivel local: otros procesos los incrementan y
+leerlos atrasados serviría contenido viejo bajo una generación que ya cambió.
+
+memorizar(clave, calcular, segundos, gracia): para páginas caras como el
+dashboard. Cuando el valor vence lo recalcula UNA sola petición (un hilo por
+proceso, y un proceso a la vez mediante una clave de bloqueo con add()).
+Durante `gracia` segundos las demás reciben el valor vencido sin esperar
+(stale-while-revalidate); sin valor previo, esperan al que calcula.
+"""
+import collections
+import os
+import pickle
+import threading
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from .metricas import registrar_cache
+
+_AUSENTE = object()
+
+
+class _NivelLocal:
+    """LRU de un proceso: clave -> (valor serializado, expira)."""
+
+    def __init__(self):
+        self.entradas = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+
+# Nombre (LOCATION) -> _NivelLocal. Django crea una instancia del backend por hilo:
+# el LRU se comparte a nivel de proceso, igual que LocMemCache
+_niveles = {}
+_lock_niveles = threading.Lock()
+
+def _nivel(nombre):
+    with _lock_niveles:
+        if nombre not in _niveles:
+            _niveles[nombre] = _NivelLocal()
+        return _niveles[nombre]
+
+def _reiniciar_en_hijo():
+    # Un proceso creado con fork no hereda las entradas (ni un lock tomado) del padre
+    for nivel in _niveles.values():
+        nivel.__init__()
+    _locks_calculo.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
+
+class CacheEnNiveles(BaseCache):
+    """LRU en el proceso delante de la caché compartida (ver docstring del módulo)."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        opciones = params.get('OPTIONS', {})
+        self._alias_compartida = opciones['COMPARTIDA']
+        self._segundos_local = opciones.get('SEGUNDOS_LOCAL', 5)
+        self._nivel = _nivel(location or 'default')
+
+    @property
+    def compartida(self):
+        return caches[self._alias_compartida]
+
+    # --- Nivel local ---
+
+    def _leer_local(self, clave):
+        nivel = self._nivel
+        with nivel.lock:
+            entrada = nivel.entradas.get(clave)
+            if entrada is None:
+                return _AUSENTE
+            if entrada[1] <= time.monotonic():
+                del nivel.entradas[clave]
+                return _AUSENTE
+            nivel.entradas.move_to_end(clave)
+        return pickle.loads(entrada[0])
+
+    def _guardar_local(self, clave, valor, timeout=DEFAULT_TIMEOUT):
+        if isinstance(valor, (int, float)):
+            return
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        segundos = self._segundos_local if timeout is None else min(timeout, self._segundos_local)
+        if segundos <= 0:
+            self._descartar_local(clave)
+            return
+        serializado = pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+        nivel = self._nivel
+        with nivel.lock:
+            nivel.entradas[clave] = (serializado, time.monotonic() + segundos)
+            nivel.entradas.move_to_end(clave)
+            while len(nivel.entradas) > self._max_entries:
+                nivel.entradas.popitem(last=False)
+
+    def _descartar_local(self, clave):
+        with self._nivel.lock:
+            self._nivel.entradas.pop(clave, None)
+
+    # --- API de BaseCache ---
+
+    def get(self, key, default=None, version=None):
+        clave = self.make_and_validate_key(key, version=version)
+        valor = self._leer_local(clave)
+        if valor is _AUSENTE:
+            valor = self.compartida.get(key, _AUSENTE, version=version)
+            if valor is _AUSENTE:
+                return default
+            self._guardar_local(clave, valor)
+        return valor
+
+    def get_many(self, keys, version=None):
+        encontrados, faltantes = {}, []
+        for key in keys:
+            valor = self._leer_local(self.make_and_validate_key(key, version=version))
+            if valor is _AUSENTE:
+                faltantes.append(key)
+            else:
+                encontrados[key] = valor
+        if faltantes:
+            compartidos = self.compartida.get_many(faltantes, version=version)
+            for key, valor in compartidos.items():
+                self._guardar_local(self.make_and_validate_key(key, version=version), valor)
+            encontrados.update(compartidos)
+        return encontrados
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.compartida.set(key, value, timeout, version=version)
+        self._guardar_local(self.make_and_validate_key(key, version=version), value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        fallidas = self.compartida.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in fallidas:
+                self._guardar_local(self.make_and_validate_key(key, version=version), value, timeout)
+        return fallidas
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        clave = self.make_and_validate_key(key, version=version)
+        if self.compartida.add(key, value, timeout, version=version):
+            self._guardar_local(clave, value, timeout)
+            return True
+        self._descartar_local(clave)
+        return False
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.compartida.touch(key, timeout, version=version)
+
+    def has_key(self, key, version=None):
+        clave = self.make_and_validate_key(key, version=version)
+        return self._leer_local(clave) is not _AUSENTE or self.compartida.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._descartar_local(self.make_and_validate_key(key, version=version))
+        return self.compartida.incr(key, delta, version=version)
+
+    def delete(self, key, version=None):
+        self._descartar_local(self.make_and_validate_key(key, version=version))
+        return self.compartida.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._descartar_local(self.make_and_validate_key(key, version=version))
+        self.compartida.delete_many(keys, version=version)
+
+    def clear(self):
+        with self._nivel.lock:
+            self._nivel.entradas.clear()
+        self.compartida.clear()
+
+
+# =========================================================
+# CÁLCULO PROTEGIDO CONTRA ESTAMPIDAS
+# =========================================================
+
+# Clave -> lock: un solo hilo por proceso recalcula cada clave
+_locks_calculo = collections.defaultdict(threading.Lock)
+_lock_locks = threading.Lock()
+# Pausa entre lecturas mientras otro proceso calcula un valor que aún no existe
+PAUSA_ESPERA = 0.05
+
+
+def _lock_calculo(clave):
+    with _lock_locks:
+        return _locks_calculo[clave]
+
+def _guardar(clave, calcular, segundos, gracia):
+    valor = calcular()
+    # Se guarda el vencimiento junto al valor: la entrada dura `gracia` segundos más
+    cache.set(clave, (valor, time.time() + segundos), segundos + gracia)
+    return valor
+
+def memorizar(clave, calcular, segundos, gracia=0, espera=10):
+    """
+    Retorna el valor de `clave`, llamando a `calcular()` si venció (cada
+    `segundos`). Con `gracia` > 0, mientras una petición lo recalcula las
+    demás reciben el valor anterior. `espera` limita cuánto se espera a otro
+    proceso que calcula un valor que aún no existe (después se calcula aquí).
+    """
+    entrada = cache.get(clave)
+    if entrada is not None and time.time() < entrada[1]:
+        registrar_cache(clave, acierto=True)
+        return entrada[0]
+    registrar_cache(clave, acierto=False)
+
+    lock = _lock_calculo(clave)
+    if entrada is not None:
+        # Vencida: si otro hilo ya la recalcula, se sirve la anterior sin esperar
+        if not lock.acquire(blocking=False):
+            return entrada[0]
+    elif not lock.acquire(timeout=espera):
+        return _guardar(clave, calcular, segundos, gracia)
+    try:
+        # Otro hilo pudo recalcularla mientras se esperaba el lock
+        actual = cache.get(clave)
+        if actual is not None and time.time() < actual[1]:
+            return actual[0]
+        entrada = actual or entrada
+        clave_bloqueo = f'{clave}:calculando'
+        if cache.add(clave_bloqueo, 1, espera):
+            try:
+                return _guardar(clave, calcular, segundos, gracia)
+            finally:
+                cache.delete(clave_bloqueo)
+        # Otro proceso la está recalculando
+        if entrada is not None:
+            return entrada[0]
+        limite = time.monotonic() + espera
+        while time.monotonic() < limite:
+            time.sleep(PAUSA_ESPERA)
+            entrada = cache.get(clave)
+            if entrada is not None:
+                return entrada[0]
+        return _guardar(clave, calcular, segundos, gracia)
+    finally:
+        lock.release()
@@ -0,0 +1,145 @@
+"""
+Registro de cambios para el feed de sincronización (/api/cambios/).
+
+Cada alta, modificación o eliminación de un recurso de la API agrega una
+fila a RegistroCambio. Los sistemas externos piden `?since=<cursor>` y
+reciben solo lo que cambió después de ese cursor, en orden de confirmación.
+
+- Las filas se crean con transaction.on_commit: si la transacción se
+  revierte no queda rastro, y el cursor y la fecha se asignan después del
+  COMMIT, por larga que haya sido la transacción.
+- Los cursores salen de SecuenciaCambios, cuya fila queda bloqueada hasta que
+  se confirman los INSERT: un cursor mayor nunca se confirma antes que uno
+  menor, así el feed no se salta cambios que aún no se veían al leer.
+- Las operaciones masivas (queryset.update(), bulk_create) no emiten
+  señales: deben llamar a registrar_cambios() con los IDs afectados.
+- registrar_cambios() también invalida la caché de respuestas de la API
+  (cache_api.py) del modelo afectado.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import Min
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+
+from .cache_api import invalidar as invalidar_cache_api
+
+from .models import (
+    Institucion, Usuario, Donacion, Equipo, Asignacion, Reacondicionamiento, Soporte,
+    RegistroCambio, SecuenciaCambios,
+)
+
+# Recursos del feed: mismo nombre que en el router de la API
+RECURSOS = {
+    'instituciones': Institucion,
+    'usuarios': Usuario,
+    'donaciones': Donacion,
+    'equipos': Equipo,
+    'asignaciones': Asignacion,
+    'reacondicionamientos': Reacondicionamiento,
+    'soportes': Soporte,
+}
+_RECURSO_POR_MODELO = {modelo: recurso for recurso, modelo in RECURSOS.items()}
+
+LIMITE_POR_DEFECTO = 500
+LIMITE_MAXIMO = 1000
+
+
+# =========================================================
+# ESCRITURA
+# =========================================================
+
+def registrar_cambios(modelo, ids, operacion):
+    """Agrega al registro un cambio por cada ID (un solo INSERT al confirmar la transacción)."""
+    recurso = _RECURSO_POR_MODELO[modelo]
+    ids = [str(pk) for pk in ids]
+    if ids:
+        transaction.on_commit(lambda: _insertar_cambios(recurso, ids, operacion))
+        invalidar_cache_api(modelo)
+
+def _insertar_cambios(recurso, ids, operacion):
+    with transaction.atomic():
+        secuencia = SecuenciaCambios.objects.select_for_update().get(pk=1)
+        fecha = timezone.now()
+        RegistroCambio.objects.bulk_create([
+            RegistroCambio(
+                id_cambio=secuencia.ultimo_cambio + posicion, recurso=recurso, objeto_id=pk,
+                operacion=operacion, fecha=fecha,
+            )
+            for posicion, pk in enumerate(ids, start=1)
+        ])
+        secuencia.ultimo_cambio += len(ids)
+        secuencia.save(update_fields=['ultimo_cambio'])
+
+def _cambio_guardado(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    # El login solo actualiza last_login: no es un cambio del recurso expuesto en la API
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    registrar_cambios(sender, [instance.pk], 'Creacion' if created else 'Modificacion')
+
+def _cambio_eliminado(sender, instance, **kwargs):
+    registrar_cambios(sender, [instance.pk], 'Eliminacion')
+
+
+for _modelo in RECURSOS.values():
+    post_save.connect(_cambio_guardado, sender=_modelo, dispatch_uid=f'cambios_save_{_modelo._meta.model_name}')
+    post_delete.connect(_cambio_eliminado, sender=_modelo, dispatch_uid=f'cambios_delete_{_modelo._meta.model_name}')
+
+
+# =========================================================
+# LECTURA DEL FEED
+# =========================================================
+
+class CursorVencido(Exception):
+    """El cursor es anterior a los cambios conservados: el cliente debe resincronizar completo."""
+
+
+def leer_cambios(since=0, limite=LIMITE_POR_DEFECTO, recursos=None):
+    """
+    Retorna (cambios, objetos, cursor, hay_mas).
+
+    - cambios: lista de RegistroCambio posteriores a `since`, dejando solo el
+      último por objeto dentro de la página (varias ediciones = una entrada).
+    - objetos: {recurso: {pk: instancia}} con el estado actual de los objetos
+      creados o modificados (una consulta por recurso, no por fila).
+    - cursor: ID del último cambio leído; se envía como `since` en la siguiente página.
+    """
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+    if since:
+        primero = RegistroCambio.objects.aggregate(primero=Min('id_cambio'))['primero']
+        # Si el registro se purgó más allá del cursor, faltarían cambios intermedios
+        if primero is not None and since < primero - 1:
+            raise CursorVencido(primero)
+
+    qs = RegistroCambio.objects.filter(id_cambio__gt=since)
+    if recursos:
+        qs = qs.filter(recurso__in=recursos)
+    pagina = list(qs.order_by('id_cambio')[:limite + 1])
+    hay_mas = len(pagina) > limite
+    pagina = pagina[:limite]
+    cursor = pagina[-1].id_cambio if pagina else since
+
+    ultimos = {}
+    for cambio in pagina:
+        ultimos.pop((cambio.recurso, cambio.objeto_id), None)
+        ultimos[(cambio.recurso, cambio.objeto_id)] = cambio
+    cambios = list(ultimos.values())
+
+    pendientes = {}
+    for cambio in cambios:
+        if cambio.operacion != 'Eliminacion':
+            pendientes.setdefault(cambio.recurso, set()).add(cambio.objeto_id)
+    objetos = {
+        recurso: {str(pk): obj for pk, obj in RECURSOS[recurso].objects.in_bulk(list(ids)).items()}
+        for recurso, ids in pendientes.items()
+    }
+    return cambios, objetos, cursor, hay_mas
+
+def purgar_cambios(dias):
+    """Elimina los cambios con más de `dias` de antigüedad. Retorna la cantidad eliminada."""
+    limite = timezone.now() - datetime.timedelta(days=dias)
+    eliminados, _ = RegistroCambio.objects.filter(fecha__lt=limite).delete()
+    return eliminados
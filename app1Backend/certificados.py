@@ -0,0 +1,227 @@
+"""
+Certificados de entrega de las asignaciones entregadas.
+
+Cada certificado es un documento HTML listo para imprimir y firmar (plantilla
+certificado_entrega.html) con la institución receptora, los equipos
+entregados (DetalleAsignacion) y un código de verificación: la firma HMAC
+(SECRET_KEY) de esos datos, que también queda en CertificadoEntrega. El
+archivo se guarda en STORAGES['certificados'].
+
+Generación en segundo plano: encolar_periodo() reparte las asignaciones del
+período en lotes de LOTE y encola una tarea por lote; con `runworker
+--procesos` los lotes se renderizan en paralelo en el pool de procesos. Cada
+lote lee sus datos en un número fijo de consultas (asignaciones, detalles con
+sus equipos y certificados anteriores; las instituciones salen de
+referencias.py) sin importar cuántas asignaciones tenga. Al regenerar, los
+archivos nuevos se guardan antes de reemplazar las filas y los anteriores se
+borran recién al confirmar: un fallo a medias nunca deja una fila apuntando
+a un archivo borrado.
+
+El ZIP de un período se arma al descargarlo: cada certificado se lee del
+almacenamiento y se envía apenas se comprime.
+
+Verificación: verificar() recalcula la firma con los datos guardados y los
+equipos que hoy tiene la asignación (activos o archivados) y la compara con
+la impresa; así se detecta un código falso o un certificado que ya no
+corresponde a la asignación.
+"""
+import collections
+import hmac
+import io
+import zipfile
+
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.functions import Coalesce
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Asignacion, CertificadoEntrega, DetalleAsignacion, DetalleAsignacionArchivado
+from .referencias import adjuntar
+from .tareas import tarea
+
+# Asignaciones por tarea
+LOTE = 50
+PLANTILLA = 'app1Backend/certificado_entrega.html'
+SAL_FIRMA = 'app1Backend.certificados'
+
+
+def entregadas(desde, hasta):
+    """Asignaciones entregadas cuya última fecha de entrega (o de solicitud, sin fechas) cae en el período."""
+    return (
+        Asignacion.objects.filter(estado='Entregada')
+        .annotate(fecha_certificado=Coalesce(Max('detalleasignacion__fecha_entrega'), 'fecha_solicitud'))
+        .filter(fecha_certificado__range=(desde, hasta))
+    )
+
+def del_periodo(desde, hasta):
+    return CertificadoEntrega.objects.filter(fecha_entrega__range=(desde, hasta))
+
+def encolar_periodo(desde, hasta, regenerar=False):
+    """
+    Encola la generación de los certificados del período (solo los que faltan,
+    o todos con `regenerar`). Retorna la cantidad de asignaciones encoladas.
+    """
+    asignaciones = entregadas(desde, hasta)
+    if not regenerar:
+        asignaciones = asignaciones.exclude(pk__in=CertificadoEntrega.objects.values('id_asignacion'))
+    ids = list(asignaciones.order_by('pk').values_list('pk', flat=True))
+    for inicio in range(0, len(ids), LOTE):
+        generar_certificados.encolar(ids[inicio:inicio + LOTE])
+    return len(ids)
+
+def firmar(id_asignacion, rut_institucion, fecha_entrega, ids_equipos):
+    """Código de verificación de los datos certificados (cambia si cambia cualquiera de ellos)."""
+    datos = f"{id_asignacion}|{rut_institucion}|{fecha_entrega:%Y-%m-%d}|{','.join(map(str, sorted(ids_equipos)))}"
+    return signing.Signer(salt=SAL_FIRMA).signature(datos)
+
+
+@tarea(prioridad=-5)
+def generar_certificados(ids):
+    """Genera (o reemplaza) los certificados de las asignaciones `ids` que siguen entregadas."""
+    asignaciones = list(Asignacion.objects.filter(pk__in=ids, estado='Entregada').order_by('pk'))
+    if not asignaciones:
+        return
+    adjuntar(asignaciones, 'rut_institucion_receptora')
+    detalles = collections.defaultdict(list)
+    for detalle in (DetalleAsignacion.objects.filter(id_asignacion__in=asignaciones)
+                    .select_related('id_equipo').order_by('id_equipo')):
+        detalles[detalle.id_asignacion_id].append(detalle)
+    anteriores = dict(
+        CertificadoEntrega.objects.filter(pk__in=[asignacion.pk for asignacion in asignaciones])
+        .values_list('id_asignacion', 'archivo')
+    )
+
+    almacenamiento = storages['certificados']
+    generado = timezone.now()
+    certificados = []
+    try:
+        _renderizar(asignaciones, detalles, generado, almacenamiento, certificados)
+        # Los anteriores se borran solo si el reemplazo se confirma (y si el nombre cambió)
+        reemplazados = [
+            anteriores[certificado.pk] for certificado in certificados
+            if anteriores.get(certificado.pk, certificado.archivo) != certificado.archivo
+        ]
+        with transaction.atomic():
+            CertificadoEntrega.objects.filter(pk__in=[certificado.pk for certificado in certificados]).delete()
+            CertificadoEntrega.objects.bulk_create(certificados)
+            transaction.on_commit(lambda: _borrar_archivos(almacenamiento, reemplazados), robust=True)
+    except Exception:
+        # Sin filas que los usen, los archivos ya guardados de este lote sobran
+        _borrar_archivos(almacenamiento, [
+            certificado.archivo for certificado in certificados if certificado.archivo not in anteriores.values()
+        ])
+        raise
+
+def _renderizar(asignaciones, detalles, generado, almacenamiento, certificados):
+    # Agrega a `certificados` cada uno apenas se guarda su archivo
+    for asignacion in asignaciones:
+        equipos = detalles[asignacion.pk]
+        institucion = asignacion.rut_institucion_receptora
+        fecha_entrega = max((detalle.fecha_entrega for detalle in equipos if detalle.fecha_entrega),
+                            default=asignacion.fecha_solicitud)
+        firma = firmar(asignacion.pk, institucion.pk, fecha_entrega, [detalle.id_equipo_id for detalle in equipos])
+        html = render_to_string(PLANTILLA, {
+            'asignacion': asignacion,
+            'institucion': institucion,
+            'detalles': equipos,
+            'fecha_entrega': fecha_entrega,
+            'firma': firma,
+            'generado': generado,
+        })
+        archivo = almacenamiento.save(
+            f'certificados/{fecha_entrega:%Y/%m}/certificado-asignacion-{asignacion.pk}.html',
+            ContentFile(html.encode('utf-8')),
+        )
+        certificados.append(CertificadoEntrega(
+            id_asignacion=asignacion.pk,
+            rut_institucion=institucion.pk,
+            fecha_entrega=fecha_entrega,
+            total_equipos=len(equipos),
+            archivo=archivo,
+            firma=firma,
+            fecha_generacion=generado,
+        ))
+
+def _borrar_archivos(almacenamiento, archivos):
+    for archivo in archivos:
+        almacenamiento.delete(archivo)
+
+
+# =========================================================
+# VERIFICACIÓN
+# =========================================================
+
+def verificar(certificados):
+    """
+    {id_asignacion: bool}: si la firma de cada certificado coincide con la
+    recalculada desde sus datos y los equipos actuales de la asignación.
+    Dos consultas sin importar cuántos certificados sean.
+    """
+    certificados = list(certificados)
+    ids = [certificado.id_asignacion for certificado in certificados]
+    equipos = collections.defaultdict(list)
+    # La asignación puede estar archivada: sus detalles están en el archivo
+    for modelo in (DetalleAsignacion, DetalleAsignacionArchivado):
+        for id_asignacion, id_equipo in modelo.objects.filter(id_asignacion__in=ids).values_list('id_asignacion', 'id_equipo'):
+            equipos[id_asignacion].append(id_equipo)
+    return {
+        certificado.id_asignacion: hmac.compare_digest(
+            firmar(certificado.id_asignacion, certificado.rut_institucion, certificado.fecha_entrega,
+                   equipos[certificado.id_asignacion]),
+            certificado.firma,
+        )
+        for certificado in certificados
+    }
+
+def verificar_codigo(id_asignacion, codigo):
+    """
+    Verifica el código impreso en el certificado de la asignación. Retorna
+    (certificado, vigente): certificado es None si el código no es el emitido;
+    vigente es False si la asignación cambió después de emitirlo.
+    """
+    certificado = CertificadoEntrega.objects.filter(pk=id_asignacion).first()
+    if certificado is None or not hmac.compare_digest(codigo.strip(), certificado.firma):
+        return None, False
+    return certificado, verificar([certificado])[certificado.pk]
+
+
+# =========================================================
+# DESCARGA DEL PERÍODO (ZIP)
+# =========================================================
+
+class _Salida(io.RawIOBase):
+    # Destino del ZipFile sin seek: acumula lo escrito hasta que se envía
+    def __init__(self):
+        super().__init__()
+        self.partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def vaciar(self):
+        datos = b''.join(self.partes)
+        self.partes.clear()
+        return datos
+
+
+def zip_certificados(certificados):
+    """Genera por partes (bytes) un ZIP con los archivos de `certificados`, una carpeta por mes."""
+    almacenamiento = storages['certificados']
+    salida = _Salida()
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as archivo_zip:
+        for certificado in certificados:
+            with almacenamiento.open(certificado.archivo, 'rb') as origen:
+                archivo_zip.writestr(
+                    f'{certificado.fecha_entrega:%Y-%m}/certificado-asignacion-{certificado.id_asignacion}.html',
+                    origen.read(),
+                )
+            yield salida.vaciar()
+    yield salida.vaciar()
@@ -0,0 +1,94 @@
+"""
+Cola de trabajo de reacondicionamiento.
+
+Los técnicos ya no eligen equipos desde el listado: presionan "Tomar
+siguiente" y el sistema les asigna el equipo pendiente más antiguo.
+
+- En motores con SELECT ... FOR UPDATE SKIP LOCKED (MySQL 8, MariaDB 10.6,
+  PostgreSQL) cada técnico bloquea una fila distinta sin esperar a los demás.
+- En SQLite (sin bloqueo por fila) se usa un reclamo optimista: se intenta
+  crear el Reacondicionamiento y, si otro técnico ganó (IntegrityError por
+  la PK OneToOne), se prueba con el siguiente candidato.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import (
+    Equipo, DetalleAsignacion, Reacondicionamiento, DetalleAsignacionArchivado, ReacondicionamientoArchivado,
+)
+
+# Candidatos que se prueban en el modo optimista antes de rendirse
+INTENTOS_OPTIMISTAS = 5
+
+
+def equipos_pendientes():
+    """Equipos sin reacondicionamiento y no entregados, del más antiguo al más nuevo."""
+    # También los archivados: un equipo entregado hace años no vuelve a la cola
+    return (
+        Equipo.objects
+        .filter(
+            ~Exists(Reacondicionamiento.objects.filter(id_equipo=OuterRef('pk'))),
+            ~Exists(DetalleAsignacion.objects.filter(id_equipo=OuterRef('pk'))),
+            ~Exists(ReacondicionamientoArchivado.objects.filter(id_equipo=OuterRef('pk'))),
+            ~Exists(DetalleAsignacionArchivado.objects.filter(id_equipo=OuterRef('pk'))),
+        )
+        .order_by('id_equipo')
+    )
+
+def _crear_reclamo(equipo_id, tecnico):
+    return Reacondicionamiento.objects.create(
+        id_equipo_id=equipo_id,
+        id_tecnico=tecnico,
+        estado_final='En Proceso',
+        fecha_inicio=timezone.localdate(),
+        fecha_reclamo=timezone.now(),
+    )
+
+def _reclamar_con_skip_locked(tecnico):
+    with transaction.atomic():
+        ids = list(
+            equipos_pendientes()
+            .select_for_update(skip_locked=True)
+            .values_list('id_equipo', flat=True)[:1]
+        )
+        if not ids:
+            return None
+        return _crear_reclamo(ids[0], tecnico)
+
+def _reclamar_optimista(tecnico):
+    candidatos = list(equipos_pendientes().values_list('id_equipo', flat=True)[:INTENTOS_OPTIMISTAS])
+    for equipo_id in candidatos:
+        try:
+            with transaction.atomic():
+                return _crear_reclamo(equipo_id, tecnico)
+        except IntegrityError:
+            # Otro técnico lo tomó entre la lectura y el INSERT: siguiente candidato
+            continue
+    return None
+
+def reclamar_siguiente(tecnico):
+    """
+    Asigna al técnico el equipo pendiente más antiguo.
+    Retorna el Reacondicionamiento creado o None si la cola está vacía.
+    """
+    if connection.features.has_select_for_update_skip_locked:
+        return _reclamar_con_skip_locked(tecnico)
+    return _reclamar_optimista(tecnico)
+
+def liberar_reclamos_vencidos(horas=None):
+    """
+    Elimina los reclamos que nunca registraron avances dentro del plazo,
+    devolviendo esos equipos a la cola. Retorna la cantidad liberada.
+    """
+    if horas is None:
+        horas = getattr(settings, 'COLA_RECLAMO_HORAS', 24)
+    limite = timezone.now() - datetime.timedelta(hours=horas)
+    eliminados, _ = Reacondicionamiento.objects.filter(
+        fecha_reclamo__lt=limite,
+        estado_final='En Proceso',
+    ).delete()
+    return eliminados
@@ -0,0 +1,263 @@
+"""
+Eliminación en cascada por lotes, con vista previa del impacto.
+
+queryset.delete() usa el Collector de Django: como hay receptores post_delete
+(auditoría, feed de cambios, eventos, facetas) carga en memoria TODOS los
+objetos de la cascada (equipos, reacondicionamientos, detalles) y luego los
+elimina, en una sola transacción. Con una donación de miles de equipos la
+petición se vence.
+
+Aquí la cascada se recorre con las mismas reglas `on_delete` de models.py,
+leídas de los metadatos (las mismas relaciones que revisa el Collector):
+
+- CASCADE: los hijos se eliminan antes que el padre, por lotes de IDs; cada
+  lote (con sus propios descendientes) es una transacción.
+- SET_NULL: un UPDATE por lote.
+- DO_NOTHING con restricción en la BD (ej: Institucion -> Donacion): si hay
+  filas, la BD rechazaría la eliminación, así que se bloquea ANTES de tocar
+  nada. Sin restricción (tablas de archivo) las filas se conservan.
+- PROTECT / RESTRICT con filas: bloquea, igual que el Collector.
+- Otras reglas (SET_DEFAULT, SET(...)) o una cascada cíclica: no se recorren
+  por lotes; la vista previa y la eliminación usan el Collector de Django
+  (queryset.delete(), en una sola transacción).
+
+Por cada lote se informa una sola vez a la auditoría, al feed de cambios
+(y la caché de la API), a los eventos en vivo y al índice de facetas, lo que
+antes hacían las señales objeto por objeto. Si el proceso se interrumpe,
+basta con volver a ejecutarlo: lo ya eliminado no vuelve y el padre sigue ahí.
+"""
+import collections
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models.deletion import Collector, ProtectedError, RestrictedError, get_candidate_relations_to_delete
+
+from . import auditoria, eventos, facetas, referencias
+from .cambios import RECURSOS, registrar_cambios
+from .models import Usuario
+from .tareas import tarea
+
+LOTE = 1000
+
+Paso = collections.namedtuple('Paso', ['modelo', 'campo', 'accion', 'hijos'])
+
+ACCIONES = {
+    models.CASCADE: 'Se eliminan',
+    models.SET_NULL: 'Se desvinculan',
+    models.DO_NOTHING: 'Se conservan',
+    models.PROTECT: 'Bloquean',
+    models.RESTRICT: 'Bloquean',
+}
+
+
+class EliminacionBloqueada(Exception):
+    """Hay registros que impiden la eliminación (ver `bloqueos`)."""
+
+    def __init__(self, bloqueos):
+        self.bloqueos = bloqueos
+        super().__init__(', '.join(f"{cantidad} {nombre}" for nombre, cantidad in bloqueos))
+
+
+# =========================================================
+# PLAN (A PARTIR DE LOS METADATOS)
+# =========================================================
+
+def _plan(modelo, visitados=()):
+    """
+    Pasos de la cascada de `modelo`, o None si alguna relación usa una regla
+    que no se recorre por lotes o la cascada es cíclica (se usa el Collector).
+    """
+    pasos = []
+    for relacion in get_candidate_relations_to_delete(modelo._meta):
+        regla = relacion.on_delete
+        hijo = relacion.related_model
+        if regla not in ACCIONES or (regla is models.CASCADE and hijo in visitados + (modelo,)):
+            return None
+        hijos = _plan(hijo, visitados + (modelo,)) if regla is models.CASCADE else []
+        if hijos is None:
+            return None
+        pasos.append(Paso(hijo, relacion.field.name, regla, hijos))
+    return pasos
+
+def _bloquea(paso):
+    if paso.accion in (models.PROTECT, models.RESTRICT):
+        return True
+    # DO_NOTHING con FK real: la BD rechazaría el DELETE del padre
+    return paso.accion is models.DO_NOTHING and paso.modelo._meta.get_field(paso.campo).db_constraint
+
+def _hijos(paso, padres):
+    # `padres` es un queryset (subconsulta en la vista previa) o una lista de IDs (lotes)
+    return paso.modelo._base_manager.filter(**{f'{paso.campo}__in': padres})
+
+
+# =========================================================
+# VISTA PREVIA
+# =========================================================
+
+def impacto(queryset):
+    """
+    Lo que arrastraría eliminar `queryset`: [{modelo, accion, cantidad, bloquea}],
+    un COUNT por tabla relacionada con subconsultas (sin cargar objetos).
+    """
+    filas = [{
+        'modelo': queryset.model._meta.verbose_name_plural,
+        'accion': ACCIONES[models.CASCADE],
+        'cantidad': queryset.count(),
+        'bloquea': False,
+    }]
+
+    def recorrer(pasos, padres):
+        for paso in pasos:
+            hijos = _hijos(paso, padres.values('pk'))
+            cantidad = hijos.count()
+            if not cantidad:
+                continue
+            filas.append({
+                'modelo': paso.modelo._meta.verbose_name_plural,
+                'accion': 'Bloquean' if _bloquea(paso) else ACCIONES[paso.accion],
+                'cantidad': cantidad,
+                'bloquea': _bloquea(paso),
+            })
+            if paso.hijos:
+                recorrer(paso.hijos, hijos)
+
+    pasos = _plan(queryset.model)
+    if pasos is None:
+        return _impacto_collector(queryset)
+    recorrer(pasos, queryset)
+    return filas
+
+def _impacto_collector(queryset):
+    # Vista previa sin plan: lo que reúne el Collector de delete() (carga los objetos)
+    collector = Collector(using=router.db_for_write(queryset.model), origin=queryset)
+    try:
+        collector.collect(queryset)
+    except (ProtectedError, RestrictedError) as error:
+        objetos = getattr(error, 'protected_objects', None) or error.restricted_objects
+        por_modelo = collections.Counter(objeto._meta.verbose_name_plural for objeto in objetos)
+        return [
+            {'modelo': nombre, 'accion': 'Bloquean', 'cantidad': cantidad, 'bloquea': True}
+            for nombre, cantidad in por_modelo.items()
+        ]
+    cantidades = collections.Counter()
+    for modelo, instancias in collector.data.items():
+        cantidades[modelo._meta.verbose_name_plural] += len(instancias)
+    for hijos in collector.fast_deletes:
+        cantidades[hijos.model._meta.verbose_name_plural] += hijos.count()
+    return [
+        {'modelo': nombre, 'accion': ACCIONES[models.CASCADE], 'cantidad': cantidad, 'bloquea': False}
+        for nombre, cantidad in cantidades.items() if cantidad
+    ]
+
+def bloqueos(filas_impacto):
+    return [(fila['modelo'], fila['cantidad']) for fila in filas_impacto if fila['bloquea']]
+
+def total_eliminados(filas_impacto):
+    return sum(fila['cantidad'] for fila in filas_impacto if fila['accion'] == ACCIONES[models.CASCADE])
+
+
+# =========================================================
+# ELIMINACIÓN POR LOTES
+# =========================================================
+
+def _informar(modelo, ids, filas, usuario):
+    # Lo que harían los receptores post_delete, una vez por lote
+    if modelo in auditoria.MODELOS_AUDITADOS.values():
+        auditoria.registrar_lote(modelo, 'Eliminacion', {
+            fila[modelo._meta.pk.attname]: {campo: [auditoria.serializable(valor), None] for campo, valor in fila.items()}
+            for fila in filas
+        }, usuario)
+    if modelo in RECURSOS.values():
+        registrar_cambios(modelo, ids, 'Eliminacion')
+    eventos.publicar_lote(modelo, ids, 'eliminado')
+    if modelo in facetas.MODELOS_INDICE:
+        transaction.on_commit(facetas.invalidar_indice)
+    referencias.invalidar(modelo)
+
+def _eliminar(modelo, pasos, ids, lote, usuario, conteo):
+    for paso in pasos:
+        if paso.accion is models.CASCADE:
+            while True:
+                lote_hijos = list(_hijos(paso, ids).values_list('pk', flat=True)[:lote])
+                if not lote_hijos:
+                    break
+                _eliminar(paso.modelo, paso.hijos, lote_hijos, lote, usuario, conteo)
+        elif paso.accion is models.SET_NULL:
+            while True:
+                lote_hijos = list(_hijos(paso, ids).values_list('pk', flat=True)[:lote])
+                if not lote_hijos:
+                    break
+                with transaction.atomic():
+                    paso.modelo._base_manager.filter(pk__in=lote_hijos).update(**{paso.campo: None})
+                    if paso.modelo in RECURSOS.values():
+                        registrar_cambios(paso.modelo, lote_hijos, 'Modificacion')
+
+    with transaction.atomic():
+        propias = modelo._base_manager.filter(pk__in=ids)
+        # Se informa solo lo que existe (un reintento puede traer IDs ya eliminados)
+        if modelo in auditoria.MODELOS_AUDITADOS.values():
+            filas = list(propias.values(*[campo.attname for campo in modelo._meta.concrete_fields]))
+            ids = [fila[modelo._meta.pk.attname] for fila in filas]
+        else:
+            filas = []
+            ids = list(propias.values_list('pk', flat=True))
+        # DELETE directo: los hijos ya no existen y los efectos de las señales se informan en _informar
+        propias._raw_delete(propias.db)
+        _informar(modelo, ids, filas, usuario)
+    conteo[modelo._meta.verbose_name_plural] += len(ids)
+
+def eliminar(queryset, lote=LOTE, usuario=None):
+    """
+    Elimina `queryset` y su cascada por lotes. Lanza EliminacionBloqueada si
+    algún registro lo impide (no se elimina nada). Retorna {modelo: cantidad}.
+    """
+    filas = impacto(queryset)
+    if bloqueos(filas):
+        raise EliminacionBloqueada(bloqueos(filas))
+    pasos = _plan(queryset.model)
+    if pasos is None:
+        return _eliminar_con_collector(queryset)
+    conteo = collections.Counter()
+    ids = list(queryset.values_list('pk', flat=True))
+    for inicio in range(0, len(ids), lote):
+        _eliminar(queryset.model, pasos, ids[inicio:inicio + lote], lote, usuario, conteo)
+    return dict(conteo)
+
+def _eliminar_con_collector(queryset):
+    # Sin plan por lotes: delete() de Django, con sus señales, en una transacción
+    try:
+        with transaction.atomic():
+            _, por_etiqueta = queryset.delete()
+    except (ProtectedError, RestrictedError) as error:
+        objetos = getattr(error, 'protected_objects', None) or error.restricted_objects
+        por_modelo = collections.Counter(objeto._meta.verbose_name_plural for objeto in objetos)
+        raise EliminacionBloqueada(list(por_modelo.items()))
+    return {
+        apps.get_model(etiqueta)._meta.verbose_name_plural: cantidad
+        for etiqueta, cantidad in por_etiqueta.items() if cantidad
+    }
+
+@tarea(prioridad=-10, max_intentos=3)
+def eliminar_en_segundo_plano(modelo, pks, id_usuario=None):
+    """Tarea de la cola: `modelo` es 'app_label.Modelo'. Reintentar es seguro (ver docstring del módulo)."""
+    usuario = Usuario.objects.filter(pk=id_usuario).first() if id_usuario else None
+    eliminar(apps.get_model(modelo).objects.filter(pk__in=pks), usuario=usuario)
+
+def eliminar_o_encolar(queryset, usuario=None):
+    """
+    Elimina en la petición si la cascada es chica; si supera
+    ELIMINACION_SEGUNDO_PLANO_FILAS la encola. Retorna (encolada, filas_impacto).
+    Lanza EliminacionBloqueada.
+    """
+    filas = impacto(queryset)
+    if bloqueos(filas):
+        raise EliminacionBloqueada(bloqueos(filas))
+    if total_eliminados(filas) > settings.ELIMINACION_SEGUNDO_PLANO_FILAS:
+        eliminar_en_segundo_plano.encolar(
+            queryset.model._meta.label, list(queryset.values_list('pk', flat=True)),
+            usuario.pk if usuario else None,
+        )
+        return True, filas
+    eliminar(queryset, usuario=usuario)
+    return False, filas
@@ -0,0 +1,115 @@
+"""
+Normalización de las especificaciones de hardware de Equipo.
+
+`ram` y `almacenamiento` son texto libre ("8GB DDR4", "256 GB SSD", "1TB").
+De ellos se extraen columnas numéricas indexadas (ram_gb, almacenamiento_gb,
+almacenamiento_tipo) para poder filtrar por rangos sin leer toda la tabla.
+
+Las columnas se mantienen al guardar (Equipo.save) y el comando
+`normalizar_especificaciones` las completa para los registros existentes.
+"""
+import re
+from functools import lru_cache
+
+_capacidad = re.compile(
+    r'(?:(?P<cantidad>\d+)\s*[x×]\s*)?(?P<valor>\d+(?:[.,]\d+)?)\s*'
+    r'(?P<unidad>terabytes?|tb|t|gigabytes?|gigas?|gb|g|megabytes?|mb|m)?\b',
+    re.IGNORECASE,
+)
+# Primera letra de la unidad -> factor a GB
+_FACTOR_GB = {'t': 1024, 'g': 1, 'm': 1 / 1024}
+
+# Palabra clave (en minúsculas) -> tipo de almacenamiento, se revisan en este orden
+_TIPOS_ALMACENAMIENTO = [
+    ('emmc', 'eMMC'),
+    ('nvme', 'SSD'),
+    ('m.2', 'SSD'),
+    ('ssd', 'SSD'),
+    ('solido', 'SSD'),
+    ('sólido', 'SSD'),
+    ('hdd', 'HDD'),
+    ('disco duro', 'HDD'),
+    ('mecanico', 'HDD'),
+    ('mecánico', 'HDD'),
+    ('rpm', 'HDD'),
+]
+
+
+@lru_cache(maxsize=4096)
+def extraer_capacidad_gb(texto):
+    """
+    Capacidad total en GB (entero) o None si no se reconoce.
+    "8GB DDR4" -> 8, "1TB" -> 1024, "512 MB" -> 0.5 -> 1, "2x8GB" -> 16, "8" -> 8.
+    Con varias capacidades ("256GB SSD + 1TB HDD") se suman.
+    """
+    if not texto:
+        return None
+    total = 0
+    encontrado = False
+    for coincidencia in _capacidad.finditer(texto):
+        # Un número sin unidad solo cuenta si es todo el texto (ej: "8"): evita "DDR4" o "7200 rpm"
+        if coincidencia.group('unidad') is None and coincidencia.group(0).strip() != texto.strip():
+            continue
+        valor = float(coincidencia.group('valor').replace(',', '.'))
+        valor *= _FACTOR_GB[(coincidencia.group('unidad') or 'g')[0].lower()]
+        valor *= int(coincidencia.group('cantidad') or 1)
+        total += valor
+        encontrado = True
+    if not encontrado:
+        return None
+    return max(1, round(total))
+
+@lru_cache(maxsize=4096)
+def extraer_tipo_almacenamiento(texto):
+    """'SSD', 'HDD', 'eMMC' o None."""
+    if not texto:
+        return None
+    texto = texto.lower()
+    for clave, tipo in _TIPOS_ALMACENAMIENTO:
+        if clave in texto:
+            return tipo
+    return None
+
+def normalizar(ram, almacenamiento):
+    """Retorna {ram_gb, almacenamiento_gb, almacenamiento_tipo} a partir del texto libre."""
+    return {
+        'ram_gb': extraer_capacidad_gb(ram),
+        'almacenamiento_gb': extraer_capacidad_gb(almacenamiento),
+        'almacenamiento_tipo': extraer_tipo_almacenamiento(almacenamiento),
+    }
+
+
+# =========================================================
+# FILTROS POR RANGO (LISTADO Y API)
+# =========================================================
+
+# Parámetro GET -> lookup sobre las columnas normalizadas
+FILTROS_RANGO = {
+    'ram_min': 'ram_gb__gte',
+    'ram_max': 'ram_gb__lte',
+    'almacenamiento_min': 'almacenamiento_gb__gte',
+    'almacenamiento_max': 'almacenamiento_gb__lte',
+}
+TIPOS_ALMACENAMIENTO = ['SSD', 'HDD', 'eMMC']
+
+
+def filtrar_por_especificaciones(queryset, parametros):
+    """
+    Aplica ?ram_min, ?ram_max, ?almacenamiento_min, ?almacenamiento_max (GB)
+    y ?almacenamiento_tipo sobre las columnas indexadas.
+    Lanza ValueError(parametro) si un valor no es válido.
+    """
+    filtros = {}
+    for parametro, lookup in FILTROS_RANGO.items():
+        valor = parametros.get(parametro)
+        if valor in (None, ''):
+            continue
+        if not (str(valor).isascii() and str(valor).isdigit()):
+            raise ValueError(parametro)
+        filtros[lookup] = int(valor)
+    tipo = parametros.get('almacenamiento_tipo')
+    if tipo:
+        if tipo not in TIPOS_ALMACENAMIENTO:
+            raise ValueError('almacenamiento_tipo')
+        filtros['almacenamiento_tipo'] = tipo
+    return queryset.filter(**filtros) if filtros else queryset
@@ -0,0 +1,305 @@
+"""
+Hojas de etiquetas con código de barras para los equipos de las donaciones.
+
+Cada etiqueta lleva un código de barras Code 128 con el código del equipo
+(EQ-<id_equipo>), el número de serie, marca y modelo, y la donación. Code 128
+lo leen los lectores láser y las cámaras de los celulares, y se dibuja con
+Pillow (sin dependencias nuevas). equipo_de_codigo() resuelve un código
+escaneado con UNA consulta por índice: la clave primaria, o num_serie (único).
+
+Las hojas son A4 de COLUMNAS x FILAS etiquetas de 63,5 x 33,9 mm (formato
+tipo Avery L7159), a DPI puntos por pulgada. Cada página se dibuja en un
+proceso del pool (dibujar es trabajo de CPU y no libera el GIL) y el PDF se
+arma a medida que llegan las páginas, en orden: la descarga empieza con la
+primera y la memoria no crece con el tamaño del lote.
+
+Los procesos del pool se crean con 'spawn' e importan este módulo sin
+django.setup(): aquí los modelos se importan dentro de las funciones.
+"""
+import collections
+import functools
+import io
+import multiprocessing
+import os
+import threading
+import unicodedata
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from PIL import Image, ImageDraw, ImageFont
+
+PREFIJO = 'EQ-'
+
+DPI = 200
+MM = DPI / 25.4
+PUNTOS_POR_MM = 72 / 25.4
+PAGINA_MM = (210, 297)
+COLUMNAS, FILAS = 3, 8
+ETIQUETA_MM = (63.5, 33.9)
+MARGEN_MM = (7.2, 12.9)        # Izquierdo y superior
+SEPARACION_MM = (2.5, 0)       # Entre columnas y entre filas
+POR_PAGINA = COLUMNAS * FILAS
+
+RELLENO = round(2 * MM)
+ALTO_BARRAS = round(11 * MM)
+# Ancho de la barra más delgada (px) y zona en blanco a cada lado del código (en barras)
+MODULO = 3
+ZONA_SILENCIO = 10
+TAMANO_CODIGO = 22
+TAMANO_TEXTO = 19
+# Fuentes TrueType que se buscan en el sistema (Linux, Windows); si no hay ninguna, la de
+# Pillow, que no tiene tildes: el texto se escribe sin ellas
+FUENTES = ('DejaVuSans.ttf', 'arial.ttf', 'LiberationSans-Regular.ttf')
+# Páginas encargadas al pool por delante de la que se está enviando
+PAGINAS_EN_CURSO = 8
+
+
+# =========================================================
+# CODE 128
+# =========================================================
+
+# Anchos (barra, espacio, barra...) de los símbolos 0 a 106 de Code 128
+PATRONES = (
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312', '132212', '221213',
+    '221312', '231212', '112232', '122132', '122231', '113222', '123122', '123221', '223211', '221132',
+    '221231', '213212', '223112', '312131', '311222', '321122', '321221', '312212', '322112', '322211',
+    '212123', '212321', '232121', '111323', '131123', '131321', '112313', '132113', '132311', '211313',
+    '231113', '231311', '112133', '112331', '132131', '113123', '113321', '133121', '313121', '211331',
+    '231131', '213113', '213311', '213131', '311123', '311321', '331121', '312113', '312311', '332111',
+    '314111', '221411', '431111', '111224', '111422', '121124', '121421', '141122', '141221', '112214',
+    '112412', '122114', '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111',
+    '111242', '121142', '121241', '114212', '124112', '124211', '411212', '421112', '421211', '212141',
+    '214121', '412121', '111143', '111341', '131141', '114113', '114311', '411113', '411311', '113141',
+    '114131', '311141', '411131', '211412', '211214', '211232', '2331112',
+)
+INICIO_B = 104
+PARADA = 106
+
+
+def code128(texto):
+    """
+    Anchos de barras y espacios (en módulos) de `texto` en Code 128,
+    juego B (ASCII imprimible), con el dígito de control.
+    """
+    if not texto or any(not ' ' <= caracter <= '~' for caracter in texto):
+        raise ValueError(f"Code 128 B no admite el texto {texto!r}")
+    valores = [INICIO_B] + [ord(caracter) - 32 for caracter in texto]
+    # El símbolo de inicio y el primer carácter pesan 1; los siguientes, su posición
+    control = sum(valor * max(posicion, 1) for posicion, valor in enumerate(valores)) % 103
+    return ''.join(PATRONES[valor] for valor in valores + [control, PARADA])
+
+def codigo_equipo(id_equipo):
+    return f'{PREFIJO}{id_equipo}'
+
+
+# =========================================================
+# DIBUJO (se ejecuta en los procesos del pool)
+# =========================================================
+
+def _px(mm):
+    return round(mm * MM)
+
+@functools.lru_cache(maxsize=None)
+def _fuente(tamano):
+    # Retorna (fuente, admite tildes). La fuente por defecto de Pillow solo tiene ASCII
+    for nombre in FUENTES:
+        try:
+            return ImageFont.truetype(nombre, tamano), True
+        except OSError:
+            continue
+    return ImageFont.load_default(tamano), False
+
+def _texto(texto, completa):
+    if completa:
+        return texto
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode()
+
+def _recortar(dibujo, texto, fuente, ancho):
+    if dibujo.textlength(texto, font=fuente) <= ancho:
+        return texto
+    while texto and dibujo.textlength(texto + '...', font=fuente) > ancho:
+        texto = texto[:-1]
+    return texto + '...'
+
+def _dibujar_etiqueta(dibujo, x, y, etiqueta):
+    ancho = _px(ETIQUETA_MM[0]) - 2 * RELLENO
+    x, y = x + RELLENO, y + RELLENO
+    anchos = code128(etiqueta['codigo'])
+    modulos = sum(int(a) for a in anchos) + 2 * ZONA_SILENCIO
+    # Códigos largos (IDs de muchos dígitos): barras más delgadas antes que cortar la zona en blanco
+    modulo = MODULO if modulos * MODULO <= ancho else max(ancho // modulos, 1)
+    barra = x + (ancho - modulos * modulo) // 2 + ZONA_SILENCIO * modulo
+    for posicion, unidades in enumerate(anchos):
+        grosor = int(unidades) * modulo
+        if posicion % 2 == 0:
+            dibujo.rectangle([barra, y, barra + grosor - 1, y + ALTO_BARRAS - 1], fill=0)
+        barra += grosor
+    y += ALTO_BARRAS + 4
+    fuente, _ = _fuente(TAMANO_CODIGO)
+    dibujo.text((x + ancho // 2, y), etiqueta['codigo'], font=fuente, fill=0, anchor='mt')
+    y += TAMANO_CODIGO + 6
+    fuente, completa = _fuente(TAMANO_TEXTO)
+    for linea in etiqueta['lineas']:
+        dibujo.text((x, y), _recortar(dibujo, _texto(linea, completa), fuente, ancho), font=fuente, fill=0)
+        y += TAMANO_TEXTO + 5
+
+def dibujar_pagina(etiquetas):
+    """Página A4 (imagen de 1 bit) con hasta POR_PAGINA etiquetas."""
+    imagen = Image.new('1', (_px(PAGINA_MM[0]), _px(PAGINA_MM[1])), 1)
+    dibujo = ImageDraw.Draw(imagen)
+    for indice, etiqueta in enumerate(etiquetas):
+        fila, columna = divmod(indice, COLUMNAS)
+        x = _px(MARGEN_MM[0] + columna * (ETIQUETA_MM[0] + SEPARACION_MM[0]))
+        y = _px(MARGEN_MM[1] + fila * (ETIQUETA_MM[1] + SEPARACION_MM[1]))
+        _dibujar_etiqueta(dibujo, x, y, etiqueta)
+    return imagen
+
+def renderizar_pagina(etiquetas, formato):
+    """
+    Bytes de la página: 'png' es un archivo PNG; 'pdf', los pixeles de 1 bit
+    comprimidos con zlib (el flujo de imagen que va dentro del PDF).
+    """
+    imagen = dibujar_pagina(etiquetas)
+    if formato == 'png':
+        salida = io.BytesIO()
+        imagen.save(salida, 'PNG', optimize=True, dpi=(DPI, DPI))
+        return salida.getvalue()
+    return zlib.compress(imagen.tobytes())
+
+
+# =========================================================
+# PÁGINAS Y PDF
+# =========================================================
+
+_pool = None
+_lock_pool = threading.Lock()
+
+def pool():
+    """Pool de procesos de este proceso web (ETIQUETAS_PROCESOS), o None si es 0."""
+    global _pool
+    if not settings.ETIQUETAS_PROCESOS:
+        return None
+    with _lock_pool:
+        if _pool is None:
+            _pool = nuevo_pool(settings.ETIQUETAS_PROCESOS)
+        return _pool
+
+def nuevo_pool(procesos):
+    return ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context('spawn'))
+
+def _reiniciar_en_hijo():
+    # Un proceso creado con fork no puede usar el pool (ni el lock) del padre
+    global _pool, _lock_pool
+    _pool = None
+    _lock_pool = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
+
+def paginas(etiquetas, formato='pdf', ejecutor=None):
+    """
+    Genera las páginas renderizadas (ver renderizar_pagina), en orden y a
+    medida que terminan. Con `ejecutor` se dibujan en paralelo, con a lo sumo
+    PAGINAS_EN_CURSO encargadas; sin él, en este hilo.
+    """
+    grupos = (etiquetas[inicio:inicio + POR_PAGINA] for inicio in range(0, len(etiquetas), POR_PAGINA))
+    if ejecutor is None:
+        for grupo in grupos:
+            yield renderizar_pagina(grupo, formato)
+        return
+    en_curso = collections.deque()
+    try:
+        for grupo in grupos:
+            en_curso.append(ejecutor.submit(renderizar_pagina, grupo, formato))
+            if len(en_curso) >= PAGINAS_EN_CURSO:
+                yield en_curso.popleft().result()
+        while en_curso:
+            yield en_curso.popleft().result()
+    finally:
+        # La descarga se cortó: no se dibujan las páginas que nadie va a recibir
+        for futuro in en_curso:
+            futuro.cancel()
+
+def pdf(paginas_pdf):
+    """
+    Genera un PDF por partes (bytes) a partir de las páginas en formato 'pdf'.
+    El catálogo de páginas y la tabla xref van al final: no hace falta tener
+    todas las páginas para empezar a enviar el archivo.
+    """
+    ancho, alto = _px(PAGINA_MM[0]), _px(PAGINA_MM[1])
+    ancho_pt, alto_pt = PAGINA_MM[0] * PUNTOS_POR_MM, PAGINA_MM[1] * PUNTOS_POR_MM
+    desplazamientos = {}
+    posicion = 0
+
+    def objeto(numero, cuerpo):
+        nonlocal posicion
+        desplazamientos[numero] = posicion
+        datos = b'%d 0 obj\n%s\nendobj\n' % (numero, cuerpo)
+        posicion += len(datos)
+        return datos
+
+    def flujo(diccionario, datos):
+        return b'<< %s /Length %d >>\nstream\n%s\nendstream' % (diccionario, len(datos), datos)
+
+    cabecera = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    posicion = len(cabecera)
+    yield cabecera
+    # 1: catálogo, 2: árbol de páginas (al final), desde 3: imagen, contenido y página de cada hoja
+    yield objeto(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    hojas = []
+    numero = 3
+    contenido = b'q %.2f 0 0 %.2f 0 0 cm /Hoja Do Q' % (ancho_pt, alto_pt)
+    for datos in paginas_pdf:
+        yield objeto(numero, flujo(
+            b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray '
+            b'/BitsPerComponent 1 /Filter /FlateDecode' % (ancho, alto), datos))
+        yield objeto(numero + 1, flujo(b'', contenido))
+        yield objeto(numero + 2, b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+                                 b'/Resources << /XObject << /Hoja %d 0 R >> >> /Contents %d 0 R >>'
+                                 % (ancho_pt, alto_pt, numero, numero + 1))
+        hojas.append(numero + 2)
+        numero += 3
+    yield objeto(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % hoja for hoja in hojas), len(hojas)))
+    xref = [b'xref\n0 %d\n' % numero, b'0000000000 65535 f \n']
+    xref += [b'%010d 00000 n \n' % desplazamientos[indice] for indice in range(1, numero)]
+    yield b''.join(xref) + b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (numero, posicion)
+
+
+# =========================================================
+# DATOS DE LOS EQUIPOS
+# =========================================================
+
+def etiquetas_de(equipos):
+    """Datos (serializables, para el pool) de las etiquetas de `equipos`, en orden de ID."""
+    from .referencias import adjuntar
+    equipos = list(equipos.select_related('id_donacion').order_by('id_equipo'))
+    adjuntar(equipos, 'id_donacion__rut_institucion')
+    etiquetas = []
+    for equipo in equipos:
+        donacion = equipo.id_donacion
+        etiquetas.append({
+            'codigo': codigo_equipo(equipo.pk),
+            'lineas': [
+                f"S/N: {equipo.num_serie or 'N/A'}",
+                ' '.join(filter(None, [equipo.tipo, equipo.marca, equipo.modelo])),
+                f"Donación #{donacion.pk} · {donacion.rut_institucion.nombre}",
+            ],
+        })
+    return etiquetas
+
+def equipo_de_codigo(codigo):
+    """
+    Equipo de un código escaneado o tipeado: 'EQ-<id>' (las etiquetas) o el
+    número de serie del fabricante. Una consulta por índice; None si no existe.
+    """
+    from .models import Equipo
+    codigo = codigo.strip()
+    if not codigo:
+        return None
+    if codigo.upper().startswith(PREFIJO):
+        id_equipo = codigo[len(PREFIJO):]
+        return Equipo.objects.filter(pk=int(id_equipo)).first() if id_equipo.isascii() and id_equipo.isdigit() else None
+    return Equipo.objects.filter(num_serie=codigo).first()
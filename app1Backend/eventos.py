@@ -0,0 +1,205 @@
+"""
+Eventos en vivo (Server-Sent Events) para los listados de Soporte,
+Asignación y Reacondicionamiento.
+
+Al confirmarse un cambio se renderiza UNA vez la fila HTML del listado
+(una versión por rol que puede verlo) y se publica en la central de eventos
+del proceso. Las conexiones SSE abiertas (vista `eventos`, servida por la
+app ASGI) leen de la central y el script eventos_vivo.js reemplaza o
+agrega la fila en la tabla, sin recargar el listado completo.
+
+La central es en memoria y por proceso: los cambios deben hacerse en el
+mismo proceso ASGI que atiende las conexiones SSE. El ID de cada evento
+lleva la época del proceso (`<época>-<secuencia>`): un Last-Event-ID de otro
+proceso, o de antes de un reinicio, no se compara con la secuencia local.
+"""
+import asyncio
+import collections
+import json
+import os
+import threading
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.template.loader import render_to_string
+
+from .models import Soporte, Asignacion, Reacondicionamiento
+
+# Eventos recientes que se conservan para reenviar tras una reconexión (Last-Event-ID)
+CAPACIDAD_EVENTOS = 500
+
+Evento = collections.namedtuple('Evento', ['secuencia', 'modelo', 'mensaje'])
+
+
+class CentralEventos:
+    """
+    Difusión de eventos en el proceso, pensada para muchas conexiones inactivas.
+
+    Los eventos se guardan una sola vez en un buffer circular, ya codificados
+    en formato SSE; cada conexión solo recuerda la última secuencia enviada y
+    espera un asyncio.Event compartido por todas las conexiones de su event
+    loop. No hay una cola por conexión.
+
+    publicar() puede llamarse desde cualquier hilo (vistas síncronas).
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_EVENTOS):
+        self._eventos = collections.deque(maxlen=capacidad)
+        self._iniciar()
+        if hasattr(os, 'register_at_fork'):
+            # Un worker creado con fork (ej: gunicorn --preload) es otro proceso: otra época
+            os.register_at_fork(after_in_child=self._iniciar)
+
+    def _iniciar(self):
+        # PID e instante de inicio (ms): distinguen este proceso de otros y de un reinicio
+        self.epoca = f'{os.getpid()}.{time.time_ns() // 1_000_000}'
+        self._eventos.clear()
+        self._secuencia = 0
+        self._lock = threading.Lock()
+        self._avisos = {}  # event loop -> asyncio.Event de la próxima publicación
+        self.conectados = 0
+        # Si nunca hubo una conexión (ej: proceso WSGI) no vale la pena publicar
+        self.activa = False
+
+    def publicar(self, modelo, datos):
+        data = json.dumps(datos, cls=DjangoJSONEncoder)
+        with self._lock:
+            self._secuencia += 1
+            mensaje = f"id: {self.epoca}-{self._secuencia}\nevent: {modelo}\ndata: {data}\n\n".encode()
+            self._eventos.append(Evento(self._secuencia, modelo, mensaje))
+            loops = list(self._avisos)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._despertar, loop)
+            except RuntimeError:  # El event loop ya se cerró
+                with self._lock:
+                    self._avisos.pop(loop, None)
+
+    def _despertar(self, loop):
+        # Corre dentro del event loop: despierta a todas sus conexiones de una vez
+        with self._lock:
+            aviso = self._avisos.pop(loop, None)
+        if aviso is not None:
+            aviso.set()
+
+    def _aviso(self, loop):
+        with self._lock:
+            if loop not in self._avisos:
+                self._avisos[loop] = asyncio.Event()
+            return self._avisos[loop]
+
+    def secuencia(self, ultimo_id):
+        """
+        Secuencia local de un Last-Event-ID, o None si no es de esta época
+        (otro proceso o antes de un reinicio): entonces se sigue desde ahora,
+        porque su secuencia no dice nada de lo que falta aquí.
+        """
+        epoca, _, secuencia = ultimo_id.rpartition('-')
+        if epoca != self.epoca or not (secuencia.isascii() and secuencia.isdigit()):
+            return None
+        return int(secuencia)
+
+    def _posteriores(self, ultimo):
+        # Se recorre desde el final: el costo depende solo de los eventos nuevos
+        with self._lock:
+            nuevos = []
+            for evento in reversed(self._eventos):
+                if evento.secuencia <= ultimo:
+                    break
+                nuevos.append(evento)
+        nuevos.reverse()
+        return nuevos
+
+    async def escuchar(self, ultimo=None, latido=15, duracion=600):
+        """
+        Genera los eventos posteriores a la secuencia `ultimo` (o los nuevos si es None).
+        Genera None cada `latido` segundos sin eventos y termina tras `duracion` segundos.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.conectados += 1
+            self.activa = True
+            if ultimo is None:
+                ultimo = self._secuencia
+        fin = loop.time() + duracion
+        try:
+            while loop.time() < fin:
+                # El aviso se toma ANTES de leer: una publicación intermedia lo deja activado
+                aviso = self._aviso(loop)
+                nuevos = self._posteriores(ultimo)
+                if nuevos:
+                    for evento in nuevos:
+                        yield evento
+                    ultimo = nuevos[-1].secuencia
+                    continue
+                try:
+                    await asyncio.wait_for(aviso.wait(), timeout=max(0, min(latido, fin - loop.time())))
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self.conectados -= 1
+
+
+central_eventos = CentralEventos()
+
+
+# =========================================================
+# PUBLICACIÓN DE CAMBIOS
+# =========================================================
+
+# Modelo -> (plantilla de la fila, relaciones que usa la fila, roles que ven el listado)
+LISTADOS = {
+    'soporte': (
+        'app1Backend/_fila_soporte.html',
+        ['id_asignacion__rut_institucion_receptora', 'id_tecnico'],
+        ['Administrador', 'Tecnico'],
+    ),
+    'asignacion': (
+        'app1Backend/_fila_asignacion.html',
+        ['rut_institucion_receptora'],
+        ['Administrador'],
+    ),
+    'reacondicionamiento': (
+        'app1Backend/_fila_reacondicionamiento.html',
+        ['id_equipo', 'id_tecnico'],
+        ['Administrador', 'Tecnico'],
+    ),
+}
+
+def _publicar(modelo, pk, accion):
+    nombre = modelo._meta.model_name
+    plantilla, relaciones, roles = LISTADOS[nombre]
+    filas = {}
+    if accion != 'eliminado':
+        objeto = modelo.objects.select_related(*relaciones).filter(pk=pk).first()
+        if objeto is None:
+            return
+        filas = {rol: render_to_string(plantilla, {'item': objeto, 'user': {'rol': rol}}) for rol in roles}
+    central_eventos.publicar(nombre, {'id': pk, 'accion': accion, 'filas': filas})
+
+def _cambio_guardado(sender, instance, created, raw=False, **kwargs):
+    if raw or not central_eventos.activa:
+        return
+    pk, accion = instance.pk, 'creado' if created else 'actualizado'
+    transaction.on_commit(lambda: _publicar(sender, pk, accion))
+
+def _cambio_eliminado(sender, instance, **kwargs):
+    if not central_eventos.activa:
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: _publicar(sender, pk, 'eliminado'))
+
+def publicar_lote(modelo, pks, accion):
+    """Publica (al confirmar) el evento de varios objetos de una operación masiva, que no emite señales."""
+    if modelo._meta.model_name not in LISTADOS or not central_eventos.activa:
+        return
+    pks = list(pks)
+    transaction.on_commit(lambda: [_publicar(modelo, pk, accion) for pk in pks])
+
+
+for _modelo in (Soporte, Asignacion, Reacondicionamiento):
+    post_save.connect(_cambio_guardado, sender=_modelo, dispatch_uid=f'eventos_save_{_modelo._meta.model_name}')
+    post_delete.connect(_cambio_eliminado, sender=_modelo, dispatch_uid=f'eventos_delete_{_modelo._meta.model_name}')
@@ -0,0 +1,229 @@
+"""
+Filtros por facetas del listado de equipos (HTML y API).
+
+Facetas: tipo, marca, institución donante, estado de reacondicionamiento y
+tramo de RAM. Los conteos son "disyuntivos": cada faceta se cuenta con todos
+los filtros aplicados EXCEPTO los suyos, para que al marcar "Laptop" sigan
+viéndose los conteos de "Desktop" y se pueda ampliar la selección.
+
+Todas las facetas se cuentan en UNA sola consulta: un GROUP BY por faceta,
+unidos con UNION ALL. Sin filtros activos el resultado se guarda en caché
+(el "índice de facetas") y se invalida al cambiar equipos, donaciones,
+instituciones o reacondicionamientos; las operaciones masivas sin señales
+se reflejan al vencer la caché (SEGUNDOS_CACHE).
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import post_save, post_delete
+
+from .metricas import registrar_cache
+from .models import Institucion, Donacion, Equipo, Reacondicionamiento
+
+SIN_REACONDICIONAR = 'Sin reacondicionar'
+SIN_DATO = 'Sin dato'
+
+# Tramo -> (etiqueta, ram_gb mínimo, ram_gb máximo). El filtro usa el índice de ram_gb.
+TRAMOS_RAM = {
+    'hasta-4': ('Hasta 4 GB', None, 4),
+    '5-8': ('5 a 8 GB', 5, 8),
+    '9-16': ('9 a 16 GB', 9, 16),
+    'mas-16': ('Más de 16 GB', 17, None),
+}
+
+def _q_tramo(tramo):
+    if tramo == SIN_DATO:
+        return Q(ram_gb__isnull=True)
+    _, minimo, maximo = TRAMOS_RAM[tramo]
+    q = Q()
+    if minimo is not None:
+        q &= Q(ram_gb__gte=minimo)
+    if maximo is not None:
+        q &= Q(ram_gb__lte=maximo)
+    return q
+
+def _q_campo(campo):
+    def a_q(valor):
+        if valor == SIN_DATO:
+            return Q(**{f'{campo}__isnull': True}) | Q(**{campo: ''})
+        return Q(**{campo: valor})
+    return a_q
+
+def _q_estado(estado):
+    # Un reacondicionamiento archivado sigue contando como el estado del equipo
+    if estado == SIN_REACONDICIONAR:
+        return Q(reacondicionamiento__isnull=True, reacondicionamiento_archivado__isnull=True)
+    return Q(reacondicionamiento__estado_final=estado) | Q(reacondicionamiento_archivado__estado_final=estado)
+
+def _expresion_estado():
+    return Coalesce(
+        F('reacondicionamiento__estado_final'),
+        F('reacondicionamiento_archivado__estado_final'),
+        Value(SIN_REACONDICIONAR),
+    )
+
+def _expresion_tramo():
+    casos = [When(_q_tramo(tramo), then=Value(tramo)) for tramo in TRAMOS_RAM]
+    return Case(*casos, default=Value(SIN_DATO), output_field=CharField())
+
+# Faceta (parámetro GET) -> (título, expresión del valor, expresión de la etiqueta, valor -> Q)
+FACETAS = {
+    'tipo': ('Tipo', F('tipo'), F('tipo'), _q_campo('tipo')),
+    'marca': ('Marca', F('marca'), F('marca'), _q_campo('marca')),
+    'institucion': (
+        'Institución donante',
+        F('id_donacion__rut_institucion'),
+        F('id_donacion__rut_institucion__nombre'),
+        _q_campo('id_donacion__rut_institucion'),
+    ),
+    'estado': (
+        'Reacondicionamiento',
+        _expresion_estado(),
+        _expresion_estado(),
+        _q_estado,
+    ),
+    'ram': ('RAM', _expresion_tramo(), _expresion_tramo(), _q_tramo),
+}
+
+CLAVE_CACHE = 'facetas_equipo:{version}'
+# Modelos cuyos cambios invalidan el índice
+MODELOS_INDICE = (Institucion, Donacion, Equipo, Reacondicionamiento)
+CLAVE_VERSION = 'facetas_equipo:version'
+SEGUNDOS_CACHE = 300
+
+
+# =========================================================
+# SELECCIÓN Y FILTRO
+# =========================================================
+
+def seleccion_de(parametros):
+    """{faceta: [valores]} elegidos en la petición (cada faceta admite varios valores)."""
+    seleccion = {}
+    for faceta in FACETAS:
+        valores = [valor for valor in parametros.getlist(faceta) if valor]
+        if faceta == 'ram':
+            for valor in valores:
+                if valor != SIN_DATO and valor not in TRAMOS_RAM:
+                    raise ValueError(faceta)
+        if valores:
+            seleccion[faceta] = valores
+    return seleccion
+
+def _q_seleccion(seleccion, excepto=None):
+    # Valores de una misma faceta: OR. Entre facetas: AND.
+    q = Q()
+    for faceta, valores in seleccion.items():
+        if faceta == excepto:
+            continue
+        a_q = FACETAS[faceta][3]
+        alternativas = Q()
+        for valor in valores:
+            alternativas |= a_q(valor)
+        q &= alternativas
+    return q
+
+def filtrar_por_facetas(queryset, seleccion):
+    return queryset.filter(_q_seleccion(seleccion)) if seleccion else queryset
+
+
+# =========================================================
+# CONTEOS
+# =========================================================
+
+def _contar(queryset, seleccion):
+    ramas = []
+    for faceta, (_, valor, etiqueta, _) in FACETAS.items():
+        ramas.append(
+            queryset.filter(_q_seleccion(seleccion, excepto=faceta))
+            .order_by()
+            .annotate(
+                faceta=Value(faceta, output_field=CharField()),
+                valor=Cast(valor, CharField(max_length=150)),
+                etiqueta=Cast(etiqueta, CharField(max_length=150)),
+            )
+            .values_list('faceta', 'valor', 'etiqueta')
+            .annotate(cantidad=Count('pk'))
+        )
+    return list(ramas[0].union(*ramas[1:], all=True))
+
+def _version():
+    # Desde el reloj (como cache_api.py): si la caché desaloja la versión, la nueva
+    # no puede apuntar a un índice viejo que aún siga guardado
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, time.time_ns(), None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+def invalidar_indice(**kwargs):
+    # Un valor nuevo en vez de incr(): en la caché de archivos incr() es leer y escribir,
+    # y dos invalidaciones simultáneas dejarían el mismo número
+    cache.set(CLAVE_VERSION, time.time_ns(), None)
+
+def contar_facetas(queryset, seleccion, filtrado=True):
+    """
+    Retorna [{faceta, titulo, valores: [{valor, etiqueta, cantidad, activo}]}].
+
+    `queryset` ya debe tener aplicados los filtros que no son facetas (búsqueda,
+    rangos). Si `filtrado` es False y no hay selección, se usa el índice en caché.
+    """
+    if not filtrado and not seleccion:
+        clave = CLAVE_CACHE.format(version=_version())
+        filas = cache.get(clave)
+        registrar_cache('facetas', acierto=filas is not None)
+        if filas is None:
+            filas = _contar(queryset, seleccion)
+            cache.set(clave, filas, SEGUNDOS_CACHE)
+    else:
+        filas = _contar(queryset, seleccion)
+
+    por_faceta = {faceta: {} for faceta in FACETAS}
+    for faceta, valor, etiqueta, cantidad in filas:
+        # NULL y '' quedan juntos como "Sin dato"
+        valor = valor or SIN_DATO
+        if faceta == 'ram':
+            etiqueta = TRAMOS_RAM[valor][0] if valor in TRAMOS_RAM else SIN_DATO
+        if valor in por_faceta[faceta]:
+            por_faceta[faceta][valor]['cantidad'] += cantidad
+            continue
+        por_faceta[faceta][valor] = {
+            'valor': valor,
+            'etiqueta': etiqueta or SIN_DATO,
+            'cantidad': cantidad,
+            'activo': valor in seleccion.get(faceta, []),
+        }
+    # Un valor elegido sin equipos igual se muestra, para poder quitarlo
+    for faceta, valores in seleccion.items():
+        for valor in valores:
+            if valor not in por_faceta[faceta]:
+                etiqueta = TRAMOS_RAM[valor][0] if faceta == 'ram' and valor in TRAMOS_RAM else valor
+                por_faceta[faceta][valor] = {'valor': valor, 'etiqueta': etiqueta, 'cantidad': 0, 'activo': True}
+
+    resultado = []
+    for faceta, valores in por_faceta.items():
+        valores = list(valores.values())
+        if faceta == 'ram':
+            orden = list(TRAMOS_RAM) + [SIN_DATO]
+            valores.sort(key=lambda v: orden.index(v['valor']))
+        else:
+            valores.sort(key=lambda v: (-v['cantidad'], v['etiqueta']))
+        resultado.append({'faceta': faceta, 'titulo': FACETAS[faceta][0], 'valores': valores})
+    return resultado
+
+def enlace_alternado(parametros, faceta, valor):
+    """Query string que agrega o quita `valor` de la faceta, conservando el resto de los filtros."""
+    parametros = parametros.copy()
+    valores = parametros.getlist(faceta)
+    if valor in valores:
+        valores.remove(valor)
+    else:
+        valores.append(valor)
+    parametros.setlist(faceta, valores)
+    return '?' + parametros.urlencode()
+
+
+for _modelo in MODELOS_INDICE:
+    post_save.connect(invalidar_indice, sender=_modelo, dispatch_uid=f'facetas_save_{_modelo._meta.model_name}')
+    post_delete.connect(invalidar_indice, sender=_modelo, dispatch_uid=f'facetas_delete_{_modelo._meta.model_name}')
@@ -3,6 +3,7 @@ from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import password_validation
 from django.core.exceptions import ValidationError
 from .models import Institucion, Usuario, Donacion, Equipo, Asignacion, DetalleAsignacion, Reacondicionamiento, Soporte
+from .referencias import usar_referencia
 import re # Para validación de RUT
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 # --- Definición de Opciones (Choices) para los campos ENUM ---
@@ -162,6 +163,10 @@ class DonacionForm(forms.ModelForm):
             'rut_institucion': 'Institución Donante',
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        usar_referencia(self.fields['rut_institucion'], 'instituciones')
+
 
 class EquipoForm(forms.ModelForm):
     tipo = forms.ChoiceField(choices=TIPO_EQUIPO_CHOICES, widget=forms.Select(attrs={'class': 'form-select'}), label="Tipo de Equipo")
@@ -198,6 +203,10 @@ class AsignacionForm(forms.ModelForm):
             'rut_institucion_receptora': 'Institución Receptora',
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        usar_referencia(self.fields['rut_institucion_receptora'], 'instituciones')
+
 class DetalleAsignacionForm(forms.ModelForm):
     class Meta:
         model = DetalleAsignacion
@@ -358,7 +367,7 @@ class ReacondicionamientoTecnicoForm(forms.ModelForm):
     )
     class Meta:
         model = Reacondicionamiento
-        fields = '__all__'
+        exclude = ['fecha_reclamo']
         widgets = {
             'id_tecnico': forms.Select(attrs={'class': 'form-select'}),
             'taller_asignado': forms.TextInput(attrs={'class': 'form-control'}),
@@ -372,6 +381,7 @@ class ReacondicionamientoTecnicoForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['id_tecnico'].queryset = Usuario.objects.filter(rol='Tecnico')
+        usar_referencia(self.fields['id_tecnico'], 'tecnicos')
         readonly_fields = ['id_equipo', 'fecha_inicio']
         for field in readonly_fields:
             if field in self.fields:
@@ -399,6 +409,7 @@ class SoporteTecnicoForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['id_tecnico'].queryset = Usuario.objects.filter(rol='Tecnico')
+        usar_referencia(self.fields['id_tecnico'], 'tecnicos')
         readonly_fields = ['id_asignacion', 'tipo']
         for field in readonly_fields:
             if field in self.fields:
@@ -413,4 +424,8 @@ class DonacionVoluntarioForm(forms.ModelForm):
         widgets = {
             'rut_institucion': forms.Select(attrs={'class': 'form-select'}),
             'total_equipos': forms.NumberInput(attrs={'class': 'form-control', 'min': 1}),
-        }
\ No newline at end of file
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        usar_referencia(self.fields['rut_institucion'], 'instituciones')
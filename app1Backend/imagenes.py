@@ -0,0 +1,63 @@
+"""
+Optimización de las fotos de Equipo.
+
+Las fotos se suben tal como vienen del celular (varios MB, 4000 px). Tras
+guardar el equipo se encola `optimizar_imagen_equipo`: el worker la reduce a
+EQUIPO_IMAGEN_LADO_MAXIMO px, corrige la orientación EXIF, la recomprime y
+reemplaza el archivo. La petición no espera este trabajo de CPU.
+"""
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .cambios import registrar_cambios
+from .models import Equipo
+from .tareas import tarea
+
+CALIDAD_JPEG = 85
+
+
+def _tiene_transparencia(imagen):
+    return imagen.mode in ('RGBA', 'LA') or (imagen.mode == 'P' and 'transparency' in imagen.info)
+
+@tarea(prioridad=-5)
+def optimizar_imagen_equipo(id_equipo, nombre):
+    """Reduce y recomprime la foto `nombre` del equipo, si sigue siendo su foto actual."""
+    equipo = Equipo.objects.filter(pk=id_equipo).only('imagen').first()
+    # El equipo se eliminó o ya cambió de foto: nada que hacer
+    if equipo is None or equipo.imagen.name != nombre:
+        return
+    lado = settings.EQUIPO_IMAGEN_LADO_MAXIMO
+    with equipo.imagen.open('rb') as archivo:
+        imagen = Image.open(archivo)
+        imagen.load()
+    if max(imagen.size) <= lado:
+        return
+
+    imagen = ImageOps.exif_transpose(imagen)
+    imagen.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+    salida = io.BytesIO()
+    if _tiene_transparencia(imagen):
+        imagen.save(salida, 'PNG', optimize=True)
+        extension = '.png'
+    else:
+        imagen.convert('RGB').save(salida, 'JPEG', quality=CALIDAD_JPEG, optimize=True, progressive=True)
+        extension = '.jpg'
+
+    almacenamiento = equipo.imagen.storage
+    nuevo = almacenamiento.save(os.path.splitext(nombre)[0] + extension, ContentFile(salida.getvalue()))
+    # Condicionado a la foto original: si la cambiaron mientras tanto, gana la nueva
+    if Equipo.objects.filter(pk=id_equipo, imagen=nombre).update(imagen=nuevo):
+        almacenamiento.delete(nombre)
+        # update() no emite señales: se informa al feed de cambios de la API
+        registrar_cambios(Equipo, [id_equipo], 'Modificacion')
+    else:
+        almacenamiento.delete(nuevo)
+
+def encolar_optimizacion(equipo):
+    """Encola la optimización de la foto del equipo recién guardado, si tiene una."""
+    if equipo.imagen:
+        optimizar_imagen_equipo.encolar(equipo.pk, equipo.imagen.name)
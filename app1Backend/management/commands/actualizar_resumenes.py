@@ -0,0 +1,55 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from app1Backend.analitica import RESUMENES, DIAS_POR_LOTE, DIAS_REPROCESO, procesar_rango, rango_incremental
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza las tablas de resumen diario (donaciones, reacondicionamientos, soportes). "
+        "Sin --desde procesa de forma incremental desde la última fecha registrada."
+    )
+    # Se ejecuta periódicamente (cron): sin system checks no se importan URLconf, vistas ni DRF
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumen', choices=sorted(RESUMENES), action='append',
+                            help='Resumen a procesar (se puede repetir). Por defecto todos.')
+        parser.add_argument('--desde', help='Fecha inicial YYYY-MM-DD para un backfill completo.')
+        parser.add_argument('--hasta', help='Fecha final YYYY-MM-DD (por defecto hoy).')
+        parser.add_argument('--dias-por-lote', type=int, default=DIAS_POR_LOTE,
+                            help=f'Días procesados por transacción (por defecto {DIAS_POR_LOTE}).')
+        parser.add_argument('--dias-reproceso', type=int, default=DIAS_REPROCESO,
+                            help=f'Días hacia atrás que se recalculan en modo incremental (por defecto {DIAS_REPROCESO}).')
+
+    def _fecha(self, valor):
+        try:
+            return datetime.date.fromisoformat(valor)
+        except ValueError:
+            raise CommandError(f"Fecha inválida: {valor} (formato YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        if options['dias_por_lote'] < 1:
+            raise CommandError("--dias-por-lote debe ser mayor a 0")
+
+        hasta = self._fecha(options['hasta']) if options['hasta'] else timezone.localdate()
+        for nombre in options['resumen'] or sorted(RESUMENES):
+            if options['desde']:
+                rango = (self._fecha(options['desde']), hasta)
+            else:
+                rango = rango_incremental(nombre, options['dias_reproceso'])
+                if rango:
+                    rango = (rango[0], hasta)
+
+            if rango is None:
+                self.stdout.write(f"{nombre}: sin datos para resumir.")
+                continue
+
+            lotes = 0
+            for inicio, fin in procesar_rango(nombre, rango[0], rango[1], options['dias_por_lote']):
+                lotes += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{nombre}: {inicio} a {fin} procesado.")
+            self.stdout.write(self.style.SUCCESS(f"{nombre}: {lotes} lote(s) procesado(s) ({rango[0]} a {rango[1]})."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app1Backend.archivo import ARCHIVOS, LOTE, archivar, fecha_corte
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve a las tablas de archivo los soportes resueltos, asignaciones entregadas y "
+        "reacondicionamientos terminados hace más de ARCHIVO_DIAS. Trabaja por lotes, cada uno "
+        "en su propia transacción: si se interrumpe, basta con volver a ejecutarlo."
+    )
+    # Se ejecuta periódicamente (cron): sin system checks no se importan URLconf, vistas ni DRF
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=None,
+                            help='Antigüedad mínima desde el cierre (por defecto ARCHIVO_DIAS).')
+        parser.add_argument('--lote', type=int, default=LOTE, help='Registros por transacción.')
+        parser.add_argument('--solo', choices=list(ARCHIVOS), action='append',
+                            help='Archiva solo este tipo de registro (se puede repetir).')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor que 0.")
+        corte = fecha_corte(options['dias'])
+        self.stdout.write(f"Archivando registros cerrados antes del {corte:%d/%m/%Y}")
+        # Se respeta el orden de ARCHIVOS (los soportes antes que sus asignaciones)
+        for nombre in [nombre for nombre in ARCHIVOS if nombre in (options['solo'] or ARCHIVOS)]:
+            total = 0
+            for cantidad in archivar(nombre, corte, options['lote']):
+                total += cantidad
+                self.stdout.write(f"  {nombre}: {total} archivado(s)")
+            self.stdout.write(self.style.SUCCESS(f"{nombre}: {total} registro(s) archivado(s)."))
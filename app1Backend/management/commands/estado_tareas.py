@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from app1Backend.tareas import estado_cola
+
+
+class Command(BaseCommand):
+    help = "Muestra la profundidad de la cola de tareas en segundo plano (por estado y por tarea)."
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        cola = estado_cola()
+        for estado, cantidad in cola['por_estado'].items():
+            self.stdout.write(f"{estado:<12} {cantidad:>8}")
+        self.stdout.write(f"Listas para ejecutar: {cola['listas']}  |  Programadas: {cola['programadas']}")
+        if cola['espera_maxima'] is not None:
+            self.stdout.write(f"Espera de la más antigua: {int(cola['espera_maxima'].total_seconds())} s")
+        for nombre, cantidad in cola['listas_por_nombre'].items():
+            self.stdout.write(f"  {nombre}: {cantidad}")
@@ -0,0 +1,55 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app1Backend import etiquetas
+from app1Backend.models import Equipo
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las hojas de etiquetas con código de barras (A4, "
+        f"{etiquetas.POR_PAGINA} por hoja) de los equipos de las donaciones indicadas, "
+        "o de equipos sueltos con --equipos. Las hojas se dibujan en un pool de procesos."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('donaciones', nargs='*', type=int, help='IDs de las donaciones.')
+        parser.add_argument('--equipos', nargs='+', type=int, default=[], help='IDs de equipos sueltos.')
+        parser.add_argument('--salida', required=True,
+                            help="Archivo PDF; con --formato png, prefijo de los archivos (se agrega -001.png, -002.png...).")
+        parser.add_argument('--formato', choices=['pdf', 'png'], default='pdf')
+        parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1,
+                            help='Procesos que dibujan las hojas (0 = en este proceso).')
+
+    def handle(self, *args, **options):
+        if not options['donaciones'] and not options['equipos']:
+            raise CommandError("Indica al menos una donación o --equipos.")
+        if options['procesos'] < 0:
+            raise CommandError("--procesos no puede ser negativo.")
+        equipos = Equipo.objects.filter(id_donacion__in=options['donaciones']) | Equipo.objects.filter(pk__in=options['equipos'])
+        datos = etiquetas.etiquetas_de(equipos)
+        if not datos:
+            raise CommandError("No se encontraron equipos.")
+
+        ejecutor = etiquetas.nuevo_pool(options['procesos']) if options['procesos'] else None
+        try:
+            hojas = etiquetas.paginas(datos, options['formato'], ejecutor)
+            if options['formato'] == 'pdf':
+                with open(options['salida'], 'wb') as archivo:
+                    for parte in etiquetas.pdf(hojas):
+                        archivo.write(parte)
+                archivos = [options['salida']]
+            else:
+                archivos = []
+                for numero, png in enumerate(hojas, 1):
+                    archivos.append(f"{options['salida']}-{numero:03d}.png")
+                    with open(archivos[-1], 'wb') as archivo:
+                        archivo.write(png)
+        finally:
+            if ejecutor is not None:
+                ejecutor.shutdown(cancel_futures=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(datos)} etiqueta(s) en {-(-len(datos) // etiquetas.POR_PAGINA)} hoja(s): {', '.join(archivos)}"
+        ))
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app1Backend.cola_trabajo import liberar_reclamos_vencidos
+
+
+class Command(BaseCommand):
+    help = "Devuelve a la cola los equipos reclamados que no registraron avances dentro del plazo."
+    # Se ejecuta periódicamente (cron): sin system checks no se importan URLconf, vistas ni DRF
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horas', type=int, default=None,
+                            help='Antigüedad máxima del reclamo (por defecto COLA_RECLAMO_HORAS).')
+
+    def handle(self, *args, **options):
+        horas = options['horas'] if options['horas'] is not None else settings.COLA_RECLAMO_HORAS
+        liberados = liberar_reclamos_vencidos(horas)
+        self.stdout.write(self.style.SUCCESS(f"{liberados} reclamo(s) liberado(s) (más antiguos que {horas} horas)."))
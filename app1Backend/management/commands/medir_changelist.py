@@ -0,0 +1,52 @@
+import statistics
+import time
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import override_settings
+
+from app1Backend.models import Usuario
+
+
+class Command(BaseCommand):
+    help = "Mide la latencia y la cantidad de consultas del listado (changelist) del admin para un modelo."
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', help="Nombre del modelo en minúsculas (ej: equipo).")
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--query', default='', help="Parámetros GET adicionales (ej: 'tipo__exact=Laptop').")
+
+    def handle(self, *args, **options):
+        modelos = {m._meta.model_name: m for m in admin.site._registry}
+        if options['modelo'] not in modelos:
+            raise CommandError(f"Modelo sin admin registrado: {options['modelo']}")
+        modelo = modelos[options['modelo']]
+
+        superusuario = Usuario.objects.filter(is_superuser=True).first()
+        if superusuario is None:
+            raise CommandError("Se necesita al menos un superusuario para medir el admin.")
+
+        url = f"/admin/{modelo._meta.app_label}/{modelo._meta.model_name}/"
+        if options['query']:
+            url += f"?{options['query']}"
+
+        cliente = Client()
+        cliente.force_login(superusuario)
+        tiempos, consultas = [], []
+        with override_settings(DEBUG=True, ALLOWED_HOSTS=['*']):
+            for _ in range(options['repeticiones']):
+                reset_queries()
+                inicio = time.perf_counter()
+                respuesta = cliente.get(url)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+                consultas.append(len(connection.queries))
+                if respuesta.status_code != 200:
+                    raise CommandError(f"{url} respondió {respuesta.status_code}")
+
+        self.stdout.write(
+            f"{url}: mediana {statistics.median(tiempos):.1f} ms, "
+            f"mín {min(tiempos):.1f} ms, máx {max(tiempos):.1f} ms, "
+            f"{consultas[-1]} consultas por página"
+        )
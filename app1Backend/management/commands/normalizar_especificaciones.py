@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app1Backend.cambios import registrar_cambios
+from app1Backend.especificaciones import normalizar
+from app1Backend.models import Equipo
+
+CAMPOS = ('ram_gb', 'almacenamiento_gb', 'almacenamiento_tipo')
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa ram_gb, almacenamiento_gb y almacenamiento_tipo de los equipos existentes "
+        "a partir del texto libre. Recorre la tabla por lotes de ID y actualiza con un UPDATE "
+        "por combinación de valores, no uno por fila. Se puede interrumpir y reanudar con --desde-id."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=5000, help='Equipos leídos por lote.')
+        parser.add_argument('--desde-id', type=int, default=0, help='Reanuda después de este ID de equipo.')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor que 0.")
+        ultimo = options['desde_id']
+        revisados = actualizados = 0
+
+        while True:
+            filas = list(
+                Equipo.objects
+                .filter(pk__gt=ultimo)
+                .order_by('pk')
+                .values_list('pk', 'ram', 'almacenamiento', *CAMPOS)[:options['lote']]
+            )
+            if not filas:
+                break
+
+            # Valores normalizados -> IDs que deben quedar con esos valores.
+            # El parser guarda en caché cada texto distinto, así que cada uno se analiza una sola vez.
+            grupos = {}
+            for pk, ram, almacenamiento, *actual in filas:
+                nuevo = tuple(normalizar(ram, almacenamiento)[campo] for campo in CAMPOS)
+                if nuevo != tuple(actual):
+                    grupos.setdefault(nuevo, []).append(pk)
+
+            with transaction.atomic():
+                for valores, ids in grupos.items():
+                    Equipo.objects.filter(pk__in=ids).update(**dict(zip(CAMPOS, valores)))
+                    # update() no emite señales: se informa al feed de cambios de la API
+                    registrar_cambios(Equipo, ids, 'Modificacion')
+
+            ultimo = filas[-1][0]
+            revisados += len(filas)
+            actualizados += sum(len(ids) for ids in grupos.values())
+            self.stdout.write(f"  hasta ID {ultimo}: {revisados} revisados, {actualizados} actualizados")
+
+        self.stdout.write(self.style.SUCCESS(f"Listo: {revisados} equipos revisados, {actualizados} actualizados."))
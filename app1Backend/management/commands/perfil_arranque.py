@@ -0,0 +1,103 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Código que ejecuta el proceso hijo: mide solo el arranque de Django (sin el intérprete)
+SCRIPT_ARRANQUE = """
+import os, sys, time
+sys.path.insert(0, {base!r})
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings!r})
+inicio = time.perf_counter()
+import django
+django.setup()
+if {con_urls!r}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+print(time.perf_counter() - inicio)
+"""
+
+_linea_importtime = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tiempo de arranque de Django (django.setup) en procesos nuevos y lista los "
+        "módulos más costosos según `python -X importtime`. Con --presupuesto-ms falla si "
+        "la mediana supera el presupuesto (útil como chequeo en CI)."
+    )
+    # El arranque se mide en procesos hijos: no tiene sentido cargar URLconf y vistas aquí
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15, help='Cantidad de módulos a listar.')
+        parser.add_argument('--con-urls', action='store_true',
+                            help='Incluye la carga del URLconf (lo que paga la primera petición).')
+        parser.add_argument('--presupuesto-ms', type=float, default=None,
+                            help='Falla si la mediana supera este valor (por defecto ARRANQUE_PRESUPUESTO_MS).')
+
+    def _ejecutar(self, con_urls):
+        script = SCRIPT_ARRANQUE.format(
+            base=str(settings.BASE_DIR),
+            settings=os.environ['DJANGO_SETTINGS_MODULE'],
+            con_urls=con_urls,
+        )
+        resultado = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            capture_output=True, text=True, cwd=settings.BASE_DIR,
+        )
+        if resultado.returncode != 0:
+            raise CommandError(f"El arranque falló:\n{resultado.stderr[-2000:]}")
+        return float(resultado.stdout.strip().splitlines()[-1]) * 1000, resultado.stderr
+
+    def _costos(self, salida):
+        """
+        Retorna (tiempo propio por paquete raíz, tiempo acumulado por módulo) en microsegundos.
+        El tiempo propio no se solapa entre módulos, así que por paquete suma el total real.
+        """
+        por_paquete, por_modulo = {}, {}
+        for linea in salida.splitlines():
+            coincidencia = _linea_importtime.match(linea)
+            if not coincidencia:
+                continue
+            propio, acumulado, modulo = int(coincidencia.group(1)), int(coincidencia.group(2)), coincidencia.group(4)
+            paquete = modulo.split('.')[0]
+            por_paquete[paquete] = por_paquete.get(paquete, 0) + propio
+            por_modulo[modulo] = acumulado
+        ordenar = lambda costos: sorted(costos.items(), key=lambda item: item[1], reverse=True)
+        return ordenar(por_paquete), ordenar(por_modulo)
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError("--repeticiones debe ser mayor que 0.")
+        presupuesto = options['presupuesto_ms']
+        if presupuesto is None:
+            presupuesto = settings.ARRANQUE_PRESUPUESTO_MS
+
+        tiempos, salida = [], ''
+        for _ in range(options['repeticiones']):
+            tiempo, salida = self._ejecutar(options['con_urls'])
+            tiempos.append(tiempo)
+
+        por_paquete, por_modulo = self._costos(salida)
+        self.stdout.write("Tiempo de importación por paquete (última corrida):")
+        for paquete, microsegundos in por_paquete[:options['top']]:
+            self.stdout.write(f"  {microsegundos / 1000:8.1f} ms  {paquete}")
+        self.stdout.write("Módulos con mayor tiempo acumulado (incluye lo que importan):")
+        for modulo, microsegundos in por_modulo[:options['top']]:
+            self.stdout.write(f"  {microsegundos / 1000:8.1f} ms  {modulo}")
+
+        mediana = statistics.median(tiempos)
+        objetivo = 'django.setup() + URLconf' if options['con_urls'] else 'django.setup()'
+        self.stdout.write(
+            f"{objetivo}: mediana {mediana:.0f} ms, mínimo {min(tiempos):.0f} ms "
+            f"({options['repeticiones']} procesos, presupuesto {presupuesto:.0f} ms)"
+        )
+        if presupuesto and mediana > presupuesto:
+            raise CommandError(f"El arranque ({mediana:.0f} ms) supera el presupuesto de {presupuesto:.0f} ms.")
+        self.stdout.write(self.style.SUCCESS("Arranque dentro del presupuesto."))
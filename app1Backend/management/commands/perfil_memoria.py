@@ -0,0 +1,79 @@
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+
+from app1Backend.memoria import MB, formatear, perfilar
+from app1Backend.models import Usuario
+
+SIN_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def _listados(patrones, namespace=''):
+    # Nombres de las rutas '*-list' de urls.py y de la API (incluida por namespace)
+    for patron in patrones:
+        if isinstance(patron, URLResolver):
+            prefijo = f'{namespace}{patron.namespace}:' if patron.namespace else namespace
+            yield from _listados(patron.url_patterns, prefijo)
+        elif patron.name and patron.name.endswith('-list'):
+            yield f'{namespace}{patron.name}'
+
+
+class Command(BaseCommand):
+    help = (
+        "Perfila con tracemalloc la memoria de los listados (o de las rutas indicadas): "
+        "pico por petición y las rutas de código que más memoria retienen, de la más pesada "
+        "a la más liviana. Las que superan MEMORIA_PRESUPUESTO_MB se marcan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('rutas', nargs='*', help="URLs a perfilar (ej: /donaciones/?q=hp). Por defecto, todos los listados.")
+        parser.add_argument('--usuario', help="Email del usuario con que se hacen las peticiones (por defecto, un administrador).")
+        parser.add_argument('--top', type=int, default=settings.MEMORIA_TOP, help='Rutas de código por URL.')
+        parser.add_argument('--profundidad', type=int, default=settings.MEMORIA_PROFUNDIDAD,
+                            help='Frames guardados por asignación (más frames: rutas más precisas y más lento).')
+        parser.add_argument('--sin-cache', action='store_true',
+                            help='Mide con una caché vacía (DummyCache): la API y las facetas se generan de nuevo.')
+
+    def handle(self, *args, **options):
+        if options['usuario']:
+            usuario = Usuario.objects.filter(email=options['usuario']).first()
+        else:
+            usuario = Usuario.objects.filter(rol='Administrador', is_active=True).first()
+        if usuario is None:
+            raise CommandError("No se encontró el usuario para hacer las peticiones.")
+
+        rutas = options['rutas']
+        if not rutas:
+            for nombre in dict.fromkeys(_listados(get_resolver().url_patterns)):
+                try:
+                    rutas.append(reverse(nombre))
+                except NoReverseMatch:  # Listados con parámetros en la URL
+                    continue
+
+        cliente = Client(HTTP_ACCEPT='text/html,application/json')
+        cliente.force_login(usuario)
+        resultados = []
+        with override_settings(ALLOWED_HOSTS=['*'], MEMORIA_MUESTREO=0):
+            for ruta in rutas:
+                # Primera petición sin medir: carga de plantillas, URLconf y cachés del proceso
+                cliente.get(ruta)
+                with override_settings(CACHES=SIN_CACHE) if options['sin_cache'] else nullcontext():
+                    with perfilar(options['top'], profundidad=options['profundidad']) as perfil:
+                        respuesta = cliente.get(ruta)
+                if perfil is None:
+                    raise CommandError("tracemalloc ya está activo en este proceso (¿PYTHONTRACEMALLOC?).")
+                resultados.append((perfil, ruta, respuesta.status_code))
+                del respuesta
+
+        presupuesto = settings.MEMORIA_PRESUPUESTO_MB * MB
+        for perfil, ruta, codigo in sorted(resultados, key=lambda resultado: -resultado[0].pico):
+            estilo = self.style.WARNING if perfil.pico > presupuesto else self.style.SUCCESS
+            self.stdout.write(estilo(
+                f"{ruta} [{codigo}]: pico {perfil.pico / MB:.1f} MB, retenido al terminar {perfil.retenido / MB:.1f} MB"
+            ))
+            for linea in formatear(perfil):
+                self.stdout.write(linea)
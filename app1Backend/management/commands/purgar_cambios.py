@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app1Backend.cambios import purgar_cambios
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina del feed de cambios (/api/cambios/) los registros más antiguos que el plazo. "
+        "Los clientes con un cursor anterior recibirán 410 y deberán resincronizar."
+    )
+    # Se ejecuta periódicamente (cron): sin system checks no se importan URLconf, vistas ni DRF
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=None,
+                            help='Antigüedad máxima a conservar (por defecto CAMBIOS_DIAS_RETENCION).')
+
+    def handle(self, *args, **options):
+        dias = options['dias'] if options['dias'] is not None else settings.CAMBIOS_DIAS_RETENCION
+        eliminados = purgar_cambios(dias)
+        self.stdout.write(self.style.SUCCESS(f"{eliminados} cambio(s) eliminado(s) (más antiguos que {dias} días)."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from app1Backend.sla import revisar_incumplimientos
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca los tickets de soporte abiertos que superaron su plazo de resolución (SLA) "
+        "y envía un resumen a los administradores. Pensado para ejecutarse cada pocos minutos."
+    )
+    # Se ejecuta periódicamente (cron): sin system checks no se importan URLconf, vistas ni DRF
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sin-correo', action='store_true', help='Solo marca los tickets, sin notificar.')
+
+    def handle(self, *args, **options):
+        ids = revisar_incumplimientos(notificar=not options['sin_correo'])
+        self.stdout.write(self.style.SUCCESS(f"{len(ids)} ticket(s) fuera de plazo marcado(s)."))
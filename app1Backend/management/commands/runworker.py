@@ -0,0 +1,122 @@
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from app1Backend import tareas_proceso
+from app1Backend.tareas import (
+    LATIDO_SEGUNDOS, ejecutar, estado_cola, identificador_trabajador, liberar_vencidas, purgar_terminadas,
+    reclamar, registrar_latido,
+)
+
+# Cada cuánto se liberan tareas colgadas y se purgan las completadas antiguas
+MANTENIMIENTO_SEGUNDOS = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta las tareas en segundo plano de la tabla `tarea` (correos, imágenes) en un pool "
+        "de hilos o de procesos. Se deja corriendo junto al servidor web; Ctrl+C o SIGTERM "
+        "terminan las tareas en curso antes de salir."
+    )
+    # Proceso de larga duración sin vistas: no necesita los system checks
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int, default=None,
+                            help='Tareas simultáneas (por defecto TAREAS_CONCURRENCIA).')
+        parser.add_argument('--procesos', action='store_true',
+                            help='Usa un pool de procesos en vez de hilos (tareas de CPU, ej: imágenes).')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos entre consultas a la cola cuando no hay tareas listas.')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Ejecuta las tareas listas y termina cuando la cola queda vacía.')
+
+    def handle(self, *args, **options):
+        concurrencia = options['concurrencia'] or settings.TAREAS_CONCURRENCIA
+        if concurrencia < 1:
+            raise CommandError("--concurrencia debe ser mayor que 0.")
+        self.intervalo = options['intervalo']
+        self.verbosity = options['verbosity']
+        self.detener = threading.Event()
+        for senal in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(senal, lambda *_: self.detener.set())
+
+        if options['procesos']:
+            # Los procesos hijos abren sus propias conexiones; no deben heredar las del padre
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                concurrencia, mp_context=multiprocessing.get_context('spawn'), initializer=tareas_proceso.iniciar,
+            )
+            self.ejecutar = tareas_proceso.ejecutar
+        else:
+            pool = ThreadPoolExecutor(concurrencia, thread_name_prefix='tarea')
+            self.ejecutar = ejecutar
+
+        trabajador = identificador_trabajador()
+        cola = estado_cola()
+        self.stdout.write(
+            f"Worker {trabajador}: {concurrencia} {'proceso(s)' if options['procesos'] else 'hilo(s)'}, "
+            f"{cola['listas']} tarea(s) lista(s), {cola['programadas']} programada(s)."
+        )
+        try:
+            self._bucle(pool, concurrencia, trabajador, options['una_vez'])
+        finally:
+            pool.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS("Worker detenido."))
+
+    def _bucle(self, pool, concurrencia, trabajador, una_vez):
+        en_curso = set()
+        proximo_mantenimiento = proximo_latido = 0
+        while not self.detener.is_set():
+            if time.monotonic() >= proximo_latido:
+                # Sin latido vigente, los procesos web envían los correos por su cuenta (ver tareas.py)
+                registrar_latido()
+                proximo_latido = time.monotonic() + LATIDO_SEGUNDOS
+            if time.monotonic() >= proximo_mantenimiento:
+                self._mantenimiento()
+                proximo_mantenimiento = time.monotonic() + MANTENIMIENTO_SEGUNDOS
+
+            libres = concurrencia - len(en_curso)
+            reclamadas = reclamar(libres, trabajador) if libres else []
+            en_curso.update(pool.submit(self.ejecutar, id_tarea) for id_tarea in reclamadas)
+
+            if not en_curso:
+                if una_vez:
+                    return
+                self.detener.wait(self.intervalo)
+                continue
+            # Con espacio libre y la cola aún con tareas se reclama de inmediato;
+            # si no, se espera a que termine alguna (o al intervalo, por las programadas)
+            espera = 0 if reclamadas and len(en_curso) < concurrencia else self.intervalo
+            terminadas, en_curso = wait(en_curso, timeout=espera, return_when=FIRST_COMPLETED)
+            for futuro in terminadas:
+                self._informar(futuro)
+
+        # Detención pedida: no se reclaman más tareas, se esperan las que están corriendo
+        for futuro in en_curso:
+            self._informar(futuro)
+
+    def _informar(self, futuro):
+        try:
+            id_tarea, nombre, estado = futuro.result()
+        except Exception as error:
+            # Error del propio worker (ej: conexión perdida); la tarea se libera por tiempo
+            self.stderr.write(f"Error ejecutando una tarea: {error!r}")
+            return
+        if estado == 'Completada':
+            if self.verbosity >= 2:
+                self.stdout.write(f"#{id_tarea} {nombre}: completada")
+        else:
+            self.stderr.write(f"#{id_tarea} {nombre}: {'falló, se reintentará' if estado == 'Pendiente' else 'fallida'}")
+
+    def _mantenimiento(self):
+        liberadas, fallidas = liberar_vencidas()
+        if liberadas or fallidas:
+            self.stderr.write(f"{liberadas} tarea(s) colgada(s) devuelta(s) a la cola, {fallidas} marcada(s) como fallida(s).")
+        purgar_terminadas()
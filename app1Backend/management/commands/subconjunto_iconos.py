@@ -0,0 +1,119 @@
+"""
+Genera un subconjunto de Font Awesome con solo los íconos usados en las plantillas.
+
+Fuente:  vendor/fontawesome-<versión>/ (CSS completo y fuentes woff2, fuera de static/)
+Salida:  static/vendor/fontawesome-subset/ (CSS reducido y woff2 recortados)
+
+Se debe volver a ejecutar al agregar un ícono nuevo a una plantilla.
+Requiere fontTools y Brotli (ver requirements.txt).
+"""
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Estilo -> (archivo de fuente, peso, familia, clases que lo activan)
+ESTILOS = {
+    'solid': ('fa-solid-900', 900, 'Font Awesome 6 Free', {'fa', 'fas', 'fa-solid'}),
+    'regular': ('fa-regular-400', 400, 'Font Awesome 6 Free', {'far', 'fa-regular'}),
+    'brands': ('fa-brands-400', 400, 'Font Awesome 6 Brands', {'fab', 'fa-brands'}),
+}
+
+PATRON_CLASE = re.compile(r'(?<![\w-])(fa[srb]?|fa-[a-z0-9-]+)(?![\w-])')
+# Regla de ícono minificada: .fa-bars:before,.fa-navicon:before{content:"\f0c9"}
+PATRON_ICONO = re.compile(r'^((?:\.fa-[\w-]+:before,?)+)\{content:"([^"]+)"\}$')
+
+
+def _bloques_css(css):
+    """Divide el CSS minificado en sentencias de primer nivel (respeta llaves anidadas)."""
+    bloques, inicio, profundidad = [], 0, 0
+    for i, caracter in enumerate(css):
+        if caracter == '{':
+            profundidad += 1
+        elif caracter == '}':
+            profundidad -= 1
+            if profundidad == 0:
+                bloques.append(css[inicio:i + 1].strip())
+                inicio = i + 1
+    return [bloque for bloque in bloques if bloque]
+
+def _codigo(contenido):
+    r"""Convierte el contenido CSS ("\f0c9" o "\30") a un code point."""
+    if contenido.startswith('\\'):
+        return int(contenido[1:], 16)
+    return ord(contenido)
+
+
+class Command(BaseCommand):
+    help = "Recorta las fuentes de Font Awesome a los íconos usados en las plantillas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fa-version', default='6.5.1', help='Versión de Font Awesome en vendor/.')
+
+    def _clases_usadas(self):
+        carpetas = [Path(d) for d in settings.TEMPLATES[0]['DIRS']] + [Path(d) for d in settings.STATICFILES_DIRS]
+        clases = set()
+        for carpeta in carpetas:
+            for archivo in carpeta.rglob('*'):
+                if archivo.suffix in ('.html', '.js') and 'vendor' not in archivo.parts:
+                    clases.update(PATRON_CLASE.findall(archivo.read_text(encoding='utf-8')))
+        return clases
+
+    def handle(self, *args, **options):
+        try:
+            from fontTools import subset
+            from fontTools.ttLib import TTFont
+        except ImportError:
+            raise CommandError("Se necesita fontTools: pip install fonttools brotli")
+
+        origen = Path(settings.BASE_DIR) / 'vendor' / f"fontawesome-{options['fa_version']}"
+        destino = Path(settings.BASE_DIR) / 'static' / 'vendor' / 'fontawesome-subset'
+        if not origen.exists():
+            raise CommandError(f"No existe {origen}")
+
+        clases = self._clases_usadas()
+        estilos = [nombre for nombre, datos in ESTILOS.items() if clases & datos[3]]
+
+        reglas, codigos = [], set()
+        for bloque in _bloques_css((origen / 'css' / 'all.min.css').read_text(encoding='utf-8')):
+            if bloque.startswith('@font-face'):
+                continue  # se reemplazan por las fuentes recortadas
+            icono = PATRON_ICONO.match(bloque)
+            if not icono:
+                reglas.append(bloque)
+                continue
+            selectores = [s for s in icono.group(1).split(',') if s and s[1:-len(':before')] in clases]
+            if selectores:
+                reglas.append(f"{','.join(selectores)}{{content:\"{icono.group(2)}\"}}")
+                codigos.add(_codigo(icono.group(2)))
+
+        (destino / 'css').mkdir(parents=True, exist_ok=True)
+        (destino / 'webfonts').mkdir(parents=True, exist_ok=True)
+
+        fuentes = []
+        for nombre in estilos:
+            archivo, peso, familia, _ = ESTILOS[nombre]
+            opciones = subset.Options()
+            opciones.flavor = 'woff2'
+            opciones.layout_features = []
+            fuente = TTFont(origen / 'webfonts' / f'{archivo}.woff2')
+            recortador = subset.Subsetter(opciones)
+            recortador.populate(unicodes=codigos)
+            recortador.subset(fuente)
+            fuente.flavor = 'woff2'
+            fuente.save(destino / 'webfonts' / f'{archivo}.woff2')
+            fuentes.append(
+                f'@font-face{{font-family:"{familia}";font-style:normal;font-weight:{peso};'
+                f'font-display:block;src:url(../webfonts/{archivo}.woff2) format("woff2")}}'
+            )
+
+        cabecera = (
+            f"/* Font Awesome Free {options['fa_version']} - subconjunto generado por "
+            f"`manage.py subconjunto_iconos` ({len(codigos)} íconos). "
+            f"License: https://fontawesome.com/license/free */\n"
+        )
+        (destino / 'css' / 'iconos.min.css').write_text(cabecera + ''.join(fuentes + reglas), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(codigos)} íconos, estilos: {', '.join(estilos) or 'ninguno'} -> {destino}"
+        ))
@@ -0,0 +1,137 @@
+"""
+Perfil de memoria de las peticiones con tracemalloc (opcional).
+
+Un ListView que materializa todo el queryset infla la memoria (RSS) del
+worker y esta no vuelve al sistema. Para encontrar esas vistas:
+
+- MemoriaMiddleware perfila una fracción de las peticiones
+  (MEMORIA_MUESTREO; 0 = desactivado): registra el pico de memoria de la
+  petición en la métrica memoria_pico_megabytes por vista (metricas.py) y, si
+  supera MEMORIA_PRESUPUESTO_MB, escribe en el log las rutas de código que
+  más memoria retienen.
+- `python manage.py perfil_memoria` perfila los listados (o las rutas que se
+  indiquen) y los ordena por pico.
+
+tracemalloc solo se activa durante la petición perfilada (las demás no pagan
+nada) y de a una por proceso. Esa petición sí se hace varias veces más lenta,
+y más cuantos más frames se guardan por asignación (MEMORIA_PROFUNDIDAD).
+tracemalloc es global al proceso: mide todo lo que el intérprete asigna, en
+cualquier hilo. Por eso el middleware solo perfila en workers WSGI de un hilo
+(gunicorn sync); con hilos o ASGI se desactiva y queda el comando, que
+perfila las peticiones de a una.
+Las rutas salen de la memoria retenida al final de la vista: el contexto de
+la plantilla (object_list y el caché del queryset) sigue vivo en ese punto.
+"""
+import collections
+import contextlib
+import os
+import threading
+import tracemalloc
+
+from django.conf import settings
+
+from .metricas import nombre_vista, observar
+
+MB = 1024 * 1024
+# Archivos que envuelven la petición (punto de entrada e instrumentación): no sirven
+# como "código del proyecto" en una ruta
+ENVOLTORIOS = ('manage.py', 'memoria.py', 'metricas.py', 'middleware.py', 'plantillas.py', 'trazas.py')
+
+_lock = threading.Lock()
+
+
+class Perfil:
+    """Pico y memoria retenida (bytes) y rutas de código [(ruta, bytes, bloques)]."""
+
+    def __init__(self):
+        self.pico = 0
+        self.retenido = 0
+        self.rutas = []
+
+
+@contextlib.contextmanager
+def perfilar(top, umbral=0, profundidad=None):
+    """
+    Activa tracemalloc mientras dura el bloque, guardando `profundidad`
+    frames por asignación (MEMORIA_PROFUNDIDAD). Entrega un Perfil que se
+    completa al salir, con las `top` rutas principales si el pico supera
+    `umbral` (bytes). Entrega None si ya hay un perfil en curso en el proceso
+    o si tracemalloc lo activó otro (ej: PYTHONTRACEMALLOC).
+    """
+    if not _lock.acquire(blocking=False):
+        yield None
+        return
+    if tracemalloc.is_tracing():
+        _lock.release()
+        yield None
+        return
+    perfil = Perfil()
+    tracemalloc.start(profundidad or settings.MEMORIA_PROFUNDIDAD)
+    try:
+        yield perfil
+    finally:
+        try:
+            perfil.retenido, perfil.pico = tracemalloc.get_traced_memory()
+            if top and perfil.pico > umbral:
+                perfil.rutas = _rutas(tracemalloc.take_snapshot(), top)
+        finally:
+            tracemalloc.stop()
+            _lock.release()
+
+
+# =========================================================
+# RUTAS DE CÓDIGO
+# =========================================================
+
+def _del_proyecto(archivo, base):
+    return archivo.startswith(base) and 'site-packages' not in archivo and not archivo.endswith(ENVOLTORIOS)
+
+def _ubicacion(frame, base):
+    archivo = frame.filename
+    if 'site-packages' in archivo:
+        archivo = archivo.split('site-packages' + os.sep, 1)[1]
+    elif archivo.startswith(base):
+        archivo = os.path.relpath(archivo, base)
+    return f'{archivo}:{frame.lineno}'
+
+def _rutas(snapshot, top):
+    # Ruta = la línea del proyecto más cercana a la asignación -> la línea que asignó
+    base = str(settings.BASE_DIR)
+    propios = {}  # Archivo -> es del proyecto (los mismos archivos se repiten en miles de trazas)
+    bytes_por_ruta = collections.Counter()
+    bloques_por_ruta = collections.Counter()
+    # Agrupadas por traceback idéntico (en C): se recorren menos trazas en Python
+    for estadistica in snapshot.statistics('traceback'):
+        frames = estadistica.traceback  # Del más antiguo al más reciente
+        propio = None
+        for frame in reversed(frames):
+            if frame.filename not in propios:
+                propios[frame.filename] = _del_proyecto(frame.filename, base)
+            if propios[frame.filename]:
+                propio = frame
+                break
+        ruta = _ubicacion(frames[-1], base)
+        if propio is not None and propio != frames[-1]:
+            ruta = f'{_ubicacion(propio, base)} -> {ruta}'
+        bytes_por_ruta[ruta] += estadistica.size
+        bloques_por_ruta[ruta] += estadistica.count
+    return [(ruta, tamano, bloques_por_ruta[ruta]) for ruta, tamano in bytes_por_ruta.most_common(top)]
+
+def formatear(perfil):
+    """Líneas del informe de rutas, para el log y el comando."""
+    return [f'  {tamano / MB:8.2f} MB {bloques:8} bloques  {ruta}' for ruta, tamano, bloques in perfil.rutas]
+
+
+# =========================================================
+# REGISTRO DE LAS PETICIONES PERFILADAS
+# =========================================================
+
+def registrar_perfil(request, perfil):
+    vista = nombre_vista(request)
+    observar('memoria_pico_megabytes', perfil.pico / MB, vista=vista)
+    if perfil.pico > settings.MEMORIA_PRESUPUESTO_MB * MB:
+        print('\n'.join([
+            f"Memoria: {request.method} {request.get_full_path()} ({vista}) pico {perfil.pico / MB:.1f} MB, "
+            f"presupuesto {settings.MEMORIA_PRESUPUESTO_MB} MB, retenido al terminar {perfil.retenido / MB:.1f} MB",
+            *formatear(perfil),
+        ]))
@@ -0,0 +1,238 @@
+"""
+Métricas de la aplicación en el formato de texto de Prometheus (/metricas/).
+
+Qué se mide:
+- Peticiones por vista (nombre de la ruta en urls.py), método y código, y un
+  histograma de su duración (MetricasMiddleware).
+- Consultas SQL y tiempo en la base de datos por vista (execute_wrapper, sin
+  depender de DEBUG).
+- Tiempo de renderizado por plantilla (backend de plantillas en plantillas.py).
+- Correos enviados y fallidos (services.py) y, al consultar, los que esperan
+  en la cola de tareas.
+- Aciertos y fallos de la caché de la API y del índice de facetas.
+- Pico de memoria por vista de las peticiones perfiladas (memoria.py).
+
+Varios procesos (workers web, runworker y sus procesos hijos): cada uno
+acumula en memoria y vuelca sus totales cada METRICAS_INTERVALO segundos a su
+propio archivo <pid>.json en METRICAS_DIRECTORIO (escritura atómica con
+os.replace, ver volcado.py). La vista suma los archivos de todos los procesos, así las cifras
+son del servicio completo y no del worker que atendió la consulta. El archivo
+de un proceso que terminó se conserva: sus contadores siguen sumando. Conviene
+vaciar el directorio al desplegar (si un PID se reutiliza, Prometheus lo ve
+como el reinicio de un contador).
+"""
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from .volcado import VolcadoPeriodico, reemplazar_archivo
+
+PREFIJO = 'reconectatec_'
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+BUCKETS_MEGABYTES = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Nombre -> (tipo, descripción, buckets si es histograma)
+DEFINICIONES = {
+    'http_peticiones_total': ('counter', 'Peticiones atendidas por vista, método y código de estado.', None),
+    'http_duracion_segundos': ('histogram', 'Duración de las peticiones por vista.', BUCKETS_SEGUNDOS),
+    'db_consultas_total': ('counter', 'Consultas SQL ejecutadas por vista.', None),
+    'db_duracion_segundos_total': ('counter', 'Tiempo en la base de datos por vista.', None),
+    'db_consultas_por_peticion': ('histogram', 'Consultas SQL por petición, por vista.', BUCKETS_CONSULTAS),
+    'plantilla_duracion_segundos': ('histogram', 'Tiempo de renderizado por plantilla.', BUCKETS_SEGUNDOS),
+    'correos_total': ('counter', 'Correos por resultado (enviado, fallido).', None),
+    'cache_consultas_total': ('counter', 'Lecturas de la caché por uso y resultado (hit, miss).', None),
+    'memoria_pico_megabytes': ('histogram', 'Pico de memoria de las peticiones perfiladas, por vista.', BUCKETS_MEGABYTES),
+}
+
+
+# =========================================================
+# REGISTRO EN EL PROCESO
+# =========================================================
+
+_lock = threading.Lock()
+# (nombre, etiquetas ordenadas) -> número (contador) o [cuenta por bucket..., +Inf, suma] (histograma)
+_valores = {}
+
+
+def incrementar(nombre, valor=1, **etiquetas):
+    """Suma `valor` al contador `nombre` con esas etiquetas."""
+    clave = (nombre, tuple(sorted(etiquetas.items())))
+    with _lock:
+        _valores[clave] = _valores.get(clave, 0) + valor
+    _volcado.programar()
+
+def observar(nombre, valor, **etiquetas):
+    """Registra `valor` en el histograma `nombre` con esas etiquetas."""
+    buckets = DEFINICIONES[nombre][2]
+    clave = (nombre, tuple(sorted(etiquetas.items())))
+    with _lock:
+        serie = _valores.get(clave)
+        if serie is None:
+            serie = _valores[clave] = [0] * (len(buckets) + 2)
+        # Cuenta por bucket (no acumulada): se acumula al exportar
+        indice = next((i for i, limite in enumerate(buckets) if valor <= limite), len(buckets))
+        serie[indice] += 1
+        serie[-1] += valor
+    _volcado.programar()
+
+def _archivo():
+    return os.path.join(settings.METRICAS_DIRECTORIO, f'{os.getpid()}.json')
+
+def _tomar():
+    with _lock:
+        if not _valores:
+            return None
+        return [[nombre, dict(etiquetas), valor] for (nombre, etiquetas), valor in _valores.items()]
+
+def _reiniciar():
+    # El hijo de un fork no hereda los totales del padre
+    global _valores
+    _valores = {}
+
+
+_volcado = VolcadoPeriodico(
+    'métricas',
+    intervalo=lambda: settings.METRICAS_INTERVALO,
+    tomar=_tomar,
+    escribir=lambda datos: reemplazar_archivo(_archivo(), json.dumps(datos)),
+    reiniciar=_reiniciar,
+)
+
+def volcar():
+    """Escribe los totales de este proceso en su archivo."""
+    _volcado.volcar()
+
+
+# =========================================================
+# INSTRUMENTACIÓN
+# =========================================================
+
+class MedidorConsultas:
+    """execute_wrapper que cuenta las consultas y su tiempo."""
+
+    def __init__(self):
+        self.cantidad = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.cantidad += 1
+            self.segundos += time.perf_counter() - inicio
+
+def nombre_vista(request):
+    """Nombre de la ruta que atendió la petición (ej: 'equipo-list', 'api:equipo-detail')."""
+    coincidencia = getattr(request, 'resolver_match', None)
+    if coincidencia is None:
+        return 'sin_ruta'
+    return coincidencia.view_name or 'sin_nombre'
+
+def registrar_peticion(request, response, segundos, medidor):
+    vista = nombre_vista(request)
+    incrementar('http_peticiones_total', vista=vista, metodo=request.method, codigo=str(response.status_code))
+    observar('http_duracion_segundos', segundos, vista=vista)
+    incrementar('db_consultas_total', medidor.cantidad, vista=vista)
+    incrementar('db_duracion_segundos_total', medidor.segundos, vista=vista)
+    observar('db_consultas_por_peticion', medidor.cantidad, vista=vista)
+
+def registrar_cache(uso, acierto):
+    incrementar('cache_consultas_total', uso=uso, resultado='hit' if acierto else 'miss')
+
+def registrar_correo(enviado):
+    incrementar('correos_total', resultado='enviado' if enviado else 'fallido')
+
+def registrar_plantilla(nombre, segundos):
+    observar('plantilla_duracion_segundos', segundos, plantilla=nombre)
+
+
+# =========================================================
+# EXPORTACIÓN (FORMATO DE TEXTO DE PROMETHEUS)
+# =========================================================
+
+def autorizado(request):
+    """El scraper presenta 'Authorization: Bearer <METRICAS_TOKEN>'."""
+    token = settings.METRICAS_TOKEN
+    cabecera = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and hmac.compare_digest(cabecera.encode(), f'Bearer {token}'.encode())
+
+def _leer_procesos():
+    """Suma los archivos de todos los procesos. Retorna (totales, cantidad de procesos)."""
+    totales = {}
+    archivos = glob.glob(os.path.join(settings.METRICAS_DIRECTORIO, '*.json'))
+    for ruta in archivos:
+        try:
+            with open(ruta) as archivo:
+                datos = json.load(archivo)
+        except (OSError, ValueError):  # Eliminado o a medio escribir por otro proceso
+            continue
+        for nombre, etiquetas, valor in datos:
+            if nombre not in DEFINICIONES:
+                continue
+            clave = (nombre, tuple(sorted(etiquetas.items())))
+            if isinstance(valor, list):
+                actual = totales.setdefault(clave, [0] * len(valor))
+                totales[clave] = [a + b for a, b in zip(actual, valor)]
+            else:
+                totales[clave] = totales.get(clave, 0) + valor
+    return totales, len(archivos)
+
+def _escapar(valor):
+    return str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+def _etiquetas(pares):
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in pares) + '}'
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+def _correos_en_cola():
+    # Importes locales: services.py registra sus correos en este módulo
+    from django.db.models import Count
+    from .models import Tarea
+    from .services import entregar_correo
+    por_estado = dict(
+        Tarea.objects.filter(nombre=entregar_correo.nombre).exclude(estado='Completada')
+        .order_by().values_list('estado').annotate(Count('pk'))
+    )
+    return {estado: por_estado.get(estado, 0) for estado in ('Pendiente', 'En Curso', 'Fallida')}
+
+def exportar():
+    """Texto de Prometheus con las métricas de todos los procesos."""
+    volcar()  # Lo último de este proceso también cuenta
+    totales, procesos = _leer_procesos()
+    lineas = []
+    for nombre, (tipo, descripcion, buckets) in DEFINICIONES.items():
+        series = sorted((etiquetas, valor) for (n, etiquetas), valor in totales.items() if n == nombre)
+        if not series:
+            continue
+        lineas += [f'# HELP {PREFIJO}{nombre} {descripcion}', f'# TYPE {PREFIJO}{nombre} {tipo}']
+        for etiquetas, valor in series:
+            if tipo != 'histogram':
+                lineas.append(f'{PREFIJO}{nombre}{_etiquetas(etiquetas)} {_numero(valor)}')
+                continue
+            acumulado = 0
+            for limite, cuenta in zip(list(buckets) + ['+Inf'], valor[:-1]):
+                acumulado += cuenta
+                lineas.append(f'{PREFIJO}{nombre}_bucket{_etiquetas(etiquetas + (("le", limite),))} {acumulado}')
+            lineas.append(f'{PREFIJO}{nombre}_sum{_etiquetas(etiquetas)} {_numero(valor[-1])}')
+            lineas.append(f'{PREFIJO}{nombre}_count{_etiquetas(etiquetas)} {acumulado}')
+
+    lineas += [f'# HELP {PREFIJO}correos_en_cola Correos que esperan en la cola de tareas, por estado.',
+               f'# TYPE {PREFIJO}correos_en_cola gauge']
+    for estado, cantidad in _correos_en_cola().items():
+        lineas.append(f'{PREFIJO}correos_en_cola{_etiquetas((("estado", estado),))} {cantidad}')
+    lineas += [f'# HELP {PREFIJO}metricas_procesos Procesos con métricas registradas en METRICAS_DIRECTORIO.',
+               f'# TYPE {PREFIJO}metricas_procesos gauge',
+               f'{PREFIJO}metricas_procesos {procesos}']
+    return '\n'.join(lineas) + '\n'
@@ -0,0 +1,267 @@
+"""
+Middlewares propios de la aplicación.
+Se registran en MIDDLEWARE (proyectoBackend/settings.py).
+"""
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_sequence, compress_string
+
+from .auditoria import iniciar_buffer, vaciar_buffer
+from .memoria import perfilar, registrar_perfil
+from .metricas import MedidorConsultas, nombre_vista, registrar_peticion
+from .trazas import span, traza
+
+try:
+    import brotli
+except ImportError:  # Sin Brotli se comprime solo con gzip
+    brotli = None
+
+# Respuestas más chicas que esto no se comprimen (el encabezado gzip/br no compensa)
+TAMANO_MINIMO_COMPRESION = 1024
+# Calidad de brotli para contenido dinámico: con 4 el HTML de listados queda ~4 veces más chico que con gzip, en un tiempo similar
+CALIDAD_BROTLI = 4
+TIPOS_COMPRIMIBLES = ('text/html', 'application/json', 'text/plain', 'text/csv', 'application/javascript')
+
+_acepta_br = _lazy_re_compile(r'\bbr\b')
+_acepta_gzip = _lazy_re_compile(r'\bgzip\b')
+
+
+class MetricasMiddleware:
+    """
+    Registra por vista (nombre de la ruta) la duración de la petición, su
+    código de estado, y la cantidad y el tiempo de las consultas SQL
+    (ver metricas.py). Va primero en MIDDLEWARE para medir la petición completa.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medidor = MedidorConsultas()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(medidor):
+            response = self.get_response(request)
+        registrar_peticion(request, response, time.perf_counter() - inicio, medidor)
+        return response
+
+
+class TrazasMiddleware:
+    """
+    Span raíz de la petición (ver trazas.py), con el método, la ruta y el
+    código de estado. Va justo después de MetricasMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # El traceparent entrante solo se respeta detrás de un proxy o gateway que lo controla
+        entrante = request.META.get('HTTP_TRACEPARENT') if settings.TRAZAS_CONFIAR_TRACEPARENT else None
+        with traza(request.method, entrante, **{
+            'http.request.method': request.method, 'url.path': request.path,
+        }) as raiz:
+            response = self.get_response(request)
+            if raiz is not None:
+                raiz.nombre = f'{request.method} {nombre_vista(request)}'
+                raiz.atributos['http.response.status_code'] = response.status_code
+                if response.status_code >= 500:
+                    raiz.error = f'HTTP {response.status_code}'
+        return response
+
+
+class MemoriaMiddleware:
+    """
+    Perfila con tracemalloc una fracción de las peticiones (MEMORIA_MUESTREO,
+    ver memoria.py): pico de memoria por vista y, sobre MEMORIA_PRESUPUESTO_MB,
+    las rutas de código que más memoria retienen. Va al final de MIDDLEWARE:
+    mide la vista y su render, con el contexto de la plantilla aún vivo.
+
+    Solo en workers WSGI de un hilo (wsgi.multithread falso, ej: gunicorn
+    sync): tracemalloc es global al proceso y con otras peticiones en curso
+    (hilos, ASGI) el perfil mezclaría sus asignaciones.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MEMORIA_MUESTREO:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.avisado = False
+
+    def __call__(self, request):
+        if random.random() >= settings.MEMORIA_MUESTREO:
+            return self.get_response(request)
+        # Sin la clave (ASGI) se asume que hay concurrencia
+        if request.META.get('wsgi.multithread', True):
+            if not self.avisado:
+                self.avisado = True
+                print(">>> AVISO: MEMORIA_MUESTREO se ignora en este servidor: requiere workers WSGI de un hilo "
+                      "(ver app1Backend/memoria.py). Usa `python manage.py perfil_memoria`.")
+            return self.get_response(request)
+        with perfilar(settings.MEMORIA_TOP, settings.MEMORIA_PRESUPUESTO_MB * 1024 * 1024) as perfil:
+            response = self.get_response(request)
+        if perfil is not None:
+            registrar_perfil(request, perfil)
+        return response
+
+
+class TrazaVistaMiddleware:
+    """
+    Span de la vista: resolución de la URL, la vista y el render de su
+    TemplateResponse. Va ÚLTIMO en MIDDLEWARE, así envuelve solo eso.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with span('vista') as actual:
+            response = self.get_response(request)
+            if actual is not None:
+                actual.nombre = f'vista {nombre_vista(request)}'
+        return response
+
+
+class AuditoriaMiddleware:
+    """
+    Acumula los registros de auditoría generados durante la petición
+    (vistas HTML y API) y los escribe con un solo bulk_create al final.
+    Debe ir después de AuthenticationMiddleware para conocer al usuario.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = iniciar_buffer(request)
+        try:
+            return self.get_response(request)
+        finally:
+            try:
+                vaciar_buffer(tokens)
+            except Exception as e:
+                # La acción del usuario ya se guardó: no se corta la respuesta
+                print(f"Error guardando auditoría: {e}")
+
+
+# =========================================================
+# COMPRESIÓN Y POLÍTICA DE CACHÉ HTTP
+# =========================================================
+
+def _brotli_secuencia(secuencia):
+    """Comprime un iterable de bytes con brotli (equivalente a compress_sequence de Django)."""
+    compresor = brotli.Compressor(quality=CALIDAD_BROTLI)
+    for trozo in secuencia:
+        datos = compresor.process(trozo)
+        if datos:
+            yield datos
+    yield compresor.finish()
+
+class CompresionMiddleware:
+    """
+    Comprime con brotli (si el cliente lo acepta) o gzip las respuestas HTML,
+    JSON y texto de las vistas y la API.
+
+    - Omite respuestas pequeñas, las ya comprimidas (Content-Encoding) y los
+      tipos binarios. Los estáticos no llegan aquí: WhiteNoise ya los sirve
+      precomprimidos.
+    - Las respuestas en streaming se comprimen trozo a trozo, sin armar el
+      cuerpo completo en memoria.
+    - gzip usa el relleno aleatorio de Django contra BREACH; los tokens CSRF
+      además van enmascarados por petición. brotli no admite ese relleno: las
+      respuestas que incluyen el token CSRF (formularios HTML) van con gzip,
+      igual que el HTML en streaming, que podría incluirlo al generarse.
+
+    Debe ir antes que los middlewares que leen o modifican el cuerpo.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        self.comprimir(request, response)
+        return response
+
+    def _codificacion(self, request, con_secretos):
+        aceptadas = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and not con_secretos and _acepta_br.search(aceptadas):
+            return 'br'
+        if _acepta_gzip.search(aceptadas):
+            return 'gzip'
+        return None
+
+    def comprimir(self, request, response):
+        if response.status_code not in (200, 201) or response.has_header('Content-Encoding'):
+            return
+        tipo = response.get('Content-Type', '').split(';')[0].strip()
+        if tipo not in TIPOS_COMPRIMIBLES:
+            return
+        if not response.streaming and len(response.content) < TAMANO_MINIMO_COMPRESION:
+            return
+
+        # El cuerpo cambia según Accept-Encoding, aunque este cliente no comprima
+        patch_vary_headers(response, ('Accept-Encoding',))
+        # get_token() (ej: {% csrf_token %}) marca CSRF_COOKIE_NEEDS_UPDATE al poner el token en la página
+        con_secretos = bool(request.META.get('CSRF_COOKIE_NEEDS_UPDATE')) or (response.streaming and tipo == 'text/html')
+        codificacion = self._codificacion(request, con_secretos)
+        if codificacion is None:
+            return
+
+        if response.streaming:
+            if response.is_async:
+                # Los iteradores asíncronos (ASGI) se envían tal cual
+                return
+            if codificacion == 'br':
+                response.streaming_content = _brotli_secuencia(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=100)
+            del response.headers['Content-Length']
+        else:
+            if codificacion == 'br':
+                comprimido = brotli.compress(response.content, quality=CALIDAD_BROTLI)
+            else:
+                comprimido = compress_string(response.content, max_random_bytes=100)
+            if len(comprimido) >= len(response.content):
+                return
+            response.content = comprimido
+            response.headers['Content-Length'] = str(len(comprimido))
+
+        # El ETag fuerte ya no corresponde al cuerpo comprimido
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codificacion
+
+
+class PoliticaCacheMiddleware:
+    """
+    Política de caché por defecto para el contenido autenticado: solo el
+    navegador puede guardarlo (private) y debe revalidarlo (no-cache), por lo
+    que ningún proxy compartido entrega la página de un usuario a otro.
+
+    Las vistas que pueden cachearse más tiempo lo indican con los decoradores
+    de Django (@cache_control, @never_cache); si la respuesta ya trae
+    Cache-Control, se respeta. Junto a ConditionalGetMiddleware, la
+    revalidación responde 304 sin cuerpo cuando nada cambió.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        usuario = getattr(request, 'user', None)
+        if usuario is None or not usuario.is_authenticated:
+            return response
+
+        # La respuesta depende de quién la pide (sesión o Basic en la API)
+        patch_vary_headers(response, ('Cookie', 'Authorization') if 'HTTP_AUTHORIZATION' in request.META else ('Cookie',))
+        if not response.has_header('Cache-Control'):
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
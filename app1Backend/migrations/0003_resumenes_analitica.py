@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0002_alter_reacondicionamiento_estado_final'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoResumen',
+            fields=[
+                ('nombre', models.CharField(db_column='Nombre', max_length=50, primary_key=True, serialize=False)),
+                ('ultima_fecha', models.DateField(db_column='Ultima_Fecha')),
+                ('actualizado', models.DateTimeField(auto_now=True, db_column='Actualizado')),
+            ],
+            options={
+                'db_table': 'estado_resumen',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDonacionDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(db_column='Fecha')),
+                ('rut_institucion', models.CharField(db_column='RUT_Institucion', max_length=12)),
+                ('total_donaciones', models.IntegerField(db_column='Total_Donaciones', default=0)),
+                ('total_equipos', models.IntegerField(db_column='Total_Equipos', default=0)),
+            ],
+            options={
+                'db_table': 'resumen_donacion_diario',
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'rut_institucion'), name='uq_resumen_donacion_fecha_inst')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenReacondicionamientoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(db_column='Fecha')),
+                ('id_tecnico', models.IntegerField(blank=True, db_column='ID_Tecnico', null=True)),
+                ('total_reacondicionados', models.IntegerField(db_column='Total_Reacondicionados', default=0)),
+                ('total_irreparables', models.IntegerField(db_column='Total_Irreparables', default=0)),
+                ('dias_reparacion', models.IntegerField(db_column='Dias_Reparacion', default=0)),
+                ('reparaciones_medidas', models.IntegerField(db_column='Reparaciones_Medidas', default=0)),
+            ],
+            options={
+                'db_table': 'resumen_reacondicionamiento_diario',
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'id_tecnico'), name='uq_resumen_reacond_fecha_tecnico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenSoporteDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(db_column='Fecha')),
+                ('tipo', models.CharField(db_column='Tipo', max_length=12)),
+                ('total_tickets', models.IntegerField(db_column='Total_Tickets', default=0)),
+            ],
+            options={
+                'db_table': 'resumen_soporte_diario',
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'tipo'), name='uq_resumen_soporte_fecha_tipo')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0003_resumenes_analitica'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reacondicionamiento',
+            name='fecha_reclamo',
+            field=models.DateTimeField(blank=True, db_column='Fecha_Reclamo', db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:38
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0004_reacondicionamiento_fecha_reclamo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAuditoria',
+            fields=[
+                ('id_registro', models.BigAutoField(db_column='ID_Registro', primary_key=True, serialize=False)),
+                ('modelo', models.CharField(db_column='Modelo', max_length=50)),
+                ('objeto_id', models.CharField(db_column='Objeto_ID', max_length=50)),
+                ('accion', models.CharField(choices=[('Creacion', 'Creación'), ('Modificacion', 'Modificación'), ('Eliminacion', 'Eliminación')], db_column='Accion', max_length=12)),
+                ('cambios', models.JSONField(db_column='Cambios', default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('usuario_email', models.CharField(blank=True, db_column='Usuario_Email', max_length=100, null=True)),
+                ('fecha', models.DateTimeField(db_column='Fecha', default=django.utils.timezone.now)),
+                ('usuario', models.ForeignKey(blank=True, db_column='ID_Usuario', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'registro_auditoria',
+                'indexes': [models.Index(fields=['modelo', 'objeto_id', '-fecha'], name='idx_auditoria_objeto')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0005_registro_auditoria'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='equipo',
+            name='marca',
+            field=models.CharField(blank=True, db_column='Marca', db_index=True, max_length=50, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0006_equipo_marca_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroCambio',
+            fields=[
+                ('id_cambio', models.BigAutoField(db_column='ID_Cambio', primary_key=True, serialize=False)),
+                ('recurso', models.CharField(db_column='Recurso', max_length=30)),
+                ('objeto_id', models.CharField(db_column='Objeto_ID', max_length=50)),
+                ('operacion', models.CharField(choices=[('Creacion', 'Creación'), ('Modificacion', 'Modificación'), ('Eliminacion', 'Eliminación')], db_column='Operacion', max_length=12)),
+                ('fecha', models.DateTimeField(db_column='Fecha', db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'registro_cambio',
+                'indexes': [models.Index(fields=['recurso', 'id_cambio'], name='idx_cambio_recurso')],
+            },
+        ),
+    ]
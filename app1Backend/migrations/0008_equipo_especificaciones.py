@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0007_registro_cambio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipo',
+            name='almacenamiento_gb',
+            field=models.PositiveIntegerField(blank=True, db_column='Almacenamiento_GB', db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='equipo',
+            name='almacenamiento_tipo',
+            field=models.CharField(blank=True, db_column='Almacenamiento_Tipo', editable=False, max_length=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='equipo',
+            name='ram_gb',
+            field=models.PositiveIntegerField(blank=True, db_column='RAM_GB', db_index=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='equipo',
+            index=models.Index(fields=['almacenamiento_tipo', 'ram_gb'], name='idx_equipo_tipo_alm_ram'),
+        ),
+    ]
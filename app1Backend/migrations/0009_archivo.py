@@ -0,0 +1,78 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0008_equipo_especificaciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AsignacionArchivada',
+            fields=[
+                ('id_asignacion', models.IntegerField(db_column='ID_Asignacion', primary_key=True, serialize=False)),
+                ('fecha_solicitud', models.DateField(db_column='Fecha_Solicitud', db_index=True)),
+                ('cantidad_solicitada', models.IntegerField(db_column='Cantidad_Solicitada')),
+                ('estado', models.CharField(db_column='Estado', max_length=9)),
+                ('fecha_archivado', models.DateTimeField(db_column='Fecha_Archivado', default=django.utils.timezone.now)),
+                ('rut_institucion_receptora', models.ForeignKey(db_column='RUT_Institucion_Receptora', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app1Backend.institucion')),
+            ],
+            options={
+                'db_table': 'asignacion_archivada',
+            },
+        ),
+        migrations.CreateModel(
+            name='DetalleAsignacionArchivado',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('id_asignacion', models.IntegerField(db_column='ID_Asignacion', db_index=True)),
+                ('fecha_entrega', models.DateField(blank=True, db_column='Fecha_Entrega', null=True)),
+                ('observaciones', models.TextField(blank=True, db_column='Observaciones', null=True)),
+                ('fecha_archivado', models.DateTimeField(db_column='Fecha_Archivado', default=django.utils.timezone.now)),
+                ('id_equipo', models.OneToOneField(db_column='ID_Equipo', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='detalle_archivado', to='app1Backend.equipo')),
+            ],
+            options={
+                'db_table': 'detalle_asignacion_archivado',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReacondicionamientoArchivado',
+            fields=[
+                ('id_equipo', models.OneToOneField(db_column='ID_Equipo', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='reacondicionamiento_archivado', serialize=False, to='app1Backend.equipo')),
+                ('taller_asignado', models.CharField(blank=True, db_column='Taller_Asignado', max_length=150, null=True)),
+                ('fecha_inicio', models.DateField(blank=True, db_column='Fecha_Inicio', null=True)),
+                ('fecha_fin', models.DateField(blank=True, db_column='Fecha_Fin', db_index=True, null=True)),
+                ('acciones_realizadas', models.TextField(blank=True, db_column='Acciones_Realizadas', null=True)),
+                ('estado_final', models.CharField(db_column='Estado_Final', max_length=20)),
+                ('evidencia_final', models.ImageField(blank=True, null=True, upload_to='reacondicionamiento/', verbose_name='Foto del trabajo final')),
+                ('fecha_archivado', models.DateTimeField(db_column='Fecha_Archivado', default=django.utils.timezone.now)),
+                ('id_tecnico', models.ForeignKey(blank=True, db_column='ID_Tecnico', db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'reacondicionamiento_archivado',
+            },
+        ),
+        migrations.CreateModel(
+            name='SoporteArchivado',
+            fields=[
+                ('id_soporte', models.IntegerField(db_column='ID_Soporte', primary_key=True, serialize=False)),
+                ('id_asignacion', models.IntegerField(db_column='ID_Asignacion', db_index=True)),
+                ('tipo', models.CharField(db_column='Tipo', max_length=12)),
+                ('fecha_evento', models.DateField(db_column='Fecha_Evento', db_index=True)),
+                ('descripcion', models.TextField(blank=True, db_column='Descripcion', null=True)),
+                ('resolucion', models.TextField(blank=True, db_column='Resolucion', null=True)),
+                ('fecha_archivado', models.DateTimeField(db_column='Fecha_Archivado', default=django.utils.timezone.now)),
+                ('id_tecnico', models.ForeignKey(blank=True, db_column='ID_Tecnico', db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('rut_institucion_receptora', models.ForeignKey(blank=True, db_column='RUT_Institucion_Receptora', db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='app1Backend.institucion')),
+            ],
+            options={
+                'db_table': 'soporte_archivado',
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:16
+
+import datetime
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Q
+from django.db.models.functions import Cast
+
+
+def completar_ciclo(apps, schema_editor):
+    """
+    Completa el ciclo de vida de los tickets existentes: apertura = fecha_evento,
+    estado según resolución/técnico y plazo SLA según el tipo. La fecha de
+    resolución de los tickets antiguos se desconoce y queda vacía (no entran al MTTR).
+    Los abiertos que ya vencieron se marcan como incumplidos sin notificar.
+    """
+    Soporte = apps.get_model('app1Backend', 'Soporte')
+    Soporte.objects.update(fecha_apertura=Cast('fecha_evento', models.DateTimeField()))
+    resueltos = Q(resolucion__isnull=False) & ~Q(resolucion='')
+    Soporte.objects.filter(resueltos).update(estado='Resuelto')
+    Soporte.objects.exclude(resueltos).filter(id_tecnico__isnull=False).update(
+        estado='Asignado', fecha_asignacion=F('fecha_apertura'),
+    )
+    for tipo, horas in settings.SOPORTE_SLA_HORAS.items():
+        Soporte.objects.filter(tipo=tipo).update(vencimiento_sla=F('fecha_apertura') + datetime.timedelta(hours=horas))
+    Soporte.objects.exclude(tipo__in=list(settings.SOPORTE_SLA_HORAS)).update(
+        vencimiento_sla=F('fecha_apertura') + datetime.timedelta(hours=settings.SOPORTE_SLA_HORAS_POR_DEFECTO),
+    )
+    Soporte.objects.exclude(estado='Resuelto').filter(vencimiento_sla__lt=django.utils.timezone.now()).update(
+        sla_incumplido=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0009_archivo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='soporte',
+            name='estado',
+            field=models.CharField(choices=[('Abierto', 'Abierto'), ('Asignado', 'Asignado'), ('En Curso', 'En Curso'), ('Resuelto', 'Resuelto')], db_column='Estado', default='Abierto', editable=False, max_length=9),
+        ),
+        migrations.AddField(
+            model_name='soporte',
+            name='fecha_apertura',
+            field=models.DateTimeField(db_column='Fecha_Apertura', default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='soporte',
+            name='fecha_asignacion',
+            field=models.DateTimeField(blank=True, db_column='Fecha_Asignacion', editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='soporte',
+            name='fecha_primera_respuesta',
+            field=models.DateTimeField(blank=True, db_column='Fecha_Primera_Respuesta', editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='soporte',
+            name='fecha_resolucion',
+            field=models.DateTimeField(blank=True, db_column='Fecha_Resolucion', db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='soporte',
+            name='sla_incumplido',
+            field=models.BooleanField(db_column='SLA_Incumplido', default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='soporte',
+            name='vencimiento_sla',
+            field=models.DateTimeField(blank=True, db_column='Vencimiento_SLA', editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='soporte',
+            index=models.Index(fields=['estado', 'vencimiento_sla', 'sla_incumplido'], name='idx_soporte_sla'),
+        ),
+        migrations.RunPython(completar_ciclo, migrations.RunPython.noop),
+    ]
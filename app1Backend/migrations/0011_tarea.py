@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:21
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0010_soporte_sla'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id_tarea', models.BigAutoField(db_column='ID_Tarea', primary_key=True, serialize=False)),
+                ('nombre', models.CharField(db_column='Nombre', max_length=150)),
+                ('argumentos', models.JSONField(db_column='Argumentos', default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('prioridad', models.SmallIntegerField(db_column='Prioridad', default=0)),
+                ('estado', models.CharField(choices=[('Pendiente', 'Pendiente'), ('En Curso', 'En Curso'), ('Completada', 'Completada'), ('Fallida', 'Fallida')], db_column='Estado', default='Pendiente', max_length=12)),
+                ('intentos', models.PositiveSmallIntegerField(db_column='Intentos', default=0)),
+                ('max_intentos', models.PositiveSmallIntegerField(db_column='Max_Intentos', default=3)),
+                ('ejecutar_desde', models.DateTimeField(db_column='Ejecutar_Desde', default=django.utils.timezone.now)),
+                ('fecha_creacion', models.DateTimeField(db_column='Fecha_Creacion', default=django.utils.timezone.now)),
+                ('fecha_inicio', models.DateTimeField(blank=True, db_column='Fecha_Inicio', null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, db_column='Fecha_Fin', null=True)),
+                ('error', models.TextField(blank=True, db_column='Error')),
+                ('trabajador', models.CharField(blank=True, db_column='Trabajador', max_length=100)),
+            ],
+            options={
+                'db_table': 'tarea',
+                'indexes': [models.Index(fields=['estado', 'ejecutar_desde', 'prioridad'], name='idx_tarea_cola')],
+            },
+        ),
+    ]
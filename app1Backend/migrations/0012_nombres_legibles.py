@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:27
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0011_tarea'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='asignacion',
+            options={'verbose_name': 'asignación', 'verbose_name_plural': 'asignaciones'},
+        ),
+        migrations.AlterModelOptions(
+            name='asignacionarchivada',
+            options={'verbose_name': 'asignación archivada', 'verbose_name_plural': 'asignaciones archivadas'},
+        ),
+        migrations.AlterModelOptions(
+            name='detalleasignacion',
+            options={'verbose_name': 'detalle de asignación', 'verbose_name_plural': 'detalles de asignación'},
+        ),
+        migrations.AlterModelOptions(
+            name='detalleasignacionarchivado',
+            options={'verbose_name': 'detalle de asignación archivado', 'verbose_name_plural': 'detalles de asignación archivados'},
+        ),
+        migrations.AlterModelOptions(
+            name='donacion',
+            options={'verbose_name': 'donación', 'verbose_name_plural': 'donaciones'},
+        ),
+        migrations.AlterModelOptions(
+            name='institucion',
+            options={'verbose_name': 'institución', 'verbose_name_plural': 'instituciones'},
+        ),
+        migrations.AlterModelOptions(
+            name='reacondicionamientoarchivado',
+            options={'verbose_name_plural': 'reacondicionamientos archivados'},
+        ),
+        migrations.AlterModelOptions(
+            name='soportearchivado',
+            options={'verbose_name_plural': 'soportes archivados'},
+        ),
+    ]
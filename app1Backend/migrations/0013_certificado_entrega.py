@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 04:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0012_nombres_legibles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificadoEntrega',
+            fields=[
+                ('id_asignacion', models.IntegerField(db_column='ID_Asignacion', primary_key=True, serialize=False)),
+                ('rut_institucion', models.CharField(db_column='RUT_Institucion', max_length=12)),
+                ('fecha_entrega', models.DateField(db_column='Fecha_Entrega', db_index=True)),
+                ('total_equipos', models.IntegerField(db_column='Total_Equipos')),
+                ('archivo', models.CharField(db_column='Archivo', max_length=255)),
+                ('firma', models.CharField(db_column='Firma', max_length=100)),
+                ('fecha_generacion', models.DateTimeField(db_column='Fecha_Generacion', default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'certificado de entrega',
+                'verbose_name_plural': 'certificados de entrega',
+                'db_table': 'certificado_entrega',
+            },
+        ),
+    ]
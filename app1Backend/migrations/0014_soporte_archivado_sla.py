@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-19 05:02
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Cast
+
+
+def completar_archivados(apps, schema_editor):
+    """
+    Los tickets ya archivados eran todos resueltos: apertura = fecha_evento y
+    plazo SLA según el tipo, como en 0010. Las demás fechas no se guardaron.
+    """
+    SoporteArchivado = apps.get_model('app1Backend', 'SoporteArchivado')
+    SoporteArchivado.objects.update(fecha_apertura=Cast('fecha_evento', models.DateTimeField()))
+    for tipo, horas in settings.SOPORTE_SLA_HORAS.items():
+        SoporteArchivado.objects.filter(tipo=tipo).update(
+            vencimiento_sla=F('fecha_apertura') + datetime.timedelta(hours=horas),
+        )
+    SoporteArchivado.objects.exclude(tipo__in=list(settings.SOPORTE_SLA_HORAS)).update(
+        vencimiento_sla=F('fecha_apertura') + datetime.timedelta(hours=settings.SOPORTE_SLA_HORAS_POR_DEFECTO),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0013_certificado_entrega'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='soportearchivado',
+            name='estado',
+            field=models.CharField(db_column='Estado', default='Resuelto', max_length=9),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='soportearchivado',
+            name='fecha_apertura',
+            field=models.DateTimeField(db_column='Fecha_Apertura', default=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='soportearchivado',
+            name='fecha_asignacion',
+            field=models.DateTimeField(blank=True, db_column='Fecha_Asignacion', null=True),
+        ),
+        migrations.AddField(
+            model_name='soportearchivado',
+            name='fecha_primera_respuesta',
+            field=models.DateTimeField(blank=True, db_column='Fecha_Primera_Respuesta', null=True),
+        ),
+        migrations.AddField(
+            model_name='soportearchivado',
+            name='fecha_resolucion',
+            field=models.DateTimeField(blank=True, db_column='Fecha_Resolucion', null=True),
+        ),
+        migrations.AddField(
+            model_name='soportearchivado',
+            name='sla_incumplido',
+            field=models.BooleanField(db_column='SLA_Incumplido', default=False),
+        ),
+        migrations.AddField(
+            model_name='soportearchivado',
+            name='vencimiento_sla',
+            field=models.DateTimeField(blank=True, db_column='Vencimiento_SLA', null=True),
+        ),
+        migrations.RunPython(completar_archivados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 05:41
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def crear_secuencia(apps, schema_editor):
+    """La secuencia continúa después del último cursor ya entregado."""
+    RegistroCambio = apps.get_model('app1Backend', 'RegistroCambio')
+    SecuenciaCambios = apps.get_model('app1Backend', 'SecuenciaCambios')
+    ultimo = RegistroCambio.objects.aggregate(ultimo=Max('id_cambio'))['ultimo'] or 0
+    SecuenciaCambios.objects.create(id_secuencia=1, ultimo_cambio=ultimo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0014_soporte_archivado_sla'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecuenciaCambios',
+            fields=[
+                ('id_secuencia', models.PositiveSmallIntegerField(db_column='ID_Secuencia', primary_key=True, serialize=False)),
+                ('ultimo_cambio', models.BigIntegerField(db_column='Ultimo_Cambio', default=0)),
+            ],
+            options={
+                'db_table': 'secuencia_cambios',
+            },
+        ),
+        migrations.RunPython(crear_secuencia, migrations.RunPython.noop),
+    ]
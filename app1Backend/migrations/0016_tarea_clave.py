@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1Backend', '0015_secuencia_cambios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarea',
+            name='clave',
+            field=models.CharField(blank=True, db_column='Clave', max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['nombre', 'clave', 'estado'], name='idx_tarea_clave'),
+        ),
+    ]
@@ -1,14 +1,27 @@
+import datetime
+
+from django.conf import settings
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 # Necesario para el Custom User Model
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin 
 from django.utils import timezone
 
+from .especificaciones import normalizar
+
 # NOTA: La opción `on_delete=models.DO_NOTHING` se mantiene en las tablas Institucion->Donacion/Asignacion
 # por la lógica de la base de datos existente (generada por `inspectdb`), pero se han
 # realizado correcciones a `models.CASCADE` o `models.SET_NULL` en otras relaciones dependientes
 # para mejorar la integridad referencial y seguir las buenas prácticas de Django.
 
 
+def _referencia(objeto, campo):
+    # FK a institución o técnico para __str__: desde la caché de referencias.py si no está cargada
+    from .referencias import adjuntar
+    adjuntar([objeto], campo)
+    return getattr(objeto, campo)
+
+
 # =========================================================
 # 1. MANAGER PERSONALIZADO PARA EL MODELO USUARIO
 # =========================================================
@@ -118,6 +131,8 @@ class Institucion(models.Model):
 
     class Meta:
         db_table = 'institucion'
+        verbose_name = 'institución'
+        verbose_name_plural = 'instituciones'
 
     def __str__(self):
         return self.nombre
@@ -132,24 +147,45 @@ class Donacion(models.Model):
 
     class Meta:
         db_table = 'donacion'
+        verbose_name = 'donación'
+        verbose_name_plural = 'donaciones'
 
     def __str__(self):
-        return f"Donación #{self.id_donacion} de {self.rut_institucion.nombre}"
+        return f"Donación #{self.id_donacion} de {_referencia(self, 'rut_institucion').nombre}"
 
 class Equipo(models.Model):
     id_equipo = models.AutoField(db_column='ID_Equipo', primary_key=True)
     id_donacion = models.ForeignKey(Donacion, models.CASCADE, db_column='ID_Donacion')
     num_serie = models.CharField(db_column='Num_Serie', unique=True, max_length=50, blank=True, null=True)
     tipo = models.CharField(db_column='Tipo', max_length=7)
-    marca = models.CharField(db_column='Marca', max_length=50, blank=True, null=True)
+    # Indexada: el filtro por marca del admin hace DISTINCT sobre esta columna
+    marca = models.CharField(db_column='Marca', max_length=50, blank=True, null=True, db_index=True)
     modelo = models.CharField(db_column='Modelo', max_length=100, blank=True, null=True)
     ram = models.CharField(db_column='RAM', max_length=20, blank=True, null=True)
     almacenamiento = models.CharField(db_column='Almacenamiento', max_length=50, blank=True, null=True)
     estado_inicial = models.TextField(db_column='Estado_Inicial', blank=True, null=True)
     imagen = models.ImageField(upload_to='equipos/', blank=True, null=True, verbose_name="Foto del Equipo")
+    # Especificaciones normalizadas desde `ram` y `almacenamiento` (ver especificaciones.py).
+    # Se calculan al guardar; no se editan a mano. Permiten filtrar por rangos con índice.
+    ram_gb = models.PositiveIntegerField(db_column='RAM_GB', blank=True, null=True, db_index=True, editable=False)
+    almacenamiento_gb = models.PositiveIntegerField(db_column='Almacenamiento_GB', blank=True, null=True, db_index=True, editable=False)
+    almacenamiento_tipo = models.CharField(db_column='Almacenamiento_Tipo', max_length=4, blank=True, null=True, editable=False)
 
     class Meta:
         db_table = 'equipo'
+        indexes = [
+            # "SSD con al menos 8 GB de RAM": WHERE almacenamiento_tipo = ? AND ram_gb >= ?
+            models.Index(fields=['almacenamiento_tipo', 'ram_gb'], name='idx_equipo_tipo_alm_ram'),
+        ]
+
+    def save(self, *args, **kwargs):
+        for campo, valor in normalizar(self.ram, self.almacenamiento).items():
+            setattr(self, campo, valor)
+        # Si se guardan solo algunos campos y entre ellos está el texto, también sus columnas derivadas
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'ram', 'almacenamiento'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'ram_gb', 'almacenamiento_gb', 'almacenamiento_tipo'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         # Usamos 'or' para evitar errores si un campo está vacío.
@@ -168,9 +204,11 @@ class Asignacion(models.Model):
 
     class Meta:
         db_table = 'asignacion'
+        verbose_name = 'asignación'
+        verbose_name_plural = 'asignaciones'
 
     def __str__(self):
-        return f"Asignación #{self.id_asignacion} para {self.rut_institucion_receptora.nombre}"
+        return f"Asignación #{self.id_asignacion} para {_referencia(self, 'rut_institucion_receptora').nombre}"
 
 class DetalleAsignacion(models.Model):
     id = models.AutoField(primary_key=True)
@@ -181,9 +219,11 @@ class DetalleAsignacion(models.Model):
 
     class Meta:
         db_table = 'detalle_asignacion'
+        verbose_name = 'detalle de asignación'
+        verbose_name_plural = 'detalles de asignación'
 
     def __str__(self):
-        return f"Detalle de Equipo #{self.id_equipo.id_equipo} en Asignación #{self.id_asignacion.id_asignacion}"
+        return f"Detalle de Equipo #{self.id_equipo_id} en Asignación #{self.id_asignacion_id}"
 
 class Reacondicionamiento(models.Model):
     # CORRECCIÓN: Si se elimina el Equipo, el registro de Reacondicionamiento se elimina (CASCADE).
@@ -197,6 +237,9 @@ class Reacondicionamiento(models.Model):
     acciones_realizadas = models.TextField(db_column='Acciones_Realizadas', blank=True, null=True)
     estado_final = models.CharField(db_column='Estado_Final', max_length=20)
     evidencia_final = models.ImageField(upload_to='reacondicionamiento/', blank=True, null=True, verbose_name="Foto del trabajo final")
+    # Momento en que un técnico tomó el equipo desde la cola de trabajo.
+    # Se limpia al guardar el primer avance; si queda antiguo, el reclamo se libera.
+    fecha_reclamo = models.DateTimeField(db_column='Fecha_Reclamo', blank=True, null=True, db_index=True)
 
     class Meta:
         db_table = 'reacondicionamiento'
@@ -205,6 +248,14 @@ class Reacondicionamiento(models.Model):
         return f"Reacondicionamiento para {self.id_equipo}"
 
 class Soporte(models.Model):
+    ESTADO_CHOICES = [
+        ('Abierto', 'Abierto'),
+        ('Asignado', 'Asignado'),
+        ('En Curso', 'En Curso'),
+        ('Resuelto', 'Resuelto'),
+    ]
+    ESTADOS_ABIERTOS = ['Abierto', 'Asignado', 'En Curso']
+
     id_soporte = models.AutoField(db_column='ID_Soporte', primary_key=True)
     # Si se elimina la Asignación, se eliminan los Soportes (CASCADE).
     id_asignacion = models.ForeignKey(
@@ -219,9 +270,396 @@ class Soporte(models.Model):
     fecha_evento = models.DateField(db_column='Fecha_Evento', auto_now_add=True)
     descripcion = models.TextField(db_column='Descripcion', blank=True, null=True)
     resolucion = models.TextField(db_column='Resolucion', blank=True, null=True)
+    # Ciclo de vida y SLA (ver sla.py). Se mantienen al guardar; no se editan en formularios.
+    estado = models.CharField(db_column='Estado', max_length=9, choices=ESTADO_CHOICES, default='Abierto', editable=False)
+    fecha_apertura = models.DateTimeField(db_column='Fecha_Apertura', default=timezone.now, editable=False)
+    fecha_asignacion = models.DateTimeField(db_column='Fecha_Asignacion', blank=True, null=True, editable=False)
+    fecha_primera_respuesta = models.DateTimeField(db_column='Fecha_Primera_Respuesta', blank=True, null=True, editable=False)
+    fecha_resolucion = models.DateTimeField(db_column='Fecha_Resolucion', blank=True, null=True, db_index=True, editable=False)
+    # Plazo de resolución según el tipo (SOPORTE_SLA_HORAS) y si ya se superó
+    vencimiento_sla = models.DateTimeField(db_column='Vencimiento_SLA', blank=True, null=True, editable=False)
+    sla_incumplido = models.BooleanField(db_column='SLA_Incumplido', default=False, editable=False)
 
     class Meta:
         db_table = 'soporte'
+        indexes = [
+            # Revisión de SLA: WHERE estado IN (...) AND vencimiento_sla < ? AND NOT sla_incumplido
+            # Se resuelve solo con el índice (incluye la PK), sin leer los tickets.
+            models.Index(fields=['estado', 'vencimiento_sla', 'sla_incumplido'], name='idx_soporte_sla'),
+        ]
+
+    def registrar_respuesta(self):
+        """Marca la primera respuesta del equipo técnico (la primera edición del ticket)."""
+        if self.fecha_primera_respuesta is None:
+            self.fecha_primera_respuesta = timezone.now()
+
+    def _actualizar_ciclo(self):
+        # Retorna los campos derivados, para agregarlos a update_fields
+        ahora = timezone.now()
+        if self.fecha_apertura is None:
+            self.fecha_apertura = ahora
+        horas = settings.SOPORTE_SLA_HORAS.get(self.tipo, settings.SOPORTE_SLA_HORAS_POR_DEFECTO)
+        self.vencimiento_sla = self.fecha_apertura + datetime.timedelta(hours=horas)
+        if self.id_tecnico_id and self.fecha_asignacion is None:
+            self.fecha_asignacion = ahora
+        # `estado` todavía tiene el valor cargado de la BD: permite detectar la transición
+        if self.resolucion:
+            if self.estado != 'Resuelto':
+                self.fecha_resolucion = ahora
+                self.registrar_respuesta()
+                if self.fecha_resolucion > self.vencimiento_sla:
+                    self.sla_incumplido = True
+            self.estado = 'Resuelto'
+        else:
+            # Sin resolución (o se borró): el ticket vuelve a estar abierto
+            self.fecha_resolucion = None
+            if self.fecha_primera_respuesta:
+                self.estado = 'En Curso'
+            elif self.id_tecnico_id:
+                self.estado = 'Asignado'
+            else:
+                self.estado = 'Abierto'
+        return {
+            'estado', 'fecha_apertura', 'fecha_asignacion', 'fecha_primera_respuesta',
+            'fecha_resolucion', 'vencimiento_sla', 'sla_incumplido',
+        }
+
+    def save(self, *args, **kwargs):
+        derivados = self._actualizar_ciclo()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | derivados
+        super().save(*args, **kwargs)
     
     def __str__(self):
-        return f"Soporte #{self.id_soporte} ({self.tipo}) para Asignación #{self.id_asignacion.id_asignacion}"
\ No newline at end of file
+        return f"Soporte #{self.id_soporte} ({self.tipo}) para Asignación #{self.id_asignacion_id}"
+
+# =========================================================
+# 4. TABLAS DE RESUMEN (ANALÍTICA)
+# =========================================================
+# Se llenan con el comando `python manage.py actualizar_resumenes`.
+# Las vistas de estadísticas leen SOLO estas tablas, nunca las tablas completas.
+
+class ResumenDonacionDiario(models.Model):
+    fecha = models.DateField(db_column='Fecha')
+    # Se guarda el RUT como texto para que el resumen sobreviva a cambios en Institucion
+    rut_institucion = models.CharField(db_column='RUT_Institucion', max_length=12)
+    total_donaciones = models.IntegerField(db_column='Total_Donaciones', default=0)
+    total_equipos = models.IntegerField(db_column='Total_Equipos', default=0)
+
+    class Meta:
+        db_table = 'resumen_donacion_diario'
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'rut_institucion'], name='uq_resumen_donacion_fecha_inst'),
+        ]
+
+    def __str__(self):
+        return f"Donaciones {self.fecha} ({self.rut_institucion}): {self.total_donaciones}"
+
+class ResumenReacondicionamientoDiario(models.Model):
+    # La fecha corresponde a `fecha_fin` del reacondicionamiento
+    fecha = models.DateField(db_column='Fecha')
+    id_tecnico = models.IntegerField(db_column='ID_Tecnico', blank=True, null=True)
+    total_reacondicionados = models.IntegerField(db_column='Total_Reacondicionados', default=0)
+    total_irreparables = models.IntegerField(db_column='Total_Irreparables', default=0)
+    # Suma de (fecha_fin - fecha_inicio) en días y cuántos registros la componen,
+    # para calcular el tiempo promedio de reparación al agregar por mes.
+    dias_reparacion = models.IntegerField(db_column='Dias_Reparacion', default=0)
+    reparaciones_medidas = models.IntegerField(db_column='Reparaciones_Medidas', default=0)
+
+    class Meta:
+        db_table = 'resumen_reacondicionamiento_diario'
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'id_tecnico'], name='uq_resumen_reacond_fecha_tecnico'),
+        ]
+
+    def __str__(self):
+        return f"Reacondicionamientos {self.fecha} (Técnico {self.id_tecnico}): {self.total_reacondicionados}"
+
+class ResumenSoporteDiario(models.Model):
+    fecha = models.DateField(db_column='Fecha')
+    tipo = models.CharField(db_column='Tipo', max_length=12)
+    total_tickets = models.IntegerField(db_column='Total_Tickets', default=0)
+
+    class Meta:
+        db_table = 'resumen_soporte_diario'
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'tipo'], name='uq_resumen_soporte_fecha_tipo'),
+        ]
+
+    def __str__(self):
+        return f"Soportes {self.fecha} ({self.tipo}): {self.total_tickets}"
+
+class EstadoResumen(models.Model):
+    """Marca de agua: último día procesado por cada resumen (carga incremental)."""
+    nombre = models.CharField(db_column='Nombre', primary_key=True, max_length=50)
+    ultima_fecha = models.DateField(db_column='Ultima_Fecha')
+    actualizado = models.DateTimeField(db_column='Actualizado', auto_now=True)
+
+    class Meta:
+        db_table = 'estado_resumen'
+
+    def __str__(self):
+        return f"{self.nombre} hasta {self.ultima_fecha}"
+
+
+# =========================================================
+# 5. AUDITORÍA (HISTORIAL DE CAMBIOS, SOLO INSERCIÓN)
+# =========================================================
+
+class RegistroAuditoria(models.Model):
+    ACCION_CHOICES = [
+        ('Creacion', 'Creación'),
+        ('Modificacion', 'Modificación'),
+        ('Eliminacion', 'Eliminación'),
+    ]
+
+    id_registro = models.BigAutoField(db_column='ID_Registro', primary_key=True)
+    # Nombre del modelo en minúsculas (ej: 'equipo') y PK del objeto como texto
+    modelo = models.CharField(db_column='Modelo', max_length=50)
+    objeto_id = models.CharField(db_column='Objeto_ID', max_length=50)
+    accion = models.CharField(db_column='Accion', max_length=12, choices=ACCION_CHOICES)
+    # {campo: [valor_anterior, valor_nuevo]}
+    cambios = models.JSONField(db_column='Cambios', encoder=DjangoJSONEncoder, default=dict)
+    # Se guarda el email además del FK para no perder el autor si se elimina el usuario
+    usuario = models.ForeignKey(Usuario, models.SET_NULL, db_column='ID_Usuario', blank=True, null=True)
+    usuario_email = models.CharField(db_column='Usuario_Email', max_length=100, blank=True, null=True)
+    fecha = models.DateTimeField(db_column='Fecha', default=timezone.now)
+
+    class Meta:
+        db_table = 'registro_auditoria'
+        indexes = [
+            # Historial por objeto: WHERE modelo=? AND objeto_id=? ORDER BY fecha DESC
+            models.Index(fields=['modelo', 'objeto_id', '-fecha'], name='idx_auditoria_objeto'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_accion_display()} de {self.modelo} #{self.objeto_id} ({self.fecha:%d/%m/%Y %H:%M})"
+
+
+# =========================================================
+# 6. REGISTRO DE CAMBIOS (FEED DE SINCRONIZACIÓN PARA LA API)
+# =========================================================
+
+class RegistroCambio(models.Model):
+    """
+    Una fila por alta, modificación o eliminación de los recursos de la API.
+    El ID es el cursor del feed (/api/cambios/?since=<cursor>); lo asigna
+    cambios.py desde SecuenciaCambios, en orden de confirmación.
+    """
+    OPERACION_CHOICES = [
+        ('Creacion', 'Creación'),
+        ('Modificacion', 'Modificación'),
+        ('Eliminacion', 'Eliminación'),
+    ]
+
+    id_cambio = models.BigAutoField(db_column='ID_Cambio', primary_key=True)
+    # Nombre del recurso en la API (ej: 'equipos') y PK del objeto como texto
+    recurso = models.CharField(db_column='Recurso', max_length=30)
+    objeto_id = models.CharField(db_column='Objeto_ID', max_length=50)
+    operacion = models.CharField(db_column='Operacion', max_length=12, choices=OPERACION_CHOICES)
+    fecha = models.DateTimeField(db_column='Fecha', default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'registro_cambio'
+        indexes = [
+            # Feed filtrado por recurso: WHERE recurso IN (...) AND id_cambio > ? ORDER BY id_cambio
+            models.Index(fields=['recurso', 'id_cambio'], name='idx_cambio_recurso'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id_cambio} {self.get_operacion_display()} de {self.recurso} #{self.objeto_id}"
+
+
+class SecuenciaCambios(models.Model):
+    """
+    Último cursor asignado en el feed de cambios (una sola fila). Se bloquea
+    (SELECT ... FOR UPDATE) mientras se insertan los cambios, así los cursores
+    se confirman en el mismo orden en que se asignan (ver cambios.py).
+    """
+    id_secuencia = models.PositiveSmallIntegerField(db_column='ID_Secuencia', primary_key=True)
+    ultimo_cambio = models.BigIntegerField(db_column='Ultimo_Cambio', default=0)
+
+    class Meta:
+        db_table = 'secuencia_cambios'
+
+    def __str__(self):
+        return f"Último cambio #{self.ultimo_cambio}"
+
+
+# =========================================================
+# 7. ARCHIVO (REGISTROS CERRADOS)
+# =========================================================
+# El comando `python manage.py archivar_registros` mueve aquí los registros
+# cerrados hace más de ARCHIVO_DIAS (ver archivo.py). Conservan su ID original.
+# Las referencias no tienen restricción en la BD (db_constraint=False): el
+# archivo no impide eliminar usuarios, instituciones ni equipos.
+
+class SoporteArchivado(models.Model):
+    id_soporte = models.IntegerField(db_column='ID_Soporte', primary_key=True)
+    id_asignacion = models.IntegerField(db_column='ID_Asignacion', db_index=True)
+    # Copiada al archivar: la asignación puede archivarse después que el ticket
+    rut_institucion_receptora = models.ForeignKey(
+        Institucion, models.DO_NOTHING, db_column='RUT_Institucion_Receptora',
+        db_constraint=False, related_name='+', blank=True, null=True,
+    )
+    id_tecnico = models.ForeignKey(
+        Usuario, models.DO_NOTHING, db_column='ID_Tecnico',
+        db_constraint=False, related_name='+', blank=True, null=True,
+    )
+    tipo = models.CharField(db_column='Tipo', max_length=12)
+    fecha_evento = models.DateField(db_column='Fecha_Evento', db_index=True)
+    descripcion = models.TextField(db_column='Descripcion', blank=True, null=True)
+    resolucion = models.TextField(db_column='Resolucion', blank=True, null=True)
+    # Ciclo de vida y SLA tal como estaban al archivar (ver Soporte)
+    estado = models.CharField(db_column='Estado', max_length=9)
+    fecha_apertura = models.DateTimeField(db_column='Fecha_Apertura')
+    fecha_asignacion = models.DateTimeField(db_column='Fecha_Asignacion', blank=True, null=True)
+    fecha_primera_respuesta = models.DateTimeField(db_column='Fecha_Primera_Respuesta', blank=True, null=True)
+    fecha_resolucion = models.DateTimeField(db_column='Fecha_Resolucion', blank=True, null=True)
+    vencimiento_sla = models.DateTimeField(db_column='Vencimiento_SLA', blank=True, null=True)
+    sla_incumplido = models.BooleanField(db_column='SLA_Incumplido', default=False)
+    fecha_archivado = models.DateTimeField(db_column='Fecha_Archivado', default=timezone.now)
+
+    class Meta:
+        db_table = 'soporte_archivado'
+        verbose_name_plural = 'soportes archivados'
+
+    def __str__(self):
+        return f"Soporte #{self.id_soporte} ({self.tipo}, archivado)"
+
+class AsignacionArchivada(models.Model):
+    id_asignacion = models.IntegerField(db_column='ID_Asignacion', primary_key=True)
+    rut_institucion_receptora = models.ForeignKey(
+        Institucion, models.DO_NOTHING, db_column='RUT_Institucion_Receptora',
+        db_constraint=False, related_name='+',
+    )
+    fecha_solicitud = models.DateField(db_column='Fecha_Solicitud', db_index=True)
+    cantidad_solicitada = models.IntegerField(db_column='Cantidad_Solicitada')
+    estado = models.CharField(db_column='Estado', max_length=9)
+    fecha_archivado = models.DateTimeField(db_column='Fecha_Archivado', default=timezone.now)
+
+    class Meta:
+        db_table = 'asignacion_archivada'
+        verbose_name = 'asignación archivada'
+        verbose_name_plural = 'asignaciones archivadas'
+
+    def __str__(self):
+        return f"Asignación #{self.id_asignacion} (archivada)"
+
+class DetalleAsignacionArchivado(models.Model):
+    id = models.IntegerField(primary_key=True)
+    id_asignacion = models.IntegerField(db_column='ID_Asignacion', db_index=True)
+    # El equipo sigue activo: la relación inversa indica que ya fue entregado
+    id_equipo = models.OneToOneField(
+        Equipo, models.DO_NOTHING, db_column='ID_Equipo',
+        db_constraint=False, related_name='detalle_archivado',
+    )
+    fecha_entrega = models.DateField(db_column='Fecha_Entrega', blank=True, null=True)
+    observaciones = models.TextField(db_column='Observaciones', blank=True, null=True)
+    fecha_archivado = models.DateTimeField(db_column='Fecha_Archivado', default=timezone.now)
+
+    class Meta:
+        db_table = 'detalle_asignacion_archivado'
+        verbose_name = 'detalle de asignación archivado'
+        verbose_name_plural = 'detalles de asignación archivados'
+
+    def __str__(self):
+        return f"Detalle de Equipo #{self.id_equipo_id} en Asignación #{self.id_asignacion} (archivado)"
+
+class ReacondicionamientoArchivado(models.Model):
+    id_equipo = models.OneToOneField(
+        Equipo, models.DO_NOTHING, db_column='ID_Equipo', primary_key=True,
+        db_constraint=False, related_name='reacondicionamiento_archivado',
+    )
+    id_tecnico = models.ForeignKey(
+        Usuario, models.DO_NOTHING, db_column='ID_Tecnico',
+        db_constraint=False, related_name='+', blank=True, null=True,
+    )
+    taller_asignado = models.CharField(db_column='Taller_Asignado', max_length=150, blank=True, null=True)
+    fecha_inicio = models.DateField(db_column='Fecha_Inicio', blank=True, null=True)
+    fecha_fin = models.DateField(db_column='Fecha_Fin', blank=True, null=True, db_index=True)
+    acciones_realizadas = models.TextField(db_column='Acciones_Realizadas', blank=True, null=True)
+    estado_final = models.CharField(db_column='Estado_Final', max_length=20)
+    evidencia_final = models.ImageField(upload_to='reacondicionamiento/', blank=True, null=True, verbose_name="Foto del trabajo final")
+    fecha_archivado = models.DateTimeField(db_column='Fecha_Archivado', default=timezone.now)
+
+    class Meta:
+        db_table = 'reacondicionamiento_archivado'
+        verbose_name_plural = 'reacondicionamientos archivados'
+
+    def __str__(self):
+        return f"Reacondicionamiento para el equipo #{self.id_equipo_id} (archivado)"
+
+
+# =========================================================
+# 8. COLA DE TAREAS EN SEGUNDO PLANO
+# =========================================================
+# Tareas que se ejecutan fuera de la petición (correos, optimización de
+# imágenes). Las encola `tareas.py` y las ejecuta `python manage.py runworker`.
+
+class Tarea(models.Model):
+    ESTADO_CHOICES = [
+        ('Pendiente', 'Pendiente'),
+        ('En Curso', 'En Curso'),
+        ('Completada', 'Completada'),
+        ('Fallida', 'Fallida'),
+    ]
+
+    id_tarea = models.BigAutoField(db_column='ID_Tarea', primary_key=True)
+    # Ruta de la función registrada con @tarea (ej: 'app1Backend.services.entregar_correo')
+    nombre = models.CharField(db_column='Nombre', max_length=150)
+    # Tareas agrupadas (TareaRegistrada.agrupar): los eventos de una clave van en una sola tarea pendiente
+    clave = models.CharField(db_column='Clave', max_length=150, blank=True)
+    argumentos = models.JSONField(db_column='Argumentos', default=dict, encoder=DjangoJSONEncoder)
+    # Mayor número = se ejecuta antes
+    prioridad = models.SmallIntegerField(db_column='Prioridad', default=0)
+    estado = models.CharField(db_column='Estado', max_length=12, choices=ESTADO_CHOICES, default='Pendiente')
+    intentos = models.PositiveSmallIntegerField(db_column='Intentos', default=0)
+    max_intentos = models.PositiveSmallIntegerField(db_column='Max_Intentos', default=3)
+    # No se ejecuta antes de esta fecha (tareas programadas y reintentos con espera)
+    ejecutar_desde = models.DateTimeField(db_column='Ejecutar_Desde', default=timezone.now)
+    fecha_creacion = models.DateTimeField(db_column='Fecha_Creacion', default=timezone.now)
+    fecha_inicio = models.DateTimeField(db_column='Fecha_Inicio', blank=True, null=True)
+    fecha_fin = models.DateTimeField(db_column='Fecha_Fin', blank=True, null=True)
+    error = models.TextField(db_column='Error', blank=True)
+    # Proceso que la tomó (host:pid), para diagnosticar tareas colgadas
+    trabajador = models.CharField(db_column='Trabajador', max_length=100, blank=True)
+
+    class Meta:
+        db_table = 'tarea'
+        indexes = [
+            # Reclamo del worker: WHERE estado = 'Pendiente' AND ejecutar_desde <= ? ORDER BY prioridad DESC
+            models.Index(fields=['estado', 'ejecutar_desde', 'prioridad'], name='idx_tarea_cola'),
+            # Tarea pendiente de una clave: WHERE nombre = ? AND clave = ? AND estado = 'Pendiente'
+            models.Index(fields=['nombre', 'clave', 'estado'], name='idx_tarea_clave'),
+        ]
+
+    def __str__(self):
+        return f"Tarea #{self.id_tarea} {self.nombre} ({self.estado})"
+
+
+# =========================================================
+# 9. CERTIFICADOS DE ENTREGA
+# =========================================================
+
+class CertificadoEntrega(models.Model):
+    # Sin FK: el certificado se conserva cuando la asignación pasa al archivo (archivo.py)
+    id_asignacion = models.IntegerField(db_column='ID_Asignacion', primary_key=True)
+    rut_institucion = models.CharField(db_column='RUT_Institucion', max_length=12)
+    # Fecha de entrega más reciente de sus equipos: define el período del certificado
+    fecha_entrega = models.DateField(db_column='Fecha_Entrega', db_index=True)
+    total_equipos = models.IntegerField(db_column='Total_Equipos')
+    # Nombre del archivo en STORAGES['certificados']
+    archivo = models.CharField(db_column='Archivo', max_length=255)
+    # Firma (HMAC con SECRET_KEY) de los datos certificados, impresa en el documento
+    firma = models.CharField(db_column='Firma', max_length=100)
+    fecha_generacion = models.DateTimeField(db_column='Fecha_Generacion', default=timezone.now)
+
+    class Meta:
+        db_table = 'certificado_entrega'
+        verbose_name = 'certificado de entrega'
+        verbose_name_plural = 'certificados de entrega'
+
+    def __str__(self):
+        return f"Certificado de entrega de la Asignación #{self.id_asignacion} ({self.fecha_entrega:%d/%m/%Y})"
@@ -0,0 +1,47 @@
+"""
+Coalescencia de notificaciones de soporte.
+
+Cada vez que un técnico guarda un ticket (SoporteUpdateView) antes se enviaba
+un correo a la institución. Ahora las actualizaciones se acumulan durante una
+ventana configurable (NOTIFICACION_SOPORTE_VENTANA, en segundos) y al cerrarse
+la ventana se envía UN resumen por institución destinataria.
+
+- Lo pendiente vive en la cola de tareas (tareas.py), no en memoria: una
+  tarea por institución, programada al cierre de la ventana, a la que las
+  ediciones siguientes agregan el ID del ticket. Sobrevive a reinicios y es
+  la misma para todos los procesos web.
+- Al ejecutarse, los tickets del resumen se leen con una sola consulta con
+  JOIN (select_related).
+"""
+from collections import Counter
+
+from django.conf import settings
+
+from .models import Institucion, Soporte
+from .services import notificar_resumen_soporte
+from .tareas import tarea
+
+
+@tarea(prioridad=5)
+def enviar_resumen_soporte(rut_institucion, eventos):
+    """Tarea agrupada por institución: `eventos` son los IDs de los tickets editados, uno por edición."""
+    institucion = Institucion.objects.get(pk=rut_institucion)
+    if not institucion.contacto_email:
+        print(f">>> AVISO: La institución '{institucion.nombre}' no tiene email de contacto registrado.")
+        return
+    ediciones = Counter(eventos)
+    # Una sola consulta: Soporte JOIN Asignacion LEFT JOIN Usuario
+    tickets = list(
+        Soporte.objects
+        .select_related('id_asignacion', 'id_tecnico')
+        .filter(id_soporte__in=list(ediciones))
+        .order_by('id_soporte')
+    )
+    if tickets:
+        notificar_resumen_soporte(institucion.contacto_email, institucion.nombre, tickets, ediciones)
+
+def registrar_actualizacion_soporte(ticket):
+    """Punto de entrada usado por las vistas al modificar un ticket."""
+    enviar_resumen_soporte.agrupar(
+        ticket.id_asignacion.rut_institucion_receptora_id, ticket.pk, settings.NOTIFICACION_SOPORTE_VENTANA,
+    )
@@ -0,0 +1,38 @@
+"""
+Backend de plantillas de Django que mide el tiempo de renderizado de cada
+plantilla (métrica plantilla_duracion_segundos, ver metricas.py) y lo
+registra como span en las trazas (trazas.py).
+Se configura en TEMPLATES (proyectoBackend/settings.py). Las plantillas
+incluidas ({% include %}) cuentan dentro de la que las incluye.
+"""
+import time
+
+from django.template.backends.django import DjangoTemplates
+
+from .metricas import registrar_plantilla
+from .trazas import span
+
+
+class _PlantillaMedida:
+    """Envuelve una plantilla del backend y mide su render()."""
+
+    def __init__(self, plantilla):
+        self.plantilla = plantilla
+
+    def __getattr__(self, nombre):
+        return getattr(self.plantilla, nombre)
+
+    def render(self, context=None, request=None):
+        inicio = time.perf_counter()
+        try:
+            nombre = self.plantilla.template.name
+            with span(f'plantilla {nombre}', **{'plantilla.nombre': nombre}):
+                return self.plantilla.render(context, request)
+        finally:
+            registrar_plantilla(self.plantilla.template.name, time.perf_counter() - inicio)
+
+
+class DjangoTemplatesMedidos(DjangoTemplates):
+
+    def get_template(self, template_name):
+        return _PlantillaMedida(super().get_template(template_name))
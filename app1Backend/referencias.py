@@ -0,0 +1,191 @@
+"""
+Caché en el proceso de los datos de referencia: instituciones y técnicos.
+
+Casi todo formulario muestra un select de instituciones o de técnicos, y los
+listados y __str__ de donaciones, asignaciones, reacondicionamientos y
+soportes muestran el nombre de la institución o del técnico. Son pocas filas
+que cambian muy de vez en cuando: cada proceso las carga completas la primera
+vez que se piden y las sirve desde memoria.
+
+- Invalidación entre procesos: cada referencia tiene una versión en la caché
+  compartida (CLAVE_VERSION), que cambia al guardar o eliminar una fila (al
+  confirmar la transacción). Cada proceso la consulta a lo sumo cada
+  VERIFICAR_CADA segundos y recarga si cambió; el proceso que hizo el cambio
+  recarga de inmediato. Las versiones son números: CacheEnNiveles no las guarda
+  en su nivel local (ver cache_niveles.py).
+- Las instancias entregadas son copias: modificarlas no altera la caché.
+- Los pk que no están en la referencia (ej: el técnico de un soporte que es
+  administrador) se buscan en la BD, en una sola consulta.
+- La validación de los formularios sigue usando el queryset del campo: un POST
+  con un pk recién eliminado se rechaza aunque la caché aún lo muestre.
+"""
+import copy
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.forms.models import ModelChoiceIterator
+
+from .models import Institucion, Usuario
+
+# Nombre -> (modelo, consulta con TODAS las filas, en el orden de los selects)
+REFERENCIAS = {
+    'instituciones': (Institucion, lambda: Institucion.objects.all()),
+    'tecnicos': (Usuario, lambda: Usuario.objects.filter(rol='Tecnico')),
+}
+CLAVE_VERSION = 'referencias_version:{nombre}'
+# Segundos entre consultas de la versión compartida (desfase máximo con otro proceso)
+VERIFICAR_CADA = 1.0
+# Guardados que no cambian lo que se muestra de un usuario (ej: el último login)
+CAMPOS_IGNORADOS = {'last_login', 'password'}
+
+
+class _Referencia:
+    __slots__ = ('version', 'verificada', 'objetos', 'por_pk')
+
+    def __init__(self, version, verificada, objetos):
+        self.version = version
+        self.verificada = verificada
+        self.objetos = objetos
+        self.por_pk = {objeto.pk: objeto for objeto in objetos}
+
+
+# Nombre -> _Referencia de este proceso. Reemplazar una entrada del dict es atómico:
+# dos hilos pueden cargar la misma referencia a la vez, sin otro efecto
+_datos = {}
+
+
+def _version(nombre):
+    clave = CLAVE_VERSION.format(nombre=nombre)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, time.time_ns(), None)
+        version = cache.get(clave)
+    return version
+
+def _cargar(nombre):
+    ahora = time.monotonic()
+    datos = _datos.get(nombre)
+    if datos is not None and ahora - datos.verificada < VERIFICAR_CADA:
+        return datos
+    # La versión se lee ANTES de consultar: un cambio que se confirme durante la carga
+    # deja una versión distinta y la próxima verificación recarga
+    version = _version(nombre)
+    if datos is not None and datos.version == version:
+        datos.verificada = ahora
+        return datos
+    _, consulta = REFERENCIAS[nombre]
+    datos = _Referencia(version, ahora, list(consulta()))
+    _datos[nombre] = datos
+    return datos
+
+
+# =========================================================
+# LECTURA
+# =========================================================
+
+def todos(nombre):
+    """Todas las filas de la referencia `nombre` (compartidas: no modificarlas)."""
+    return _cargar(nombre).objetos
+
+def obtener_muchos(modelo, pks):
+    """{pk: instancia} de `modelo` (copias); los pk inexistentes no aparecen."""
+    pendientes = {pk for pk in pks if pk is not None}
+    encontrados = {}
+    for nombre, (modelo_referencia, _) in REFERENCIAS.items():
+        if modelo_referencia is not modelo or not pendientes:
+            continue
+        por_pk = _cargar(nombre).por_pk
+        for pk in list(pendientes):
+            if pk in por_pk:
+                encontrados[pk] = copy.copy(por_pk[pk])
+                pendientes.discard(pk)
+    if pendientes:
+        encontrados.update(modelo._default_manager.in_bulk(pendientes))
+    return encontrados
+
+def obtener(modelo, pk):
+    """Instancia de `modelo` con ese pk (copia), o None."""
+    return obtener_muchos(modelo, [pk]).get(pk)
+
+def adjuntar(objetos, *campos):
+    """
+    Deja cargadas las FK `campos` de `objetos` desde la caché (como un
+    select_related, sin JOIN): el template o __str__ ya no consultan la BD.
+    Un campo puede ser una ruta ('id_asignacion__rut_institucion_receptora'):
+    las relaciones intermedias deben venir cargadas (select_related).
+    """
+    objetos = list(objetos)
+    for ruta in campos:
+        *intermedias, nombre_campo = ruta.split('__')
+        destino = objetos
+        for intermedia in intermedias:
+            destino = [relacionado for relacionado in (getattr(objeto, intermedia) for objeto in destino) if relacionado is not None]
+        if destino:
+            _adjuntar_campo(destino, nombre_campo)
+
+def _adjuntar_campo(objetos, nombre_campo):
+    campo = objetos[0]._meta.get_field(nombre_campo)
+    pendientes = [objeto for objeto in objetos if not campo.is_cached(objeto)]
+    instancias = obtener_muchos(campo.related_model, {getattr(objeto, campo.attname) for objeto in pendientes})
+    for objeto in pendientes:
+        pk = getattr(objeto, campo.attname)
+        # Un pk que ya no existe se deja sin cargar: el acceso se comporta como siempre
+        if pk is None or pk in instancias:
+            campo.set_cached_value(objeto, instancias.get(pk))
+
+
+# =========================================================
+# FORMULARIOS
+# =========================================================
+
+class IteradorReferencia(ModelChoiceIterator):
+    """Opciones de un ModelChoiceField desde la caché: renderizar el select no consulta la BD."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for objeto in todos(self.field.referencia):
+            yield self.choice(objeto)
+
+    def __len__(self):
+        return len(todos(self.field.referencia)) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(todos(self.field.referencia))
+
+def usar_referencia(campo, nombre):
+    """
+    Toma las opciones del select `campo` de la referencia `nombre`, que debe
+    tener las mismas filas que el queryset del campo (con el que se valida).
+    """
+    campo.referencia = nombre
+    campo.iterator = IteradorReferencia
+    campo.widget.choices = campo.choices
+
+
+# =========================================================
+# INVALIDACIÓN
+# =========================================================
+
+def _publicar(nombres):
+    for nombre in nombres:
+        cache.set(CLAVE_VERSION.format(nombre=nombre), time.time_ns(), None)
+        _datos.pop(nombre, None)
+
+def invalidar(modelo):
+    """Recarga las referencias de `modelo` en todos los procesos, al confirmar la transacción."""
+    nombres = [nombre for nombre, (modelo_referencia, _) in REFERENCIAS.items() if modelo_referencia is modelo]
+    if nombres:
+        transaction.on_commit(lambda: _publicar(nombres))
+
+def _al_cambiar(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= CAMPOS_IGNORADOS:
+        return
+    invalidar(sender)
+
+
+for _modelo in {modelo for modelo, _ in REFERENCIAS.values()}:
+    post_save.connect(_al_cambiar, sender=_modelo, dispatch_uid=f'referencias_save_{_modelo._meta.model_name}')
+    post_delete.connect(_al_cambiar, sender=_modelo, dispatch_uid=f'referencias_delete_{_modelo._meta.model_name}')
@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from .models import Institucion, Usuario, Donacion, Equipo, Asignacion, Reacondicionamiento, Soporte
+from .models import (
+    Institucion, Usuario, Donacion, Equipo, Asignacion, Reacondicionamiento, Soporte,
+    AsignacionArchivada, ReacondicionamientoArchivado, SoporteArchivado,
+)
 
 class InstitucionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,8 +33,34 @@ class ReacondicionamientoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reacondicionamiento
         fields = '__all__'
+        read_only_fields = ['fecha_reclamo']
 
 class SoporteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Soporte
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+# --- Registros archivados (solo lectura, ver archivo.py) ---
+
+class ArchivadoSerializer(serializers.ModelSerializer):
+    # Distingue las filas archivadas cuando se listan junto a las activas
+    archivado = serializers.SerializerMethodField()
+
+    def get_archivado(self, obj):
+        return True
+
+class AsignacionArchivadaSerializer(ArchivadoSerializer):
+    class Meta:
+        model = AsignacionArchivada
+        fields = '__all__'
+
+class ReacondicionamientoArchivadoSerializer(ArchivadoSerializer):
+    class Meta:
+        model = ReacondicionamientoArchivado
+        fields = '__all__'
+
+class SoporteArchivadoSerializer(ArchivadoSerializer):
+    class Meta:
+        model = SoporteArchivado
+        fields = '__all__'
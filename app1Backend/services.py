@@ -1,14 +1,14 @@
 from django.core.mail import send_mail
 from django.conf import settings
-import threading
 
-def enviar_correo_segundo_plano(asunto, mensaje, destinatarios):
-    """
-    Envía correos usando hilos (threading) para que el usuario no tenga
-    que esperar a que el servidor de correo responda para ver la página siguiente.
-    """
-    def _enviar():
-        try:
+from .metricas import registrar_correo
+from .tareas import tarea
+from .trazas import CLIENTE, span
+
+def _enviar(asunto, mensaje, destinatarios):
+    # Único punto de envío: traza el envío y cuenta el resultado; los errores se propagan
+    try:
+        with span('correo send_mail', CLIENTE, **{'correo.destinatarios': len(destinatarios)}):
             send_mail(
                 subject=asunto,
                 message=mensaje,
@@ -16,10 +16,24 @@ def enviar_correo_segundo_plano(asunto, mensaje, destinatarios):
                 recipient_list=destinatarios,
                 fail_silently=False,
             )
-        except Exception as e:
-            print(f"Error enviando correo: {e}")
-    hilo = threading.Thread(target=_enviar)
-    hilo.start()
+    except Exception:
+        registrar_correo(enviado=False)
+        raise
+    registrar_correo(enviado=True)
+
+@tarea(prioridad=10, max_intentos=5, respaldo_en_hilo=True)
+def entregar_correo(asunto, mensaje, destinatarios):
+    """Tarea de la cola: si el servidor de correo falla, la excepción hace que se reintente."""
+    _enviar(asunto, mensaje, destinatarios)
+
+def enviar_correo_segundo_plano(asunto, mensaje, destinatarios):
+    """
+    Encola el correo en la cola de tareas (ver tareas.py) para que el usuario
+    no tenga que esperar a que el servidor de correo responda para ver la
+    página siguiente. Lo envía `python manage.py runworker`, con reintentos; si
+    no hay worker corriendo, se envía en un hilo de este proceso (sin reintentos).
+    """
+    entregar_correo.encolar(asunto, mensaje, list(destinatarios))
 
 # --- FUNCIONES ESPECÍFICAS ---
 
@@ -78,41 +92,85 @@ def notificar_actualizacion_perfil(usuario):
     """
     enviar_correo_segundo_plano(asunto, mensaje, [usuario.email])
 
-def notificar_resolucion_soporte(ticket):
+def notificar_resumen_soporte(destinatario, nombre_institucion, tickets, ediciones):
     """
-    Avisa al contacto de la institución que el ticket tiene novedades.
-    Ruta del email: Ticket -> Asignacion -> Institucion -> Contacto Email
+    Envía UN solo correo con todas las novedades acumuladas de los tickets
+    de una institución durante la ventana de coalescencia.
+    `tickets` viene ya con select_related (asignación, institución y técnico),
+    `ediciones` es un dict {id_soporte: cantidad de modificaciones}.
+    Se llama desde la tarea de resumen (notificaciones.py); el envío queda en la cola de tareas.
     """
-    try:
-        destinatario = ticket.id_asignacion.rut_institucion_receptora.contacto_email
-        nombre_institucion = ticket.id_asignacion.rut_institucion_receptora.nombre
-    except AttributeError:
-        print(">>> ERROR: No se pudo encontrar el email de la institución para notificar.")
-        return
-
-    if not destinatario:
-        print(">>> AVISO: La institución no tiene email de contacto registrado.")
-        return
-    estado_texto = "Actualizado"
-    if ticket.resolucion:
-        estado_texto = "Resuelto / Respondido"
-
-    asunto = f"Actualización Ticket #{ticket.id_soporte} - {estado_texto}"
+    bloques = []
+    for ticket in tickets:
+        estado_texto = "Resuelto / Respondido" if ticket.resolucion else "Actualizado"
+        bloques.append(f"""
+    Ticket #{ticket.id_soporte} - {estado_texto} ({ediciones.get(ticket.id_soporte, 1)} actualización/es)
+    Asignación: #{ticket.id_asignacion_id}
+    Tipo de Soporte: {ticket.tipo}
+    Técnico a cargo: {ticket.id_tecnico.nombre if ticket.id_tecnico else "Por asignar"}
+    Novedades: {ticket.resolucion if ticket.resolucion else "El técnico ha actualizado los detalles del caso."}
+    -------------------------------""")
+
+    if len(tickets) == 1:
+        asunto = f"Actualización Ticket #{tickets[0].id_soporte} - ReConectaTec"
+    else:
+        asunto = f"Resumen de {len(tickets)} tickets de soporte actualizados - ReConectaTec"
     mensaje = f"""
     Estimados {nombre_institucion},
 
-    El ticket de soporte #{ticket.id_soporte} ha sido actualizado por nuestro equipo técnico.
+    Nuestro equipo técnico ha actualizado los siguientes tickets de soporte:
+    {"".join(bloques)}
 
-    Equipo Afectado: {ticket.id_asignacion}
-    Tipo de Soporte: {ticket.tipo}
-    
-    --- NOVEDADES / RESOLUCIÓN ---
-    {ticket.resolucion if ticket.resolucion else "El técnico ha actualizado los detalles del caso."}
-    -------------------------------
+    Saludos,
+    Soporte ReConectaTec
+    """
+    enviar_correo_segundo_plano(asunto, mensaje, [destinatario])
 
+def notificar_incumplimientos_sla(destinatarios, tickets):
+    """
+    Envía UN correo a los administradores con los tickets que superaron su plazo
+    de resolución en la última revisión (comando `revisar_sla`).
+    `tickets` viene con select_related (asignación, institución y técnico).
+    """
+    bloques = []
+    for ticket in tickets:
+        bloques.append(f"""
+    Ticket #{ticket.id_soporte} ({ticket.tipo}) - {ticket.estado}
+    Institución: {ticket.id_asignacion.rut_institucion_receptora.nombre}
     Técnico a cargo: {ticket.id_tecnico.nombre if ticket.id_tecnico else "Por asignar"}
+    Abierto el {ticket.fecha_apertura:%d/%m/%Y %H:%M}, plazo vencido el {ticket.vencimiento_sla:%d/%m/%Y %H:%M}
+    -------------------------------""")
+
+    asunto = f"{len(tickets)} ticket(s) de soporte fuera de plazo - ReConectaTec"
+    mensaje = f"""
+    Hola,
+
+    Los siguientes tickets de soporte superaron su plazo de resolución (SLA):
+    {"".join(bloques)}
 
     Saludos,
-    Soporte ReConectaTec
+    Sistema ReConectaTec
+    """
+    enviar_correo_segundo_plano(asunto, mensaje, destinatarios)
+
+def notificar_asignacion_tecnico(tecnico, equipos):
+    """
+    Envía UN correo al técnico con todos los equipos que se le asignaron en
+    una acción masiva del administrador (ver acciones_masivas.py).
+    """
+    bloques = "".join(f"""
+    - {equipo} (ID {equipo.id_equipo})""" for equipo in equipos)
+
+    asunto = f"Se te asignaron {len(equipos)} equipo(s) para reacondicionar - ReConectaTec"
+    mensaje = f"""
+    Hola {tecnico.nombre},
+
+    El administrador te asignó los siguientes equipos para reacondicionar:
+    {bloques}
+
+    Los encontrarás en el listado de reacondicionamientos.
+
+    Saludos,
+    Equipo ReConectaTec
     """
-    enviar_correo_segundo_plano(asunto, mensaje, [destinatario])
\ No newline at end of file
+    enviar_correo_segundo_plano(asunto, mensaje, [tecnico.email])
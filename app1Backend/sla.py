@@ -0,0 +1,91 @@
+"""
+SLA de los tickets de soporte.
+
+Cada ticket tiene un plazo de resolución según su tipo (SOPORTE_SLA_HORAS),
+calculado al guardarlo (Soporte._actualizar_ciclo). El comando `revisar_sla`
+se programa periódicamente (cron) y:
+
+- busca los tickets abiertos con el plazo vencido que aún no se marcaron,
+  usando solo el índice idx_soporte_sla (estado, vencimiento_sla,
+  sla_incumplido): el costo depende de los tickets abiertos vencidos, no del total;
+- los marca con un solo UPDATE y envía un único correo a los administradores.
+
+indicadores() entrega el MTTR y el cumplimiento para el dashboard.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+from .cambios import registrar_cambios
+from .models import Soporte, Usuario
+from .services import notificar_incumplimientos_sla
+
+DIAS_INDICADORES = 30
+
+
+def _vencidos(ahora):
+    return Soporte.objects.filter(
+        sla_incumplido=False,
+        estado__in=Soporte.ESTADOS_ABIERTOS,
+        vencimiento_sla__lt=ahora,
+    )
+
+def revisar_incumplimientos(ahora=None, notificar=True):
+    """Marca los tickets abiertos que superaron su plazo. Retorna la lista de IDs marcados."""
+    ahora = ahora or timezone.now()
+    with transaction.atomic():
+        ids = list(_vencidos(ahora).values_list('pk', flat=True))
+        if not ids:
+            return []
+        Soporte.objects.filter(pk__in=ids).update(sla_incumplido=True)
+        # update() no emite señales: se informa al feed de cambios de la API
+        registrar_cambios(Soporte, ids, 'Modificacion')
+
+    if notificar:
+        destinatarios = list(
+            Usuario.objects.filter(rol='Administrador', is_active=True).values_list('email', flat=True)
+        )
+        if destinatarios:
+            tickets = (
+                Soporte.objects
+                .filter(pk__in=ids)
+                .select_related('id_asignacion__rut_institucion_receptora', 'id_tecnico')
+                .order_by('vencimiento_sla')
+            )
+            notificar_incumplimientos_sla(destinatarios, list(tickets))
+    return ids
+
+
+def _horas(duracion):
+    return round(duracion.total_seconds() / 3600, 1) if duracion is not None else None
+
+def indicadores(dias=DIAS_INDICADORES):
+    """
+    MTTR (tiempo medio de resolución), tiempo medio a la primera respuesta y
+    porcentaje resuelto dentro del plazo, sobre los tickets resueltos en los
+    últimos `dias`; más los abiertos y los abiertos fuera de plazo.
+    """
+    desde = timezone.now() - datetime.timedelta(days=dias)
+    resueltos = Soporte.objects.filter(fecha_resolucion__gte=desde).aggregate(
+        total=Count('pk'),
+        dentro_plazo=Count('pk', filter=Q(sla_incumplido=False)),
+        mttr=Avg(ExpressionWrapper(F('fecha_resolucion') - F('fecha_apertura'), output_field=DurationField())),
+        primera_respuesta=Avg(ExpressionWrapper(
+            F('fecha_primera_respuesta') - F('fecha_apertura'), output_field=DurationField(),
+        )),
+    )
+    abiertos = Soporte.objects.filter(estado__in=Soporte.ESTADOS_ABIERTOS).aggregate(
+        total=Count('pk'),
+        fuera_plazo=Count('pk', filter=Q(sla_incumplido=True)),
+    )
+    return {
+        'dias': dias,
+        'resueltos': resueltos['total'],
+        'mttr_horas': _horas(resueltos['mttr']),
+        'primera_respuesta_horas': _horas(resueltos['primera_respuesta']),
+        'cumplimiento_pct': round(100 * resueltos['dentro_plazo'] / resueltos['total']) if resueltos['total'] else None,
+        'abiertos': abiertos['total'],
+        'abiertos_fuera_plazo': abiertos['fuera_plazo'],
+    }
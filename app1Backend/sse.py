@@ -0,0 +1,109 @@
+"""
+App ASGI para el flujo de eventos en vivo (/eventos/).
+
+Se monta delante de la app de Django en proyectoBackend/asgi.py. No pasa
+por el manejador de Django a propósito: este mantiene un hilo dedicado por
+petición mientras dure la respuesta, y una conexión SSE dura minutos. Aquí
+la sesión se valida una sola vez en el pool de hilos compartido y luego cada
+conexión inactiva es solo una corrutina esperando a la central de eventos.
+"""
+import asyncio
+from http.cookies import SimpleCookie
+from importlib import import_module
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+from django.http import HttpRequest
+from django.urls import reverse
+
+from .eventos import central_eventos
+from .views import is_admin, is_admin_or_tecnico
+
+# Modelo -> quién puede recibir sus eventos (los mismos permisos que su listado)
+PERMISOS_EVENTOS = {
+    'soporte': is_admin_or_tecnico,
+    'asignacion': is_admin,
+    'reacondicionamiento': is_admin_or_tecnico,
+}
+# Un comentario SSE cada tanto mantiene viva la conexión a través de proxies
+LATIDO_SEGUNDOS = 15
+# Tras este tiempo se cierra la conexión; el navegador se reconecta y se revalida la sesión
+DURACION_SEGUNDOS = 600
+
+
+def _usuario_de_sesion(clave_sesion):
+    """Carga el usuario de la sesión sin guardarla: escuchar eventos no extiende la sesión."""
+    close_old_connections()
+    try:
+        request = HttpRequest()
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore(clave_sesion)
+        return get_user(request)
+    finally:
+        close_old_connections()
+
+def _encabezado(scope, nombre):
+    for clave, valor in scope.get('headers', []):
+        if clave == nombre:
+            return valor.decode('latin-1')
+    return ''
+
+async def _esperar_desconexion(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+class AppEventos:
+    """Atiende /eventos/ y delega todo lo demás a la app de Django."""
+
+    def __init__(self, app_django):
+        self.app_django = app_django
+        self.ruta = reverse('eventos')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.ruta:
+            return await self.app_django(scope, receive, send)
+
+        cookie = SimpleCookie(_encabezado(scope, b'cookie'))
+        clave_sesion = cookie[settings.SESSION_COOKIE_NAME].value if settings.SESSION_COOKIE_NAME in cookie else None
+        usuario = await sync_to_async(_usuario_de_sesion, thread_sensitive=False)(clave_sesion)
+
+        pedidos = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('modelos', [''])[0]
+        modelos = {
+            modelo for modelo in pedidos.split(',')
+            if modelo in PERMISOS_EVENTOS and PERMISOS_EVENTOS[modelo](usuario)
+        }
+        if not modelos:
+            # 204 le indica al navegador que no vuelva a intentar la conexión
+            await send({'type': 'http.response.start', 'status': 204, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        ultimo = central_eventos.secuencia(_encabezado(scope, b'last-event-id'))
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                # Evita que nginx acumule el flujo en su buffer
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        transmision = asyncio.ensure_future(self._transmitir(send, modelos, ultimo))
+        desconexion = asyncio.ensure_future(_esperar_desconexion(receive))
+        await asyncio.wait({transmision, desconexion}, return_when=asyncio.FIRST_COMPLETED)
+        for tarea in (transmision, desconexion):
+            tarea.cancel()
+
+    async def _transmitir(self, send, modelos, ultimo):
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+        async for evento in central_eventos.escuchar(ultimo, LATIDO_SEGUNDOS, DURACION_SEGUNDOS):
+            if evento is None:
+                await send({'type': 'http.response.body', 'body': b': latido\n\n', 'more_body': True})
+            elif evento.modelo in modelos:
+                await send({'type': 'http.response.body', 'body': evento.mensaje, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
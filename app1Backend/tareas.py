@@ -0,0 +1,357 @@
+"""
+Cola de tareas en segundo plano, guardada en la base de datos.
+
+El trabajo lento (correos, optimización de imágenes) no se hace dentro de la
+petición ni en hilos sueltos: se registra una fila en la tabla `tarea` y el
+comando `python manage.py runworker` la ejecuta en un pool de hilos o procesos.
+No requiere broker externo: funciona igual en SQLite y MySQL.
+
+    @tarea(prioridad=5, max_intentos=5)
+    def enviar_algo(destinatario):
+        ...
+
+    enviar_algo.encolar('a@b.cl')                          # lo antes posible
+    enviar_algo.encolar_con(args=['a@b.cl'], retraso=600)  # en 10 minutos
+    enviar_resumen.agrupar('a@b.cl', evento, retraso=600)  # una tarea por clave
+
+- La fila se inserta en la transacción en curso: si la petición hace
+  rollback, la tarea tampoco existe; y el worker no la ve hasta el COMMIT.
+- Reclamo: con SELECT ... FOR UPDATE SKIP LOCKED (MySQL 8, MariaDB 10.6) cada
+  worker toma filas distintas sin esperar a los demás; en SQLite se usa un
+  UPDATE condicional (estado = 'Pendiente') y gana quien lo aplique primero,
+  igual que en la cola de reacondicionamiento (cola_trabajo.py).
+- Una tarea que lanza una excepción se reintenta con espera exponencial
+  hasta `max_intentos`; después queda 'Fallida' con el traceback.
+- Si un worker muere con tareas 'En Curso', estas vuelven a la cola al
+  superar TAREAS_TIEMPO_MAXIMO (mantenimiento del propio runworker).
+- agrupar() junta los eventos de una misma clave en una sola tarea
+  pendiente (la función recibe la clave y la lista de eventos): lo que
+  llega mientras espera se agrega a esa fila en vez de encolar otra.
+- La tarea guarda el contexto de la traza de quien la encoló ('traceparent'
+  en los argumentos): en el worker se ejecuta como parte de esa traza.
+- Con TAREAS_EN_LINEA=True (desarrollo sin worker) la tarea se ejecuta al
+  confirmar la transacción, en el mismo proceso.
+- runworker deja un latido en la caché compartida. Si no hay latido vigente
+  (no hay worker corriendo), encolar avisa en la consola; las tareas con
+  `respaldo_en_hilo` (los correos) no se encolan: se ejecutan en un hilo del
+  proceso al confirmar la transacción, sin reintentos, como antes de la cola.
+"""
+import datetime
+import os
+import socket
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import trazas
+from .models import Tarea
+
+# Candidatos que se leen por cada tarea pedida en el modo optimista
+FACTOR_CANDIDATOS = 2
+# Filas que se eliminan por sentencia al purgar tareas terminadas
+LOTE_PURGA = 1000
+# runworker renueva su latido cada LATIDO_SEGUNDOS; vence a los LATIDO_VIGENCIA
+CLAVE_LATIDO = 'tareas:latido'
+LATIDO_SEGUNDOS = 10
+LATIDO_VIGENCIA = 60
+
+# Último aviso de "no hay worker" de este proceso (time.monotonic)
+_ultimo_aviso = None
+
+
+# =========================================================
+# REGISTRO Y ENCOLADO
+# =========================================================
+
+class TareaRegistrada:
+    """Función marcada con @tarea. Se puede llamar directamente o encolar."""
+
+    def __init__(self, funcion, prioridad, max_intentos, respaldo_en_hilo):
+        self.funcion = funcion
+        self.prioridad = prioridad
+        self.max_intentos = max_intentos
+        self.respaldo_en_hilo = respaldo_en_hilo
+        # Ruta importable: el worker la resuelve con import_string
+        self.nombre = f'{funcion.__module__}.{funcion.__name__}'
+        self.__doc__ = funcion.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.funcion(*args, **kwargs)
+
+    def encolar(self, *args, **kwargs):
+        """Encola la tarea para ejecutarse lo antes posible con la prioridad por defecto."""
+        return self.encolar_con(args=args, kwargs=kwargs)
+
+    def encolar_con(self, args=(), kwargs=None, prioridad=None, retraso=None, ejecutar_desde=None):
+        """
+        Encola con opciones. `retraso` en segundos (o timedelta) o `ejecutar_desde`
+        (datetime) programan la ejecución. Los argumentos deben ser serializables
+        a JSON (se pasan IDs, no instancias de modelos).
+        Retorna la Tarea creada, o None si se ejecutó en línea o en un hilo.
+        """
+        kwargs = kwargs or {}
+        if settings.TAREAS_EN_LINEA:
+            transaction.on_commit(lambda: self.funcion(*args, **kwargs))
+            return None
+        if not hay_trabajador():
+            _avisar_sin_trabajador(self.nombre, self.respaldo_en_hilo)
+            if self.respaldo_en_hilo:
+                transaction.on_commit(lambda: self._iniciar_hilo(args, kwargs, retraso, ejecutar_desde))
+                return None
+        if retraso is not None:
+            if not isinstance(retraso, datetime.timedelta):
+                retraso = datetime.timedelta(seconds=retraso)
+            ejecutar_desde = timezone.now() + retraso
+        return self._crear(args, kwargs, prioridad, ejecutar_desde)
+
+    def agrupar(self, clave, evento, retraso):
+        """
+        Agrega `evento` a la tarea pendiente de `clave` o, si no hay una, encola
+        una nueva que se ejecuta en `retraso` segundos como funcion(clave, eventos).
+        Si dos procesos crean la primera a la vez, la clave recibe dos resúmenes.
+        """
+        if settings.TAREAS_EN_LINEA:
+            transaction.on_commit(lambda: self.funcion(clave, [evento]))
+            return None
+        if not hay_trabajador():
+            _avisar_sin_trabajador(self.nombre, False)
+        with transaction.atomic():
+            # El bloqueo impide que un worker la reclame a medio agregar
+            tarea = Tarea.objects.select_for_update().filter(
+                nombre=self.nombre, clave=clave, estado='Pendiente',
+            ).first()
+            if tarea is not None:
+                tarea.argumentos['args'][1].append(evento)
+                tarea.save(update_fields=['argumentos'])
+                return tarea
+            return self._crear(
+                [clave, [evento]], {}, None, timezone.now() + datetime.timedelta(seconds=retraso), clave,
+            )
+
+    def _crear(self, args, kwargs, prioridad, ejecutar_desde, clave=''):
+        with trazas.span(f'encolar {self.nombre}', trazas.PRODUCTOR):
+            argumentos = {'args': list(args), 'kwargs': kwargs}
+            # El worker continúa la traza de quien encoló (ver trazas.py)
+            traceparent = trazas.traceparent_actual()
+            if traceparent:
+                argumentos['traceparent'] = traceparent
+            return Tarea.objects.create(
+                nombre=self.nombre,
+                clave=clave,
+                argumentos=argumentos,
+                prioridad=self.prioridad if prioridad is None else prioridad,
+                max_intentos=self.max_intentos,
+                ejecutar_desde=ejecutar_desde or timezone.now(),
+            )
+
+    def _iniciar_hilo(self, args, kwargs, retraso, ejecutar_desde):
+        if ejecutar_desde is not None:
+            retraso = (ejecutar_desde - timezone.now()).total_seconds()
+        elif isinstance(retraso, datetime.timedelta):
+            retraso = retraso.total_seconds()
+        hilo = threading.Timer(max(retraso or 0, 0), self._ejecutar_en_hilo, args, kwargs)
+        hilo.daemon = True
+        hilo.start()
+
+    def _ejecutar_en_hilo(self, *args, **kwargs):
+        try:
+            self.funcion(*args, **kwargs)
+        except Exception as e:
+            print(f"Error ejecutando {self.nombre} sin worker: {e}")
+        finally:
+            # El hilo abrió su propia conexión a la BD
+            connection.close()
+
+
+def tarea(prioridad=0, max_intentos=3, respaldo_en_hilo=False):
+    """
+    Decorador que registra una función como tarea encolable. Con
+    `respaldo_en_hilo`, si no hay worker corriendo se ejecuta en un hilo del
+    proceso en vez de quedar esperando en la cola.
+    """
+    def decorar(funcion):
+        return TareaRegistrada(funcion, prioridad, max_intentos, respaldo_en_hilo)
+    return decorar
+
+def _resolver(nombre):
+    registrada = import_string(nombre)
+    # Solo se ejecutan funciones marcadas con @tarea, no cualquier ruta guardada en la tabla
+    if not isinstance(registrada, TareaRegistrada):
+        raise TypeError(f"'{nombre}' no es una tarea registrada con @tarea.")
+    return registrada.funcion
+
+
+# =========================================================
+# RECLAMO
+# =========================================================
+
+def identificador_trabajador():
+    return f'{socket.gethostname()}:{os.getpid()}'[:100]
+
+def _listas(ahora):
+    return (
+        Tarea.objects
+        .filter(estado='Pendiente', ejecutar_desde__lte=ahora)
+        .order_by('-prioridad', 'ejecutar_desde', 'id_tarea')
+    )
+
+def _marcar_en_curso(ids, trabajador, ahora):
+    return Tarea.objects.filter(pk__in=ids, estado='Pendiente').update(
+        estado='En Curso', trabajador=trabajador, fecha_inicio=ahora, fecha_fin=None,
+        intentos=F('intentos') + 1,
+    )
+
+def _reclamar_con_skip_locked(cantidad, trabajador, ahora):
+    with transaction.atomic():
+        ids = list(_listas(ahora).select_for_update(skip_locked=True).values_list('id_tarea', flat=True)[:cantidad])
+        if ids:
+            _marcar_en_curso(ids, trabajador, ahora)
+        return ids
+
+def _reclamar_optimista(cantidad, trabajador, ahora):
+    candidatos = list(_listas(ahora).values_list('id_tarea', flat=True)[:cantidad * FACTOR_CANDIDATOS])
+    reclamadas = []
+    for id_tarea in candidatos:
+        # Otro worker pudo tomarla entre la lectura y el UPDATE: entonces afecta 0 filas
+        if _marcar_en_curso([id_tarea], trabajador, ahora):
+            reclamadas.append(id_tarea)
+            if len(reclamadas) == cantidad:
+                break
+    return reclamadas
+
+def reclamar(cantidad, trabajador):
+    """Marca como 'En Curso' hasta `cantidad` tareas listas. Retorna sus IDs, de mayor a menor prioridad."""
+    ahora = timezone.now()
+    if connection.features.has_select_for_update_skip_locked:
+        return _reclamar_con_skip_locked(cantidad, trabajador, ahora)
+    return _reclamar_optimista(cantidad, trabajador, ahora)
+
+
+# =========================================================
+# EJECUCIÓN
+# =========================================================
+
+def _espera_reintento(intentos):
+    return datetime.timedelta(seconds=settings.TAREAS_REINTENTO_SEGUNDOS * 2 ** (intentos - 1))
+
+def _finalizar(tarea, **campos):
+    # Condicionado a este reclamo: si la tarea fue liberada por tiempo y la tomó
+    # otro worker, este resultado ya no le corresponde
+    return Tarea.objects.filter(
+        pk=tarea.pk, estado='En Curso', fecha_inicio=tarea.fecha_inicio,
+    ).update(fecha_fin=timezone.now(), **campos)
+
+def ejecutar(id_tarea):
+    """
+    Ejecuta una tarea ya reclamada. Corre dentro del pool del worker (hilo o
+    proceso). Retorna (id, nombre, estado resultante).
+    """
+    close_old_connections()
+    try:
+        tarea = Tarea.objects.get(pk=id_tarea)
+        try:
+            funcion = _resolver(tarea.nombre)
+            with trazas.traza(f'tarea {tarea.nombre}', tarea.argumentos.get('traceparent'), trazas.CONSUMIDOR, **{
+                'tarea.id': tarea.pk, 'tarea.intento': tarea.intentos,
+            }):
+                funcion(*tarea.argumentos.get('args', []), **tarea.argumentos.get('kwargs', {}))
+        except Exception:
+            error = traceback.format_exc()
+            if tarea.intentos < tarea.max_intentos:
+                _finalizar(
+                    tarea, estado='Pendiente', error=error,
+                    ejecutar_desde=timezone.now() + _espera_reintento(tarea.intentos),
+                )
+                return tarea.pk, tarea.nombre, 'Pendiente'
+            _finalizar(tarea, estado='Fallida', error=error)
+            return tarea.pk, tarea.nombre, 'Fallida'
+        _finalizar(tarea, estado='Completada', error='')
+        return tarea.pk, tarea.nombre, 'Completada'
+    finally:
+        close_old_connections()
+
+# =========================================================
+# LATIDO DEL WORKER
+# =========================================================
+
+def registrar_latido():
+    """Lo llama runworker cada LATIDO_SEGUNDOS: hay al menos un worker activo."""
+    cache.set(CLAVE_LATIDO, time.time(), LATIDO_VIGENCIA)
+
+def hay_trabajador():
+    return cache.get(CLAVE_LATIDO) is not None
+
+def _avisar_sin_trabajador(nombre, respaldo_en_hilo):
+    # A lo sumo un aviso por proceso cada LATIDO_VIGENCIA segundos
+    global _ultimo_aviso
+    ahora = time.monotonic()
+    if _ultimo_aviso is not None and ahora - _ultimo_aviso < LATIDO_VIGENCIA:
+        return
+    _ultimo_aviso = ahora
+    destino = "se ejecuta en un hilo de este proceso" if respaldo_en_hilo else "queda en la cola hasta que se inicie"
+    print(f">>> AVISO: No hay un worker de tareas activo (python manage.py runworker): {nombre} {destino}.")
+
+
+# =========================================================
+# MANTENIMIENTO Y ESTADO
+# =========================================================
+
+def liberar_vencidas(ahora=None):
+    """
+    Devuelve a la cola las tareas 'En Curso' que superaron TAREAS_TIEMPO_MAXIMO
+    (su worker murió o se colgó). Si ya agotaron sus intentos quedan 'Fallida'.
+    Retorna (liberadas, fallidas).
+    """
+    ahora = ahora or timezone.now()
+    vencidas = Tarea.objects.filter(
+        estado='En Curso',
+        fecha_inicio__lt=ahora - datetime.timedelta(seconds=settings.TAREAS_TIEMPO_MAXIMO),
+    )
+    error = 'Tiempo máximo de ejecución superado (el worker no informó el resultado).'
+    liberadas = vencidas.filter(intentos__lt=F('max_intentos')).update(
+        estado='Pendiente', ejecutar_desde=ahora, error=error,
+    )
+    fallidas = vencidas.update(estado='Fallida', fecha_fin=ahora, error=error)
+    return liberadas, fallidas
+
+def purgar_terminadas(dias=None):
+    """Elimina por lotes las tareas completadas hace más de TAREAS_DIAS_RETENCION. Las fallidas se conservan."""
+    dias = settings.TAREAS_DIAS_RETENCION if dias is None else dias
+    corte = timezone.now() - datetime.timedelta(days=dias)
+    total = 0
+    while True:
+        ids = list(
+            Tarea.objects.filter(estado='Completada', fecha_fin__lt=corte)
+            .values_list('id_tarea', flat=True)[:LOTE_PURGA]
+        )
+        if not ids:
+            return total
+        terminadas = Tarea.objects.filter(pk__in=ids)
+        # DELETE directo, sin cargar los objetos: la tabla no tiene dependientes ni señales
+        total += terminadas._raw_delete(terminadas.db)
+
+def estado_cola(ahora=None):
+    """
+    Profundidad de la cola: cantidad por estado, tareas listas y programadas,
+    la espera de la lista más antigua y las listas por nombre de tarea.
+    """
+    ahora = ahora or timezone.now()
+    por_estado = {estado: 0 for estado, _ in Tarea.ESTADO_CHOICES}
+    por_estado.update(Tarea.objects.order_by().values_list('estado').annotate(Count('pk')))
+
+    listas = Tarea.objects.filter(estado='Pendiente', ejecutar_desde__lte=ahora).order_by()
+    resumen = listas.aggregate(cantidad=Count('pk'), mas_antigua=Min('ejecutar_desde'))
+    return {
+        'por_estado': por_estado,
+        'listas': resumen['cantidad'],
+        'programadas': por_estado['Pendiente'] - resumen['cantidad'],
+        'espera_maxima': ahora - resumen['mas_antigua'] if resumen['mas_antigua'] else None,
+        'listas_por_nombre': dict(listas.values_list('nombre').annotate(Count('pk')).order_by('-pk__count')),
+    }
@@ -0,0 +1,19 @@
+"""
+Punto de entrada de los procesos del pool de `runworker --procesos`.
+
+Los procesos se crean con 'spawn' (igual en Linux y Windows): el hijo importa
+este módulo para deserializar el inicializador ANTES de django.setup(), por
+eso aquí no se importan modelos al cargar el módulo.
+"""
+import signal
+
+
+def iniciar():
+    import django
+    django.setup()
+    # Ctrl+C llega a todo el grupo de procesos: el worker principal decide cuándo terminar
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def ejecutar(id_tarea):
+    from .tareas import ejecutar as ejecutar_tarea
+    return ejecutar_tarea(id_tarea)
@@ -0,0 +1,33 @@
+"""Datos mínimos para las pruebas (sin fixtures: cada prueba crea lo que usa)."""
+import itertools
+
+from app1Backend.models import Asignacion, DetalleAsignacion, Donacion, Equipo, Institucion, Usuario
+
+_secuencia = itertools.count(1)
+
+
+def institucion(tipo='Ambas'):
+    numero = next(_secuencia)
+    return Institucion.objects.create(rut=f'{numero}-K', nombre=f'Institución {numero}', tipo=tipo)
+
+def usuario(rol='Tecnico', **campos):
+    numero = next(_secuencia)
+    return Usuario.objects.create_user(
+        f'usuario{numero}@example.com', 'clave', nombre=f'Usuario {numero}', apellido='Prueba', rol=rol, **campos,
+    )
+
+def donacion(equipos=0, donante=None):
+    nueva = Donacion.objects.create(rut_institucion=donante or institucion(), estado='Recibida', total_equipos=equipos)
+    Equipo.objects.bulk_create([
+        Equipo(id_donacion=nueva, tipo='Laptop', num_serie=f'S{next(_secuencia)}') for _ in range(equipos)
+    ])
+    return nueva
+
+def asignacion(equipos=(), receptora=None, estado='Pendiente', fecha_entrega=None):
+    nueva = Asignacion.objects.create(
+        rut_institucion_receptora=receptora or institucion(), cantidad_solicitada=len(equipos), estado=estado,
+    )
+    DetalleAsignacion.objects.bulk_create([
+        DetalleAsignacion(id_asignacion=nueva, id_equipo=equipo, fecha_entrega=fecha_entrega) for equipo in equipos
+    ])
+    return nueva
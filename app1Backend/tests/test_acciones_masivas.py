@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from app1Backend import acciones_masivas
+from app1Backend.models import Donacion, Equipo, Reacondicionamiento, RegistroAuditoria, RegistroCambio
+from . import datos
+
+
+class CambiarEstadoTests(TestCase):
+
+    def setUp(self):
+        self.pendiente = datos.donacion()
+        self.recibida = datos.donacion()
+        Donacion.objects.filter(pk=self.pendiente.pk).update(estado='Pendiente')
+
+    def test_actualiza_las_permitidas_y_omite_las_demas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resultado = acciones_masivas.cambiar_estado(
+                Donacion.objects.filter(pk__in=[self.pendiente.pk, self.recibida.pk]), 'Cancelada',
+            )
+        self.assertEqual(resultado, acciones_masivas.Resultado(actualizados=1, omitidos=1))
+        estados = dict(Donacion.objects.values_list('pk', 'estado'))
+        self.assertEqual(estados, {self.pendiente.pk: 'Cancelada', self.recibida.pk: 'Recibida'})
+
+    def test_informa_auditoria_y_feed_una_vez_por_fila_actualizada(self):
+        RegistroAuditoria.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            acciones_masivas.cambiar_estado(Donacion.objects.all(), 'Recibida')
+        registro = RegistroAuditoria.objects.get()
+        self.assertEqual((registro.objeto_id, registro.cambios),
+                         (str(self.pendiente.pk), {'estado': ['Pendiente', 'Recibida']}))
+        self.assertEqual(RegistroCambio.objects.filter(recurso='donaciones', operacion='Modificacion').count(), 1)
+
+    def test_estado_sin_transicion_se_rechaza(self):
+        with self.assertRaises(ValidationError):
+            acciones_masivas.cambiar_estado(Donacion.objects.all(), 'Pendiente')
+        self.assertEqual(Donacion.objects.get(pk=self.pendiente.pk).estado, 'Pendiente')
+
+
+class AsignarTecnicoTests(TestCase):
+
+    def setUp(self):
+        datos.donacion(equipos=2)
+        abierto, cerrado = Equipo.objects.order_by('pk')
+        self.abierto = Reacondicionamiento.objects.create(id_equipo=abierto, estado_final='En Proceso')
+        self.cerrado = Reacondicionamiento.objects.create(id_equipo=cerrado, estado_final='Reacondicionado')
+        self.tecnico = datos.usuario('Tecnico')
+
+    def test_asigna_los_abiertos_y_avisa_una_vez(self):
+        with mock.patch.object(acciones_masivas, 'notificar_asignacion_tecnico') as notificar:
+            resultado = acciones_masivas.asignar_tecnico(Reacondicionamiento.objects.all(), self.tecnico)
+        self.assertEqual(resultado, acciones_masivas.Resultado(actualizados=1, omitidos=1))
+        self.abierto.refresh_from_db()
+        self.assertEqual(self.abierto.id_tecnico, self.tecnico)
+        self.assertIsNone(self.abierto.fecha_reclamo)
+        self.assertIsNone(Reacondicionamiento.objects.get(pk=self.cerrado.pk).id_tecnico)
+        notificar.assert_called_once_with(self.tecnico, [self.abierto.id_equipo])
+
+    def test_solo_tecnicos_activos(self):
+        for usuario in (datos.usuario('Administrador'), datos.usuario('Tecnico', is_active=False)):
+            with self.subTest(usuario=usuario), self.assertRaises(ValidationError):
+                acciones_masivas.asignar_tecnico(Reacondicionamiento.objects.all(), usuario)
+
+    def test_aplicar_valida_accion_y_tecnico(self):
+        ids = [self.abierto.pk]
+        for accion, tecnico_id in (('estado:Entregada', None), ('tecnico', None), ('tecnico', 'x'), ('tecnico', '0')):
+            with self.subTest(accion=accion, tecnico_id=tecnico_id), self.assertRaises(ValidationError):
+                acciones_masivas.aplicar('reacondicionamiento', accion, ids, tecnico_id)
+        with mock.patch.object(acciones_masivas, 'notificar_asignacion_tecnico'):
+            resultado = acciones_masivas.aplicar('reacondicionamiento', 'tecnico', ids, str(self.tecnico.pk))
+        self.assertEqual(resultado.actualizados, 1)
@@ -0,0 +1,33 @@
+from django.test import TestCase
+
+from app1Backend.models import Equipo, RegistroAuditoria
+from . import datos
+
+
+class AuditoriaTests(TestCase):
+
+    def setUp(self):
+        datos.donacion(equipos=1)
+        self.equipo = Equipo.objects.get()
+
+    def test_cargar_no_consulta_la_fila_guardada(self):
+        with self.assertNumQueries(1):
+            list(Equipo.objects.all())
+
+    def test_modificacion_registra_solo_lo_que_cambio(self):
+        self.equipo.marca = 'Lenovo'
+        self.equipo.save()
+        registro = RegistroAuditoria.objects.get(accion='Modificacion')
+        self.assertEqual(registro.cambios, {'marca': [None, 'Lenovo']})
+
+    def test_la_foto_es_la_fila_guardada_no_la_cargada(self):
+        # Otro proceso cambió la fila después de que esta instancia se cargó
+        Equipo.objects.filter(pk=self.equipo.pk).update(marca='Dell')
+        self.equipo.marca = 'Lenovo'
+        self.equipo.save(update_fields=['marca'])
+        registro = RegistroAuditoria.objects.get(accion='Modificacion')
+        self.assertEqual(registro.cambios, {'marca': ['Dell', 'Lenovo']})
+
+    def test_guardar_sin_cambios_no_registra(self):
+        self.equipo.save()
+        self.assertFalse(RegistroAuditoria.objects.filter(accion='Modificacion').exists())
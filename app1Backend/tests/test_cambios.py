@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from app1Backend import cambios
+from app1Backend.models import Institucion, RegistroCambio, SecuenciaCambios
+from . import datos
+
+
+class RegistrarCambiosTests(TestCase):
+
+    def test_transaccion_revertida_no_deja_cambios(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    datos.institucion()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertFalse(RegistroCambio.objects.exists())
+
+    def test_cursor_y_fecha_se_asignan_al_confirmar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            institucion = datos.institucion()
+            antes_del_commit = timezone.now()
+        cambio = RegistroCambio.objects.get()
+        self.assertGreaterEqual(cambio.fecha, antes_del_commit)
+        self.assertEqual(cambio.objeto_id, institucion.pk)
+        self.assertEqual(SecuenciaCambios.objects.get().ultimo_cambio, cambio.id_cambio)
+
+    def test_cursores_consecutivos_entre_transacciones(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cambios.registrar_cambios(Institucion, ['1-K', '2-K'], 'Modificacion')
+        with self.captureOnCommitCallbacks(execute=True):
+            cambios.registrar_cambios(Institucion, ['3-K'], 'Eliminacion')
+        ids = list(RegistroCambio.objects.order_by('id_cambio').values_list('id_cambio', 'objeto_id'))
+        primero = ids[0][0]
+        self.assertEqual(ids, [(primero, '1-K'), (primero + 1, '2-K'), (primero + 2, '3-K')])
+
+
+class LeerCambiosTests(TestCase):
+
+    def _registrar(self, ids, operacion='Modificacion'):
+        with self.captureOnCommitCallbacks(execute=True):
+            cambios.registrar_cambios(Institucion, ids, operacion)
+
+    def test_un_cambio_confirmado_se_ve_de_inmediato(self):
+        self._registrar(['1-K'])
+        leidos, _, cursor, hay_mas = cambios.leer_cambios()
+        self.assertEqual([cambio.objeto_id for cambio in leidos], ['1-K'])
+        self.assertEqual(cursor, leidos[0].id_cambio)
+        self.assertFalse(hay_mas)
+
+    def test_paginas_siguen_el_cursor(self):
+        self._registrar(['1-K', '2-K', '3-K'])
+        pagina, _, cursor, hay_mas = cambios.leer_cambios(limite=2)
+        self.assertEqual([cambio.objeto_id for cambio in pagina], ['1-K', '2-K'])
+        self.assertTrue(hay_mas)
+        pagina, _, siguiente, hay_mas = cambios.leer_cambios(since=cursor, limite=2)
+        self.assertEqual([cambio.objeto_id for cambio in pagina], ['3-K'])
+        self.assertFalse(hay_mas)
+        self.assertEqual(cambios.leer_cambios(since=siguiente)[0], [])
+        # Sin cambios nuevos el cursor no retrocede
+        self.assertEqual(cambios.leer_cambios(since=siguiente)[2], siguiente)
+
+    def test_varias_ediciones_de_un_objeto_son_una_entrada(self):
+        institucion = datos.institucion()
+        self._registrar([institucion.pk])
+        self._registrar(['99999-K'], 'Eliminacion')
+        self._registrar([institucion.pk])
+        leidos, objetos, cursor, _ = cambios.leer_cambios()
+        self.assertEqual([cambio.objeto_id for cambio in leidos], ['99999-K', institucion.pk])
+        self.assertEqual(cursor, leidos[-1].id_cambio)
+        self.assertEqual(objetos, {'instituciones': {institucion.pk: institucion}})
+
+    def test_cursor_purgado_esta_vencido(self):
+        self._registrar(['1-K', '2-K', '3-K'])
+        primero = RegistroCambio.objects.order_by('id_cambio').first().id_cambio
+        RegistroCambio.objects.filter(id_cambio__lte=primero + 1).delete()
+        with self.assertRaises(cambios.CursorVencido):
+            cambios.leer_cambios(since=primero)
+        # Quien ya leyó hasta el último purgado continúa sin perder nada
+        self.assertEqual([cambio.objeto_id for cambio in cambios.leer_cambios(since=primero + 1)[0]], ['3-K'])
@@ -0,0 +1,80 @@
+import datetime
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.test import TestCase, override_settings
+
+from app1Backend import certificados
+from app1Backend.models import CertificadoEntrega, DetalleAsignacion, Equipo
+from . import datos
+
+FECHA = datetime.date(2026, 3, 15)
+
+
+@override_settings(STORAGES={
+    **settings.STORAGES,
+    'certificados': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+})
+class CertificadosTests(TestCase):
+
+    def setUp(self):
+        donacion = datos.donacion(equipos=2)
+        self.asignacion = datos.asignacion(Equipo.objects.filter(id_donacion=donacion), estado='Entregada',
+                                           fecha_entrega=FECHA)
+
+    def _generar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            certificados.generar_certificados([self.asignacion.pk])
+        return CertificadoEntrega.objects.get(pk=self.asignacion.pk)
+
+    def test_firma_cambia_con_cualquier_dato(self):
+        base = certificados.firmar(1, '1-K', FECHA, [2, 1])
+        self.assertEqual(base, certificados.firmar(1, '1-K', FECHA, [1, 2]))
+        for otra in (
+            certificados.firmar(2, '1-K', FECHA, [1, 2]),
+            certificados.firmar(1, '2-K', FECHA, [1, 2]),
+            certificados.firmar(1, '1-K', FECHA + datetime.timedelta(days=1), [1, 2]),
+            certificados.firmar(1, '1-K', FECHA, [1]),
+        ):
+            self.assertNotEqual(base, otra)
+
+    def test_certificado_generado_se_verifica(self):
+        certificado = self._generar()
+        self.assertEqual(certificado.fecha_entrega, FECHA)
+        self.assertEqual(certificado.total_equipos, 2)
+        with storages['certificados'].open(certificado.archivo) as archivo:
+            self.assertIn(certificado.firma, archivo.read().decode())
+        self.assertEqual(certificados.verificar_codigo(self.asignacion.pk, f' {certificado.firma} '),
+                         (certificado, True))
+
+    def test_codigo_falso_no_se_acepta(self):
+        self._generar()
+        self.assertEqual(certificados.verificar_codigo(self.asignacion.pk, 'falso'), (None, False))
+
+    def test_asignacion_modificada_ya_no_es_vigente(self):
+        certificado = self._generar()
+        DetalleAsignacion.objects.filter(id_asignacion=self.asignacion).first().delete()
+        self.assertEqual(certificados.verificar([certificado]), {self.asignacion.pk: False})
+        self.assertEqual(certificados.verificar_codigo(self.asignacion.pk, certificado.firma), (certificado, False))
+
+    def test_regenerar_borra_el_anterior_al_confirmar(self):
+        anterior = self._generar().archivo
+        nuevo = self._generar().archivo
+        almacenamiento = storages['certificados']
+        self.assertNotEqual(anterior, nuevo)
+        self.assertFalse(almacenamiento.exists(anterior))
+        self.assertTrue(almacenamiento.exists(nuevo))
+
+    def test_si_falla_el_reemplazo_se_conserva_el_anterior(self):
+        anterior = self._generar().archivo
+        almacenamiento = storages['certificados']
+        carpeta = f'certificados/{FECHA:%Y/%m}'
+        archivos = almacenamiento.listdir(carpeta)
+        with mock.patch.object(CertificadoEntrega.objects, 'bulk_create', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            self._generar()
+        self.assertEqual(CertificadoEntrega.objects.get().archivo, anterior)
+        self.assertTrue(almacenamiento.exists(anterior))
+        # El archivo nuevo, sin fila que lo use, se borró
+        self.assertEqual(almacenamiento.listdir(carpeta), archivos)
@@ -0,0 +1,68 @@
+import datetime
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from app1Backend import cola_trabajo
+from app1Backend.models import Equipo, Reacondicionamiento
+from . import datos
+
+
+class ReclamarSiguienteTests(TestCase):
+
+    def setUp(self):
+        datos.donacion(equipos=3)
+        self.equipos = list(Equipo.objects.order_by('pk'))
+        self.tecnico = datos.usuario('Tecnico')
+        self.otro = datos.usuario('Tecnico')
+
+    def _en_cada_modo(self):
+        # SQLite ignora FOR UPDATE: así también se recorre el camino con SKIP LOCKED
+        for skip_locked in (False, True):
+            with self.subTest(skip_locked=skip_locked), \
+                    mock.patch.object(connection.features, 'has_select_for_update_skip_locked', skip_locked):
+                Reacondicionamiento.objects.all().delete()
+                yield
+
+    def test_toma_el_pendiente_mas_antiguo(self):
+        for _ in self._en_cada_modo():
+            reclamo = cola_trabajo.reclamar_siguiente(self.tecnico)
+            self.assertEqual(reclamo.id_equipo, self.equipos[0])
+            self.assertEqual(reclamo.id_tecnico, self.tecnico)
+            self.assertEqual(reclamo.estado_final, 'En Proceso')
+            self.assertIsNotNone(reclamo.fecha_reclamo)
+            self.assertEqual(cola_trabajo.reclamar_siguiente(self.otro).id_equipo, self.equipos[1])
+
+    def test_omite_los_entregados_y_retorna_none_sin_pendientes(self):
+        datos.asignacion([self.equipos[0]])
+        for _ in self._en_cada_modo():
+            self.assertEqual(cola_trabajo.reclamar_siguiente(self.tecnico).id_equipo, self.equipos[1])
+            self.assertEqual(cola_trabajo.reclamar_siguiente(self.tecnico).id_equipo, self.equipos[2])
+            self.assertIsNone(cola_trabajo.reclamar_siguiente(self.tecnico))
+
+    def test_modo_optimista_pasa_al_siguiente_si_otro_gano(self):
+        pendientes = cola_trabajo.equipos_pendientes
+
+        def leidos_antes_de_que_otro_reclame():
+            # Los candidatos se leen y, antes del INSERT, otro técnico toma el primero
+            ids = list(pendientes().values_list('id_equipo', flat=True))
+            cola_trabajo._crear_reclamo(ids[0], self.otro)
+            return mock.Mock(**{'values_list.return_value': ids})
+
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', False), \
+                mock.patch.object(cola_trabajo, 'equipos_pendientes', leidos_antes_de_que_otro_reclame):
+            reclamo = cola_trabajo.reclamar_siguiente(self.tecnico)
+        self.assertEqual(reclamo.id_equipo, self.equipos[1])
+        self.assertEqual(Reacondicionamiento.objects.get(pk=self.equipos[0].pk).id_tecnico, self.otro)
+
+    def test_liberar_devuelve_a_la_cola_solo_los_reclamos_vencidos(self):
+        vencido = cola_trabajo.reclamar_siguiente(self.tecnico)
+        Reacondicionamiento.objects.filter(pk=vencido.pk).update(
+            fecha_reclamo=timezone.now() - datetime.timedelta(hours=25),
+        )
+        vigente = cola_trabajo.reclamar_siguiente(self.otro)
+        self.assertEqual(cola_trabajo.liberar_reclamos_vencidos(horas=24), 1)
+        self.assertEqual(list(Reacondicionamiento.objects.values_list('pk', flat=True)), [vigente.pk])
+        self.assertEqual(cola_trabajo.reclamar_siguiente(self.tecnico).id_equipo, self.equipos[0])
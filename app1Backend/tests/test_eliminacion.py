@@ -0,0 +1,86 @@
+import types
+from unittest import mock
+
+from django.db import models
+from django.test import TestCase
+
+from app1Backend import eliminacion
+from app1Backend.models import Donacion, DetalleAsignacion, Equipo, Institucion, Reacondicionamiento, Usuario
+from . import datos
+
+
+class PlanTests(TestCase):
+
+    def test_cascada_de_donacion(self):
+        pasos = {paso.modelo: paso for paso in eliminacion._plan(Donacion)}
+        self.assertIs(pasos[Equipo].accion, models.CASCADE)
+        hijos = {paso.modelo: paso.accion for paso in pasos[Equipo].hijos}
+        self.assertIs(hijos[Reacondicionamiento], models.CASCADE)
+        self.assertIs(hijos[DetalleAsignacion], models.CASCADE)
+
+    def test_regla_no_soportada_no_tiene_plan(self):
+        acciones = {regla: texto for regla, texto in eliminacion.ACCIONES.items() if regla is not models.SET_NULL}
+        with mock.patch.dict(eliminacion.ACCIONES, acciones, clear=True):
+            self.assertIsNone(eliminacion._plan(Usuario))
+
+    def test_cascada_ciclica_no_tiene_plan(self):
+        ciclo = types.SimpleNamespace(
+            on_delete=models.CASCADE, related_model=Donacion, field=types.SimpleNamespace(name='id_donacion'),
+        )
+        with mock.patch.object(eliminacion, 'get_candidate_relations_to_delete', return_value=[ciclo]):
+            self.assertIsNone(eliminacion._plan(Donacion))
+
+
+class EliminarTests(TestCase):
+
+    def test_impacto_cuenta_la_cascada(self):
+        donacion = datos.donacion(equipos=3)
+        filas = {fila['modelo']: fila for fila in eliminacion.impacto(Donacion.objects.filter(pk=donacion.pk))}
+        self.assertEqual(filas[Equipo._meta.verbose_name_plural]['cantidad'], 3)
+        self.assertFalse(eliminacion.bloqueos(filas.values()))
+
+    def test_fk_con_restriccion_bloquea(self):
+        donacion = datos.donacion(equipos=1)
+        instituciones = Institucion.objects.filter(pk=donacion.rut_institucion_id)
+        with self.assertRaises(eliminacion.EliminacionBloqueada):
+            eliminacion.eliminar(instituciones)
+        self.assertTrue(Equipo.objects.filter(id_donacion=donacion).exists())
+
+    def test_elimina_por_lotes_con_descendientes(self):
+        donacion = datos.donacion(equipos=5)
+        tecnico = datos.usuario()
+        for equipo in Equipo.objects.filter(id_donacion=donacion)[:2]:
+            Reacondicionamiento.objects.create(id_equipo=equipo, id_tecnico=tecnico, estado_final='Pendiente')
+        datos.asignacion(Equipo.objects.filter(id_donacion=donacion)[2:4])
+
+        conteo = eliminacion.eliminar(Donacion.objects.filter(pk=donacion.pk), lote=2)
+
+        self.assertEqual(conteo[Equipo._meta.verbose_name_plural], 5)
+        self.assertEqual(conteo[Reacondicionamiento._meta.verbose_name_plural], 2)
+        self.assertEqual(conteo[DetalleAsignacion._meta.verbose_name_plural], 2)
+        self.assertFalse(Donacion.objects.filter(pk=donacion.pk).exists())
+        self.assertFalse(Equipo.objects.exists())
+
+    def test_set_null_desvincula(self):
+        tecnico = datos.usuario()
+        equipo = Equipo.objects.get(id_donacion=datos.donacion(equipos=1))
+        Reacondicionamiento.objects.create(id_equipo=equipo, id_tecnico=tecnico, estado_final='Pendiente')
+
+        eliminacion.eliminar(Usuario.objects.filter(pk=tecnico.pk))
+
+        self.assertIsNone(Reacondicionamiento.objects.get(pk=equipo.pk).id_tecnico_id)
+
+    def test_sin_plan_usa_delete_de_django(self):
+        tecnico = datos.usuario()
+        equipo = Equipo.objects.get(id_donacion=datos.donacion(equipos=1))
+        Reacondicionamiento.objects.create(id_equipo=equipo, id_tecnico=tecnico, estado_final='Pendiente')
+        acciones = {regla: texto for regla, texto in eliminacion.ACCIONES.items() if regla is not models.SET_NULL}
+        usuarios = Usuario.objects.filter(pk=tecnico.pk)
+
+        with mock.patch.dict(eliminacion.ACCIONES, acciones, clear=True):
+            filas = eliminacion.impacto(usuarios)
+            conteo = eliminacion.eliminar(usuarios)
+
+        self.assertEqual(filas[0]['cantidad'], 1)
+        self.assertEqual(conteo[Usuario._meta.verbose_name_plural], 1)
+        self.assertIsNone(Reacondicionamiento.objects.get(pk=equipo.pk).id_tecnico_id)
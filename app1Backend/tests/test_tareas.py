@@ -0,0 +1,84 @@
+import threading
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from app1Backend import tareas
+from app1Backend.imagenes import optimizar_imagen_equipo
+from app1Backend.models import Soporte, Tarea
+from app1Backend.notificaciones import enviar_resumen_soporte
+from app1Backend.services import enviar_correo_segundo_plano
+from . import datos
+
+
+@override_settings(TAREAS_EN_LINEA=False)
+class SinTrabajadorTests(TestCase):
+
+    def setUp(self):
+        cache.delete(tareas.CLAVE_LATIDO)
+        self.addCleanup(cache.delete, tareas.CLAVE_LATIDO)
+        # El aviso se limita a uno por intervalo; cada prueba empieza sin aviso previo
+        aviso = mock.patch.object(tareas, '_ultimo_aviso', None)
+        aviso.start()
+        self.addCleanup(aviso.stop)
+
+    def _esperar_hilos(self):
+        for hilo in threading.enumerate():
+            if isinstance(hilo, threading.Timer):
+                hilo.join(5)
+
+    def test_sin_worker_el_correo_se_envia_en_un_hilo(self):
+        with mock.patch('builtins.print'), self.captureOnCommitCallbacks(execute=True):
+            enviar_correo_segundo_plano('Asunto', 'Mensaje', ['a@ejemplo.com'])
+        self._esperar_hilos()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_con_worker_el_correo_se_encola(self):
+        tareas.registrar_latido()
+        with self.captureOnCommitCallbacks(execute=True):
+            enviar_correo_segundo_plano('Asunto', 'Mensaje', ['a@ejemplo.com'])
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(Tarea.objects.get().nombre, 'app1Backend.services.entregar_correo')
+
+    def test_sin_worker_las_demas_tareas_esperan_en_la_cola(self):
+        with mock.patch('builtins.print') as consola, self.captureOnCommitCallbacks(execute=True):
+            optimizar_imagen_equipo.encolar(1, 'foto.jpg')
+        self.assertEqual(Tarea.objects.get().nombre, 'app1Backend.imagenes.optimizar_imagen_equipo')
+        self.assertIn('runworker', consola.call_args.args[0])
+
+
+class AgruparTests(TestCase):
+
+    def setUp(self):
+        tareas.registrar_latido()
+        self.addCleanup(cache.delete, tareas.CLAVE_LATIDO)
+
+    def test_eventos_de_una_clave_van_en_una_tarea(self):
+        enviar_resumen_soporte.agrupar('1-K', 10, 300)
+        enviar_resumen_soporte.agrupar('1-K', 11, 300)
+        enviar_resumen_soporte.agrupar('2-K', 10, 300)
+        argumentos = {tarea.clave: tarea.argumentos['args'] for tarea in Tarea.objects.all()}
+        self.assertEqual(argumentos, {'1-K': ['1-K', [10, 11]], '2-K': ['2-K', [10]]})
+
+    def test_tarea_reclamada_no_recibe_mas_eventos(self):
+        primera = enviar_resumen_soporte.agrupar('1-K', 10, 0)
+        Tarea.objects.filter(pk=primera.pk).update(estado='En Curso')
+        segunda = enviar_resumen_soporte.agrupar('1-K', 11, 0)
+        self.assertNotEqual(primera.pk, segunda.pk)
+        self.assertEqual(segunda.argumentos['args'], ['1-K', [11]])
+
+    def test_resumen_cuenta_las_ediciones_por_ticket(self):
+        receptora = datos.institucion('Receptora')
+        receptora.contacto_email = 'contacto@ejemplo.com'
+        receptora.save()
+        asignacion = datos.asignacion(receptora=receptora)
+        ticket = Soporte.objects.create(id_asignacion=asignacion, tipo='Hardware', descripcion='No enciende')
+        with mock.patch('app1Backend.notificaciones.notificar_resumen_soporte') as notificar:
+            enviar_resumen_soporte(receptora.pk, [ticket.pk, ticket.pk])
+        destinatario, _, tickets, ediciones = notificar.call_args.args
+        self.assertEqual(destinatario, 'contacto@ejemplo.com')
+        self.assertEqual(tickets, [ticket])
+        self.assertEqual(ediciones[ticket.pk], 2)
@@ -0,0 +1,299 @@
+"""
+Trazas de las peticiones: spans anidados con la duración de cada parte.
+
+    GET equipo-list                  (TrazasMiddleware, la petición completa)
+      vista equipo-list              (TrazaVistaMiddleware: resolución, vista y render)
+        SELECT                       (cada consulta SQL, execute_wrapper)
+        plantilla app1Backend/...    (plantillas.py)
+        almacenamiento url           (AlmacenamientoTrazado, en STORAGES)
+        encolar ...entregar_correo   (tareas.py: el contexto viaja con la tarea)
+    tarea ...entregar_correo         (runworker, hijo del span 'encolar')
+      correo send_mail               (services.py)
+
+Formato: cada volcado agrega a TRAZAS_ARCHIVO una línea JSON de OTLP
+(ExportTraceServiceRequest, la misma que escribe el 'file exporter' del
+OpenTelemetry Collector), que pueden leer el receptor 'otlpjsonfile' del
+Collector, Jaeger o Grafana Tempo. Sin dependencias: es la biblioteca estándar.
+
+Muestreo (por traza, al inicio): TRAZAS_MUESTREO es la fracción de trazas que
+se registran, decidida con el ID de la traza (como TraceIdRatioBased de
+OpenTelemetry). Una traza no muestreada no crea spans hijos ni mide consultas;
+su contexto igual se propaga (con el flag 00) para que la tarea encolada siga
+la misma decisión. TRAZAS_MAX_SPANS limita los spans de una traza (un listado
+con N+1 consultas no llena el archivo). Con TRAZAS_ARCHIVO vacío no se traza.
+
+Propagación: el contexto es un contextvar del hilo de la petición; hacia la
+cola de tareas viaja como encabezado W3C 'traceparent' guardado en los
+argumentos de la tarea (el worker es otro proceso).
+"""
+import contextlib
+import contextvars
+import json
+import os
+import random
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .volcado import VolcadoPeriodico, agregar_linea
+
+# Tipos de span de OTLP (SpanKind)
+INTERNO = 1
+SERVIDOR = 2
+CLIENTE = 3
+PRODUCTOR = 4
+CONSUMIDOR = 5
+
+ESTADO_ERROR = 2
+SERVICIO = 'reconectatec'
+# Las sentencias SQL muy largas (IN con miles de IDs) se recortan en el atributo
+LARGO_SENTENCIA = 2000
+# Spans en memoria que fuerzan el volcado sin esperar al temporizador
+LOTE_VOLCADO = 500
+INTERVALO_VOLCADO = 2
+
+_actual = contextvars.ContextVar('trazas_span_actual', default=None)
+
+
+# =========================================================
+# SPANS
+# =========================================================
+
+class _Traza:
+    __slots__ = ('id', 'muestreada', 'spans', 'descartados')
+
+    def __init__(self, id_traza, muestreada):
+        self.id = id_traza
+        self.muestreada = muestreada
+        self.spans = 0
+        self.descartados = 0
+
+
+class Span:
+    __slots__ = ('traza', 'id', 'padre', 'nombre', 'tipo', 'inicio', 'atributos', 'error')
+
+    def __init__(self, traza, padre, nombre, tipo, atributos):
+        self.traza = traza
+        self.id = _nuevo_id(64)
+        self.padre = padre
+        self.nombre = nombre
+        self.tipo = tipo
+        self.atributos = atributos
+        self.error = None
+        self.inicio = time.time_ns()
+
+    def traceparent(self):
+        """Contexto en formato W3C, para continuar la traza en otro proceso."""
+        return f"00-{self.traza.id}-{self.id}-{'01' if self.traza.muestreada else '00'}"
+
+    def _terminar(self):
+        if not self.traza.muestreada:
+            return
+        fin = time.time_ns()
+        datos = {
+            'traceId': self.traza.id,
+            'spanId': self.id,
+            'name': self.nombre,
+            'kind': self.tipo,
+            'startTimeUnixNano': str(self.inicio),
+            'endTimeUnixNano': str(fin),
+            'attributes': _atributos(self.atributos),
+        }
+        if self.padre:
+            datos['parentSpanId'] = self.padre
+        if self.error:
+            datos['status'] = {'code': ESTADO_ERROR, 'message': self.error}
+        _exportar(datos)
+
+
+def _nuevo_id(bits):
+    return f'{random.getrandbits(bits) or 1:0{bits // 4}x}'
+
+def _atributos(valores):
+    lista = []
+    for clave, valor in valores.items():
+        if isinstance(valor, bool):
+            valor = {'boolValue': valor}
+        elif isinstance(valor, int):
+            valor = {'intValue': str(valor)}  # int64 va como texto en OTLP/JSON
+        elif isinstance(valor, float):
+            valor = {'doubleValue': valor}
+        else:
+            valor = {'stringValue': str(valor)}
+        lista.append({'key': clave, 'value': valor})
+    return lista
+
+@contextlib.contextmanager
+def _activar(span):
+    span.traza.spans += 1
+    token = _actual.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        _actual.reset(token)
+        span._terminar()
+
+def _contexto_remoto(traceparent):
+    # 'version-trace_id-span_id-flags' (W3C Trace Context). Retorna (traza, padre, muestreada) o None
+    partes = (traceparent or '').strip().lower().split('-')
+    if len(partes) != 4 or len(partes[1]) != 32 or len(partes[2]) != 16 or len(partes[3]) != 2:
+        return None
+    try:
+        valores = [int(parte, 16) for parte in partes[1:]]
+    except ValueError:
+        return None
+    if not valores[0] or not valores[1]:
+        return None
+    return partes[1], partes[2], bool(valores[2] & 1)
+
+def _muestrear(id_traza):
+    # Decisión por los 64 bits bajos del ID: la misma traza da el mismo resultado en todo proceso
+    return int(id_traza[16:], 16) < settings.TRAZAS_MUESTREO * 2 ** 64
+
+@contextlib.contextmanager
+def traza(nombre, traceparent=None, tipo=SERVIDOR, **atributos):
+    """
+    Span raíz (petición o tarea). Con `traceparent` continúa esa traza y
+    respeta su decisión de muestreo. Mientras está activo, cada consulta SQL
+    de este hilo es un span. Entrega el span, o None si las trazas están desactivadas.
+    """
+    if not settings.TRAZAS_ARCHIVO:
+        yield None
+        return
+    remoto = _contexto_remoto(traceparent)
+    if remoto:
+        id_traza, padre, muestreada = remoto
+    else:
+        id_traza, padre = _nuevo_id(128), None
+        muestreada = _muestrear(id_traza)
+    estado = _Traza(id_traza, muestreada)
+    with _activar(Span(estado, padre, nombre, tipo, atributos)) as raiz:
+        if not muestreada:
+            yield raiz
+            return
+        try:
+            with connection.execute_wrapper(_trazar_consulta):
+                yield raiz
+        finally:
+            if estado.descartados:
+                raiz.atributos['trazas.spans_descartados'] = estado.descartados
+
+@contextlib.contextmanager
+def span(nombre, tipo=INTERNO, **atributos):
+    """Span hijo del actual. Fuera de una traza muestreada no hace nada (entrega None)."""
+    padre = _actual.get()
+    if padre is None or not padre.traza.muestreada:
+        yield None
+        return
+    if padre.traza.spans >= settings.TRAZAS_MAX_SPANS:
+        padre.traza.descartados += 1
+        yield None
+        return
+    with _activar(Span(padre.traza, padre.id, nombre, tipo, atributos)) as actual:
+        yield actual
+
+def actual():
+    return _actual.get()
+
+def traceparent_actual():
+    """Contexto del span actual en formato W3C, o None fuera de una traza."""
+    activo = _actual.get()
+    return activo.traceparent() if activo else None
+
+
+# =========================================================
+# INSTRUMENTACIÓN
+# =========================================================
+
+def _trazar_consulta(execute, sql, params, many, context):
+    # execute_wrapper instalado por traza(): un span por consulta (sin los parámetros)
+    operacion = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else 'SQL'
+    with span(operacion, CLIENTE, **{
+        'db.system': context['connection'].vendor,
+        'db.statement': sql[:LARGO_SENTENCIA],
+    }):
+        return execute(sql, params, many, context)
+
+
+class AlmacenamientoTrazado:
+    """
+    Envuelve el almacenamiento de archivos configurado en STORAGES (OPTIONS
+    'backend') con un span por operación. Lo demás se delega sin cambios.
+    """
+    OPERACIONES = ('save', 'open', 'delete', 'exists', 'url', 'size')
+
+    def __init__(self, backend, **opciones):
+        self.almacenamiento = import_string(backend)(**opciones)
+        self.backend = backend
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self.almacenamiento, nombre)
+        if nombre not in self.OPERACIONES:
+            return atributo
+
+        def trazada(name, *args, **kwargs):
+            with span(f'almacenamiento {nombre}', CLIENTE, **{
+                'almacenamiento.backend': self.backend, 'archivo.nombre': str(name),
+            }):
+                return atributo(name, *args, **kwargs)
+        return trazada
+
+
+# =========================================================
+# EXPORTACIÓN (OTLP/JSON A ARCHIVO)
+# =========================================================
+
+_lock = threading.Lock()
+_pendientes = []
+
+def _exportar(datos):
+    with _lock:
+        _pendientes.append(datos)
+        lleno = len(_pendientes) >= LOTE_VOLCADO
+    if lleno:
+        volcar()
+    else:
+        _volcado.programar()
+
+def _recurso():
+    return _atributos({
+        'service.name': SERVICIO,
+        'host.name': socket.gethostname(),
+        'process.pid': os.getpid(),
+    })
+
+def _tomar():
+    global _pendientes
+    with _lock:
+        lote, _pendientes = _pendientes, []
+    if not lote:
+        return None
+    return json.dumps({'resourceSpans': [{
+        'resource': {'attributes': _recurso()},
+        'scopeSpans': [{'scope': {'name': __name__}, 'spans': lote}],
+    }]}, ensure_ascii=False, separators=(',', ':'))
+
+def _reiniciar():
+    # El hijo de un fork no hereda los spans pendientes del padre
+    global _pendientes
+    _pendientes = []
+
+
+_volcado = VolcadoPeriodico(
+    'trazas',
+    intervalo=lambda: INTERVALO_VOLCADO,
+    tomar=_tomar,
+    escribir=lambda linea: agregar_linea(settings.TRAZAS_ARCHIVO, linea),
+    reiniciar=_reiniciar,
+)
+
+def volcar():
+    """Agrega los spans pendientes de este proceso a TRAZAS_ARCHIVO, en una línea."""
+    _volcado.volcar()
@@ -1,22 +1,48 @@
-from django.shortcuts import render, redirect
-from django.urls import reverse_lazy
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import get_object_or_404, render, redirect
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse, reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.contrib import messages
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.db import IntegrityError
 from django.utils.html import format_html, mark_safe
 from django.db.models import Q # Importante para búsquedas OR (Nombre O ID)
 from django.contrib.auth import update_session_auth_hash
+from django.utils import timezone
 from .decorators import is_todas_las_cuentas, is_soporte_access
-from .services import notificar_nuevo_usuario, notificar_ticket_soporte, notificar_actualizacion_perfil, notificar_resolucion_soporte
+from .services import notificar_nuevo_usuario, notificar_ticket_soporte, notificar_actualizacion_perfil
+from .notificaciones import registrar_actualizacion_soporte
+from .analitica import tendencias_mensuales
+from .cola_trabajo import equipos_pendientes, reclamar_siguiente
+from .auditoria import MODELOS_AUDITADOS
+from .especificaciones import TIPOS_ALMACENAMIENTO, filtrar_por_especificaciones
+from .archivo import LIMITE_LISTADO, POR_MODELO_ARCHIVADO, archivados, incluir_archivados
+from .sla import indicadores as indicadores_sla
+from .facetas import seleccion_de, filtrar_por_facetas, contar_facetas, enlace_alternado
+from .imagenes import encolar_optimizacion
+from . import metricas as metricas_app
+from .cache_niveles import memorizar
+from .referencias import adjuntar
+from . import certificados, etiquetas
+from .eliminacion import EliminacionBloqueada, bloqueos, eliminar_o_encolar, impacto
+from .acciones_masivas import ACCIONES_LISTADO, aplicar as aplicar_accion_masiva, resumen as resumen_accion_masiva
 # --- DECORADORES NECESARIOS ---
 from django.utils.decorators import method_decorator
 # user_passes_test es el decorador clave para chequear roles
 from django.contrib.auth.decorators import login_required, user_passes_test
+# Política de caché HTTP por vista (por defecto: private, no-cache; ver PoliticaCacheMiddleware)
+from django.views.decorators.cache import cache_control
 
 # Importamos TODOS los modelos y formularios que vamos a usar
 from .models import (
     Institucion, Usuario, Donacion, Equipo, 
-    Asignacion, Reacondicionamiento, Soporte
+    Asignacion, Reacondicionamiento, Soporte, RegistroAuditoria,
+    AsignacionArchivada, ReacondicionamientoArchivado, SoporteArchivado,
 )
 from .forms import (
     InstitucionForm,
@@ -61,6 +87,90 @@ class SuccessMessageUpdateView(UpdateView):
         messages.success(self.request, self.success_message)
         return super().form_valid(form)
 
+class EliminacionEnCascadaMixin:
+    """
+    Eliminación con vista previa y cascada por lotes (ver eliminacion.py).
+    GET retorna el fragmento con el impacto, que el modal de confirmación
+    muestra antes de eliminar; POST elimina (o encola si la cascada es grande).
+    """
+    mensaje_exito = "El registro '{objeto}' fue eliminado exitosamente."
+    mensaje_error = "No se puede eliminar el registro porque tiene registros asociados."
+
+    def _queryset(self):
+        return self.model.objects.filter(pk=self.object.pk)
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        filas = impacto(self._queryset())
+        return render(request, 'app1Backend/_impacto_eliminacion.html', {'impacto': filas, 'bloqueada': bool(bloqueos(filas))})
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        try:
+            encolada, _ = eliminar_o_encolar(self._queryset(), request.user)
+        except (EliminacionBloqueada, IntegrityError) as error:
+            detalle = f" ({error})" if isinstance(error, EliminacionBloqueada) else ""
+            messages.error(request, f"{self.mensaje_error}{detalle}")
+            return redirect(self.success_url)
+        if encolada:
+            messages.info(request, f"'{self.object}' tiene muchos registros asociados: se está eliminando en segundo plano.")
+        else:
+            messages.success(request, self.mensaje_exito.format(objeto=self.object))
+        return redirect(self.success_url)
+
+class AccionesMasivasMixin:
+    """
+    Listados con acciones masivas (ver acciones_masivas.py): para los
+    administradores agrega al contexto las acciones de `listado_masivo`
+    y, si una asigna técnico, los técnicos activos.
+    """
+    listado_masivo = None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if is_admin(self.request.user):
+            acciones = ACCIONES_LISTADO[self.listado_masivo]
+            context['listado_masivo'] = self.listado_masivo
+            context['acciones_masivas'] = acciones
+            if 'tecnico' in acciones:
+                context['tecnicos'] = Usuario.objects.filter(rol='Tecnico', is_active=True).order_by('nombre', 'apellido')
+        return context
+
+class ReferenciasMixin:
+    """
+    Listados que muestran instituciones o técnicos: carga las FK
+    `relaciones_referencia` de la página desde la caché de referencias.py
+    (sin una consulta por fila ni JOIN).
+    """
+    relaciones_referencia = []
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        adjuntar(context['object_list'], *self.relaciones_referencia)
+        return context
+
+class ArchivadosMixin:
+    """
+    Listados con registros archivados (ver archivo.py): con ?archivados=1 agrega
+    al contexto los más recientes, filtrados con la misma búsqueda `q`.
+    `modelo_archivado` debe estar registrado en archivo.ARCHIVOS.
+    """
+    modelo_archivado = None
+    relaciones_archivado = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.modelo_archivado not in POR_MODELO_ARCHIVADO:
+            raise ImproperlyConfigured(f"{cls.__name__}.modelo_archivado no está registrado en archivo.ARCHIVOS.")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['incluir_archivados'] = incluir_archivados(self.request.GET)
+        if context['incluir_archivados']:
+            context['archivados'] = archivados(self.modelo_archivado, self.request.GET.get('q'), self.relaciones_archivado)
+            context['limite_archivados'] = LIMITE_LISTADO
+        return context
+
 
 # =========================================================
 # VISTAS PRINCIPALES (Manejo de Login y Redirección)
@@ -88,9 +198,8 @@ def dashboard_redirect(request):
     return redirect('dashboard')
 
 
-@user_passes_test(is_admin, login_url=LOGIN_URL)
-def dashboard(request):
-    context = {
+def _totales_dashboard():
+    return {
         'total_instituciones': Institucion.objects.count(),
         'total_usuarios': Usuario.objects.count(),
         'total_donaciones': Donacion.objects.count(),
@@ -98,10 +207,70 @@ def dashboard(request):
         'total_asignaciones': Asignacion.objects.count(),
         'total_reacondicionamientos': Reacondicionamiento.objects.count(),
         'total_soportes': Soporte.objects.count(),
+        'sla': indicadores_sla(),
     }
+
+@user_passes_test(is_admin, login_url=LOGIN_URL)
+def dashboard(request):
+    # Los mismos totales para todos los administradores: se recalculan una vez por vencimiento (cache_niveles.py)
+    context = memorizar(
+        'dashboard', _totales_dashboard,
+        settings.DASHBOARD_CACHE_SEGUNDOS, gracia=settings.DASHBOARD_CACHE_GRACIA,
+    )
     return render(request, 'app1Backend/dashboard.html', context)
 
 
+@user_passes_test(is_admin, login_url=LOGIN_URL)
+@cache_control(private=True, max_age=300)  # Datos precalculados: el navegador puede reutilizarlos 5 min
+def estadisticas(request):
+    """
+    Tendencias mensuales calculadas desde las tablas de resumen diario.
+    Los datos se actualizan con `python manage.py actualizar_resumenes`.
+    """
+    return render(request, 'app1Backend/estadisticas.html', tendencias_mensuales())
+
+
+@user_passes_test(is_admin, login_url=LOGIN_URL)
+def historial(request, modelo, pk):
+    """
+    Historial de cambios de un objeto auditado (Equipo, Donación o Soporte).
+    Usa el índice (modelo, objeto_id, fecha) de RegistroAuditoria.
+    """
+    if modelo not in MODELOS_AUDITADOS:
+        raise Http404("Modelo sin auditoría")
+    try:
+        # La ruta acepta cualquier texto: se valida contra la PK del modelo
+        pk = MODELOS_AUDITADOS[modelo]._meta.pk.to_python(pk)
+    except ValidationError:
+        raise Http404("Identificador no válido")
+
+    registros = (
+        RegistroAuditoria.objects
+        .filter(modelo=modelo, objeto_id=pk)
+        .order_by('-fecha')[:200]
+    )
+    # El objeto puede haber sido eliminado: el historial se muestra igual
+    objeto = MODELOS_AUDITADOS[modelo].objects.filter(pk=pk).first()
+    context = {
+        'modelo': modelo,
+        'objeto_id': pk,
+        'objeto': objeto,
+        'registros': registros,
+    }
+    return render(request, 'app1Backend/historial.html', context)
+
+
+@cache_control(no_store=True)
+def metricas(request):
+    """
+    Métricas de todos los procesos en formato de texto de Prometheus (ver
+    metricas.py). Acceso con el token de METRICAS_TOKEN o como administrador.
+    """
+    if not (metricas_app.autorizado(request) or is_admin(request.user)):
+        return HttpResponse("No autorizado.", status=403, content_type='text/plain; charset=utf-8')
+    return HttpResponse(metricas_app.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 # =========================================================
 # VISTAS CRUD CON BÚSQUEDA ACTUALIZADA (ID Y NOMBRE)
 # =========================================================
@@ -140,22 +309,11 @@ class InstitucionUpdateView(SuccessMessageUpdateView):
     success_message = "¡Institución modificada exitosamente!"
 
 @method_decorator(user_passes_test(is_admin, login_url=LOGIN_URL), name='dispatch')
-class InstitucionDeleteView(DeleteView):
+class InstitucionDeleteView(EliminacionEnCascadaMixin, DeleteView):
     model = Institucion
     success_url = reverse_lazy('institucion-list')
-
-    def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        try:
-            self.object.delete()
-            messages.success(request, f"La institución '{self.object.nombre}' fue eliminada exitosamente.")
-            return redirect(self.success_url)
-        except IntegrityError:
-            donaciones_asociadas = self.object.donacion_set.all()
-            asignaciones_asociadas = self.object.asignacion_set.all() 
-            error_message = f"No se puede eliminar la institución '{self.object.nombre}' porque tiene registros asociados."
-            messages.error(request, error_message)
-            return redirect(self.success_url)
+    mensaje_exito = "La institución '{objeto.nombre}' fue eliminada exitosamente."
+    mensaje_error = "No se puede eliminar la institución porque tiene registros asociados."
 
 
 # --- CRUD para Usuarios ---
@@ -264,8 +422,10 @@ class PerfilUsuarioUpdateView(SuccessMessageUpdateView):
 # --- CRUD para Donaciones ---
 
 @method_decorator(user_passes_test(is_admin_or_voluntario, login_url=LOGIN_URL), name='dispatch')
-class DonacionListView(ListView):
+class DonacionListView(AccionesMasivasMixin, ReferenciasMixin, ListView):
     model = Donacion
+    relaciones_referencia = ['rut_institucion']
+    listado_masivo = 'donacion'
     template_name = 'app1Backend/donacion_list.html'
 
     def get_queryset(self):
@@ -305,19 +465,11 @@ class DonacionUpdateView(SuccessMessageUpdateView):
     success_message = "¡Donación modificada exitosamente!"
 
 @method_decorator(user_passes_test(is_admin, login_url=LOGIN_URL), name='dispatch')
-class DonacionDeleteView(DeleteView):
+class DonacionDeleteView(EliminacionEnCascadaMixin, DeleteView):
     model = Donacion
     success_url = reverse_lazy('donacion-list')
-
-    def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        try:
-            self.object.delete()
-            messages.success(request, f"La donación '{self.object}' fue eliminada exitosamente.")
-            return redirect(self.success_url)
-        except IntegrityError:
-            messages.error(request, f"No se puede eliminar la donación porque tiene Equipos asociados.")
-            return redirect(self.success_url)
+    mensaje_exito = "La donación '{objeto}' fue eliminada exitosamente."
+    mensaje_error = "No se puede eliminar la donación porque tiene registros asociados."
 
 
 # --- CRUD para Equipos ---
@@ -329,15 +481,38 @@ class EquipoListView(ListView):
 
     def get_queryset(self):
         query = self.request.GET.get('q')
+        queryset = Equipo.objects.all()
         if query:
             # Busca por ID de Equipo, Marca, Modelo o Serie
-            return Equipo.objects.filter(
+            queryset = queryset.filter(
                 Q(id_equipo__icontains=query) | # Busca por ID numérico
                 Q(marca__icontains=query) | 
                 Q(modelo__icontains=query) |
                 Q(num_serie__icontains=query)
             )
-        return Equipo.objects.all()
+        # Rangos de RAM/almacenamiento (GB) sobre las columnas normalizadas
+        try:
+            queryset = filtrar_por_especificaciones(queryset, self.request.GET)
+        except ValueError:
+            messages.warning(self.request, "Los filtros de RAM y almacenamiento deben ser números enteros en GB.")
+        try:
+            self.seleccion = seleccion_de(self.request.GET)
+        except ValueError:
+            messages.warning(self.request, "El tramo de RAM seleccionado no es válido.")
+            self.seleccion = {}
+        # Los conteos de facetas parten de la búsqueda y los rangos; cada faceta excluye su propio filtro
+        self.base_facetas = queryset
+        return filtrar_por_facetas(queryset, self.seleccion).select_related('id_donacion__rut_institucion')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tipos_almacenamiento'] = TIPOS_ALMACENAMIENTO
+        facetas = contar_facetas(self.base_facetas, self.seleccion, filtrado=bool(self.base_facetas.query.where))
+        for faceta in facetas:
+            for valor in faceta['valores']:
+                valor['enlace'] = enlace_alternado(self.request.GET, faceta['faceta'], valor['valor'])
+        context['facetas'] = facetas
+        return context
 
 @method_decorator(user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL), name='dispatch')
 class EquipoCreateView(SuccessMessageCreateView):
@@ -347,6 +522,12 @@ class EquipoCreateView(SuccessMessageCreateView):
     success_url = reverse_lazy('equipo-list')
     success_message = "¡Equipo creado exitosamente!"
 
+    def form_valid(self, form):
+        respuesta = super().form_valid(form)
+        # La foto se reduce y recomprime en la cola de tareas, no en la petición
+        encolar_optimizacion(self.object)
+        return respuesta
+
 @method_decorator(user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL), name='dispatch')
 class EquipoUpdateView(SuccessMessageUpdateView):
     model = Equipo
@@ -359,28 +540,30 @@ class EquipoUpdateView(SuccessMessageUpdateView):
             return EquipoTecnicoForm 
         return EquipoForm 
 
+    def form_valid(self, form):
+        respuesta = super().form_valid(form)
+        if 'imagen' in form.changed_data:
+            encolar_optimizacion(self.object)
+        return respuesta
+
 @method_decorator(user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL), name='dispatch')
-class EquipoDeleteView(DeleteView):
+class EquipoDeleteView(EliminacionEnCascadaMixin, DeleteView):
     model = Equipo
     success_url = reverse_lazy('equipo-list')
-
-    def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        try:
-            self.object.delete()
-            messages.success(request, f"El equipo '{self.object}' fue eliminado exitosamente.")
-            return redirect(self.success_url)
-        except IntegrityError:
-            messages.error(request, f"No se puede eliminar el equipo porque tiene registros asociados (Reacondicionamiento o Asignación).")
-            return redirect(self.success_url)
+    mensaje_exito = "El equipo '{objeto}' fue eliminado exitosamente."
+    mensaje_error = "No se puede eliminar el equipo porque tiene registros asociados."
 
 
 # --- CRUD para Asignaciones ---
 
 @method_decorator(user_passes_test(is_admin, login_url=LOGIN_URL), name='dispatch')
-class AsignacionListView(ListView):
+class AsignacionListView(AccionesMasivasMixin, ArchivadosMixin, ReferenciasMixin, ListView):
     model = Asignacion
+    relaciones_referencia = ['rut_institucion_receptora']
+    listado_masivo = 'asignacion'
     template_name = 'app1Backend/asignacion_list.html'
+    modelo_archivado = AsignacionArchivada
+    relaciones_archivado = ['rut_institucion_receptora']
 
     def get_queryset(self):
         query = self.request.GET.get('q')
@@ -410,27 +593,23 @@ class AsignacionUpdateView(SuccessMessageUpdateView):
     success_message = "¡Asignación modificada exitosamente!"
 
 @method_decorator(user_passes_test(is_admin, login_url=LOGIN_URL), name='dispatch')
-class AsignacionDeleteView(DeleteView):
+class AsignacionDeleteView(EliminacionEnCascadaMixin, DeleteView):
     model = Asignacion
     success_url = reverse_lazy('asignacion-list')
-
-    def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        try:
-            self.object.delete()
-            messages.success(request, f"La asignación '{self.object}' fue eliminada exitosamente.")
-            return redirect(self.success_url)
-        except IntegrityError:
-            messages.error(request, f"No se puede eliminar la asignación porque tiene detalles o soportes asociados.")
-            return redirect(self.success_url)
+    mensaje_exito = "La asignación '{objeto}' fue eliminada exitosamente."
+    mensaje_error = "No se puede eliminar la asignación porque tiene registros asociados."
 
 
 # --- CRUD para Reacondicionamientos ---
 
 @method_decorator(user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL), name='dispatch')
-class ReacondicionamientoListView(ListView):
+class ReacondicionamientoListView(AccionesMasivasMixin, ArchivadosMixin, ReferenciasMixin, ListView):
     model = Reacondicionamiento
+    relaciones_referencia = ['id_tecnico']
+    listado_masivo = 'reacondicionamiento'
     template_name = 'app1Backend/reacondicionamiento_list.html'
+    modelo_archivado = ReacondicionamientoArchivado
+    relaciones_archivado = ['id_equipo', 'id_tecnico']
 
     def get_queryset(self):
         query = self.request.GET.get('q')
@@ -463,6 +642,11 @@ class ReacondicionamientoUpdateView(SuccessMessageUpdateView):
             return ReacondicionamientoTecnicoForm
         return ReacondicionamientoForm
 
+    def form_valid(self, form):
+        # El primer avance guardado confirma el reclamo de la cola de trabajo
+        form.instance.fecha_reclamo = None
+        return super().form_valid(form)
+
 @method_decorator(user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL), name='dispatch')
 class ReacondicionamientoDeleteView(DeleteView):
     model = Reacondicionamiento
@@ -479,24 +663,223 @@ class ReacondicionamientoDeleteView(DeleteView):
             return redirect(self.success_url)
 
 
+# --- Acciones masivas de los listados ---
+
+@user_passes_test(is_admin, login_url=LOGIN_URL)
+def accion_masiva(request, listado):
+    """
+    Aplica la acción elegida a las filas marcadas del listado (Donaciones,
+    Asignaciones o Reacondicionamientos) con un solo UPDATE validado.
+    """
+    if listado not in ACCIONES_LISTADO:
+        raise Http404("Listado sin acciones masivas")
+    if request.method != 'POST':
+        return redirect(f'{listado}-list')
+
+    try:
+        ids = [int(valor) for valor in request.POST.getlist('seleccion')]
+    except ValueError:
+        messages.error(request, "La selección enviada no es válida.")
+        return redirect(f'{listado}-list')
+    if not ids:
+        messages.warning(request, "No se seleccionó ningún registro.")
+        return redirect(f'{listado}-list')
+    try:
+        resultado = aplicar_accion_masiva(
+            listado, request.POST.get('accion', ''), ids, request.POST.get('tecnico'), request.user,
+        )
+    except ValidationError as error:
+        messages.error(request, error.messages[0])
+        return redirect(f'{listado}-list')
+
+    if resultado.actualizados:
+        messages.success(request, resumen_accion_masiva(resultado))
+    else:
+        messages.warning(request, resumen_accion_masiva(resultado))
+    return redirect(f'{listado}-list')
+
+
+# --- Cola de trabajo de Reacondicionamiento ---
+
+@user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL)
+def cola_trabajo(request):
+    """Muestra los equipos pendientes y los reclamos sin avances del usuario."""
+    context = {
+        'total_pendientes': equipos_pendientes().count(),
+        'mis_reclamos': Reacondicionamiento.objects.select_related('id_equipo').filter(
+            id_tecnico=request.user, fecha_reclamo__isnull=False
+        ).order_by('fecha_reclamo'),
+    }
+    return render(request, 'app1Backend/cola_trabajo.html', context)
+
+@user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL)
+def cola_reclamar(request):
+    """Asigna de forma atómica el equipo pendiente más antiguo al usuario."""
+    if request.method != 'POST':
+        return redirect('cola-trabajo')
+
+    reacondicionamiento = reclamar_siguiente(request.user)
+    if reacondicionamiento is None:
+        messages.warning(request, "No hay equipos pendientes de reacondicionamiento en este momento.")
+        return redirect('cola-trabajo')
+
+    messages.success(request, f"Se te asignó el equipo '{reacondicionamiento.id_equipo}'.")
+    return redirect('reacondicionamiento-update', pk=reacondicionamiento.pk)
+
+
+# --- Descargas que se envían a medida que se generan ---
+
+def _en_flujo(request, partes):
+    """
+    Contenido para StreamingHttpResponse desde un iterador síncrono. Con ASGI
+    (uvicorn) se entrega asíncrono: Django consumiría uno síncrono completo
+    (sync_to_async(list)) antes de enviar el primer byte. Con WSGI, tal cual.
+    """
+    return _partes_asincronas(partes) if isinstance(request, ASGIRequest) else partes
+
+async def _partes_asincronas(partes):
+    # Cada parte se genera en el hilo síncrono de la petición (consultas, almacenamiento)
+    partes = iter(partes)
+    siguiente = sync_to_async(next)
+    try:
+        while (parte := await siguiente(partes, None)) is not None:
+            yield parte
+    finally:
+        # Cliente desconectado o fin: el generador libera su pool, archivos y cursor
+        if hasattr(partes, 'close'):
+            await sync_to_async(partes.close)()
+
+
+# --- Etiquetas con código de barras de los equipos ---
+
+@user_passes_test(is_admin, login_url=LOGIN_URL)
+def etiquetas_donacion(request, pk):
+    """PDF con las etiquetas de los equipos de la donación, enviado a medida que se dibuja."""
+    donacion = get_object_or_404(Donacion, pk=pk)
+    datos = etiquetas.etiquetas_de(Equipo.objects.filter(id_donacion=donacion))
+    if not datos:
+        messages.warning(request, f"La donación #{donacion.pk} aún no tiene equipos registrados.")
+        return redirect('donacion-list')
+    respuesta = StreamingHttpResponse(
+        _en_flujo(request, etiquetas.pdf(etiquetas.paginas(datos, 'pdf', etiquetas.pool()))),
+        content_type='application/pdf',
+    )
+    respuesta['Content-Disposition'] = f'inline; filename="etiquetas-donacion-{donacion.pk}.pdf"'
+    return respuesta
+
+@user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL)
+def equipo_codigo(request):
+    """Abre el equipo del código escaneado (EQ-<id> de la etiqueta o número de serie)."""
+    codigo = request.GET.get('codigo', '').strip()
+    if codigo:
+        equipo = etiquetas.equipo_de_codigo(codigo)
+        if equipo is not None:
+            return redirect('equipo-update', pk=equipo.pk)
+        messages.error(request, f"No hay un equipo con el código '{codigo}'.")
+    return render(request, 'app1Backend/equipo_codigo.html', {'codigo': codigo})
+
+
+# --- Certificados de entrega de las asignaciones ---
+
+def _periodo(datos):
+    # (desde, hasta) de los parámetros; por defecto, el mes en curso. ValueError si no son fechas
+    hoy = timezone.localdate()
+    desde = datos.get('desde') or hoy.replace(day=1).isoformat()
+    hasta = datos.get('hasta') or hoy.isoformat()
+    return datetime.date.fromisoformat(desde), datetime.date.fromisoformat(hasta)
+
+@user_passes_test(is_admin, login_url=LOGIN_URL)
+def certificados_entrega(request):
+    """Genera en segundo plano los certificados de un período y muestra cuántos hay."""
+    datos = request.POST if request.method == 'POST' else request.GET
+    try:
+        desde, hasta = _periodo(datos)
+    except ValueError:
+        messages.error(request, "Las fechas del período no son válidas.")
+        desde, hasta = _periodo({})
+    if request.method == 'POST':
+        encoladas = certificados.encolar_periodo(desde, hasta, regenerar='regenerar' in request.POST)
+        if encoladas:
+            messages.success(request, f"Se están generando {encoladas} certificado(s) en segundo plano.")
+        else:
+            messages.info(request, "No hay certificados pendientes en el período.")
+        return redirect(f"{reverse('certificados-entrega')}?desde={desde:%Y-%m-%d}&hasta={hasta:%Y-%m-%d}")
+    context = {
+        'desde': desde,
+        'hasta': hasta,
+        'total_entregadas': certificados.entregadas(desde, hasta).count(),
+        'total_certificados': certificados.del_periodo(desde, hasta).count(),
+    }
+    return render(request, 'app1Backend/certificados_entrega.html', context)
+
+@user_passes_test(is_admin, login_url=LOGIN_URL)
+def certificados_zip(request):
+    """ZIP con los certificados del período, enviado a medida que se comprime."""
+    try:
+        desde, hasta = _periodo(request.GET)
+    except ValueError:
+        messages.error(request, "Las fechas del período no son válidas.")
+        return redirect('certificados-entrega')
+    periodo = certificados.del_periodo(desde, hasta).order_by('fecha_entrega', 'id_asignacion')
+    if not periodo.exists():
+        messages.warning(request, "No hay certificados generados en el período.")
+        return redirect(f"{reverse('certificados-entrega')}?desde={desde:%Y-%m-%d}&hasta={hasta:%Y-%m-%d}")
+    respuesta = StreamingHttpResponse(
+        _en_flujo(request, certificados.zip_certificados(periodo.iterator())), content_type='application/zip',
+    )
+    respuesta['Content-Disposition'] = f'attachment; filename="certificados-{desde:%Y%m%d}-{hasta:%Y%m%d}.zip"'
+    return respuesta
+
+@user_passes_test(is_admin, login_url=LOGIN_URL)
+def certificado_verificar(request):
+    """Comprueba el código de verificación impreso en un certificado de entrega."""
+    id_asignacion = request.GET.get('asignacion', '').strip()
+    codigo = request.GET.get('codigo', '').strip()
+    context = {'asignacion': id_asignacion, 'codigo': codigo, 'consultado': bool(id_asignacion and codigo)}
+    if context['consultado']:
+        try:
+            context['certificado'], context['vigente'] = certificados.verificar_codigo(int(id_asignacion), codigo)
+        except ValueError:
+            messages.error(request, "El número de asignación no es válido.")
+            context['consultado'] = False
+    return render(request, 'app1Backend/certificado_verificar.html', context)
+
+
+# =========================================================
+# EVENTOS EN VIVO (SERVER-SENT EVENTS)
+# =========================================================
+
+@login_required(login_url=LOGIN_URL)
+def eventos(request):
+    """
+    El flujo SSE lo atiende app1Backend.sse.AppEventos, montada en la app ASGI
+    (proyectoBackend/asgi.py), antes de llegar aquí. Esta vista solo responde
+    cuando se sirve con WSGI: 204 le indica al navegador que no reintente.
+    """
+    return HttpResponse(status=204)
+
+
 # --- CRUD para Soportes ---
 
 @method_decorator(user_passes_test(is_admin_or_tecnico, login_url=LOGIN_URL), name='dispatch')
-class SoporteListView(ListView):
+class SoporteListView(ArchivadosMixin, ReferenciasMixin, ListView):
     model = Soporte
+    relaciones_referencia = ['id_tecnico', 'id_asignacion__rut_institucion_receptora']
     template_name = 'app1Backend/soporte_list.html'
+    modelo_archivado = SoporteArchivado
+    relaciones_archivado = ['rut_institucion_receptora', 'id_tecnico']
 
     def get_queryset(self):
         query = self.request.GET.get('q')
         if query:
             # Busca por ID de Soporte, Descripción O Nombre del Técnico
-            return Soporte.objects.filter(
+            return Soporte.objects.select_related('id_asignacion').filter(
                 Q(id_soporte__icontains=query) | # Busca por ID numérico
                 Q(descripcion__icontains=query) |
                 Q(id_tecnico__nombre__icontains=query) |
                 Q(id_asignacion__id_asignacion__icontains=query)
             )
-        return Soporte.objects.all()
+        return Soporte.objects.select_related('id_asignacion')
 
 @method_decorator(user_passes_test(is_soporte_access, login_url=LOGIN_URL), name='dispatch')
 class SoporteCreateView(SuccessMessageCreateView):
@@ -532,10 +915,14 @@ class SoporteUpdateView(SuccessMessageUpdateView):
         return SoporteForm
     
     def form_valid(self, form):
+        # La primera edición del equipo técnico cuenta como primera respuesta (SLA)
+        if form.has_changed():
+            form.instance.registrar_respuesta()
         response = super().form_valid(form)
         
-        # Notificar a la institución sobre la actualización/resolución
-        notificar_resolucion_soporte(self.object)
+        # Notificar a la institución sobre la actualización/resolución.
+        # Las ediciones se acumulan y se envía un solo resumen por ventana.
+        registrar_actualizacion_soporte(self.object)
         
         return response
 
@@ -0,0 +1,85 @@
+"""
+Volcado periódico a archivo de lo que un módulo acumula en memoria.
+
+Lo usan metricas.py (totales del proceso, reemplazando su archivo) y
+trazas.py (spans pendientes, agregados como una línea). Cada uno decide qué
+toma y cómo lo escribe; aquí está lo común:
+
+- Un solo temporizador pendiente: lo que se acumula durante el intervalo se
+  vuelca junto.
+- Las escrituras de un proceso se serializan (el temporizador, un volcado
+  forzado y la salida del proceso pueden coincidir).
+- Un proceso creado con fork (ej: gunicorn --preload) empieza vacío y sin el
+  temporizador del padre; al terminar, el proceso vuelca lo pendiente.
+- Un error de escritura solo se informa: el volcado nunca debe cortar una
+  petición ni una tarea.
+"""
+import atexit
+import os
+import threading
+
+
+class VolcadoPeriodico:
+    """
+    `tomar()` retorna lo que hay que escribir (None si no hay nada),
+    `escribir(datos)` lo escribe y `reiniciar()` vacía lo acumulado (en el
+    hijo tras un fork). `intervalo()` retorna los segundos hasta el volcado.
+    """
+
+    def __init__(self, descripcion, intervalo, tomar, escribir, reiniciar):
+        self.descripcion = descripcion
+        self._intervalo = intervalo
+        self._tomar = tomar
+        self._escribir = escribir
+        self._reiniciar = reiniciar
+        self._lock = threading.Lock()
+        self._lock_archivo = threading.Lock()
+        self._temporizador = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reiniciar_en_hijo)
+        atexit.register(self.volcar)
+
+    def programar(self):
+        """Arma el temporizador si no hay uno pendiente."""
+        with self._lock:
+            if self._temporizador is None:
+                self._temporizador = threading.Timer(self._intervalo(), self.volcar)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def volcar(self):
+        """Escribe ahora lo acumulado."""
+        with self._lock:
+            self._temporizador = None
+        datos = self._tomar()
+        if datos is None:
+            return
+        try:
+            with self._lock_archivo:
+                self._escribir(datos)
+        except OSError as e:
+            print(f"Error guardando {self.descripcion}: {e}")
+
+    def _reiniciar_en_hijo(self):
+        # Los locks también: otro hilo del padre pudo quedar dentro al hacer fork
+        self._lock = threading.Lock()
+        self._lock_archivo = threading.Lock()
+        self._temporizador = None
+        self._reiniciar()
+
+
+def reemplazar_archivo(ruta, texto):
+    """Escribe `texto` en `ruta` de forma atómica (temporal + os.replace)."""
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    temporal = f'{ruta}.tmp'
+    with open(temporal, 'w') as archivo:
+        archivo.write(texto)
+    os.replace(temporal, ruta)
+
+def agregar_linea(ruta, linea):
+    """Agrega `linea` a `ruta` en un solo write() con O_APPEND: las líneas de varios procesos no se mezclan."""
+    descriptor = os.open(ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(descriptor, (linea + '\n').encode())
+    finally:
+        os.close(descriptor)
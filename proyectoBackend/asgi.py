@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'proyectoBackend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# El flujo de eventos en vivo (/eventos/) se atiende fuera del manejador de Django
+# para que cada conexión inactiva no retenga un hilo (ver app1Backend/sse.py)
+from app1Backend.sse import AppEventos  # noqa: E402  (requiere Django ya inicializado)
+
+application = AppEventos(django_application)
@@ -11,13 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from django.contrib.messages import constants as messages
 from decouple import config
 
-import pymysql # borrar si se migra
-pymysql.install_as_MySQLdb()# borrar si se migra
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,31 +41,53 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     
-    # --- CLOUDINARY APPS ---
-    'cloudinary_storage',
     'django.contrib.staticfiles',
-    'cloudinary',
-    
+
+    # 'cloudinary' y 'cloudinary_storage' NO se registran como apps: el proyecto no usa
+    # sus template tags ni comandos, y registrarlas importaba el SDK de Cloudinary
+    # (urllib3, certifi...) en cada arranque y al primer render. El backend de STORAGES
+    # funciona igual y carga el SDK recién cuando se sube o lee un archivo media.
+
     # --- MIS APPS ---
     'app1Backend',
     'rest_framework',
 ]
 
 MIDDLEWARE = [
+    # Métricas por vista para /metricas/ (va primero: mide la petición completa)
+    'app1Backend.middleware.MetricasMiddleware',
+    # Span raíz de la traza de cada petición (ver app1Backend/trazas.py)
+    'app1Backend.middleware.TrazasMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Sirve los estáticos (precomprimidos gzip/brotli, con Cache-Control immutable si tienen hash)
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Compresión brotli/gzip de HTML y JSON (va arriba: actúa sobre la respuesta final)
+    'app1Backend.middleware.CompresionMiddleware',
+    # ETag + 304 Not Modified cuando el navegador revalida una página sin cambios
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Cache-Control private/no-cache y Vary para el contenido autenticado
+    'app1Backend.middleware.PoliticaCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Auditoría: escribe el historial de cambios de la petición en un solo INSERT
+    'app1Backend.middleware.AuditoriaMiddleware',
+    # Perfil de memoria de una fracción de las peticiones (MEMORIA_MUESTREO, desactivado por defecto)
+    'app1Backend.middleware.MemoriaMiddleware',
+    # Span de la vista (va último: envuelve solo la resolución, la vista y su render)
+    'app1Backend.middleware.TrazaVistaMiddleware',
 ]
 
 ROOT_URLCONF = 'proyectoBackend.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates con medición del tiempo de renderizado (ver app1Backend/plantillas.py)
+        'BACKEND': 'app1Backend.plantillas.DjangoTemplatesMedidos',
+        'NAME': 'django',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -91,6 +111,10 @@ DB_ENGINE = config('DB_ENGINE', default='django.db.backends.mysql')
 DB_OPTIONS = {}
 
 if 'mysql' in DB_ENGINE:
+    # PyMySQL solo se carga si la base es MySQL (borrar si se migra)
+    import pymysql
+    pymysql.install_as_MySQLdb()
+
     DB_OPTIONS = {
         'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
     }
@@ -146,6 +170,13 @@ STATIC_URL = 'static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# Carpeta donde `collectstatic` deja los archivos con hash y sus versiones .gz/.br
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Si un archivo no está en el manifiesto (ej: falta correr collectstatic) se usa
+# su nombre sin hash en lugar de lanzar un error.
+WHITENOISE_MANIFEST_STRICT = False
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -163,12 +194,20 @@ CLOUDINARY_STORAGE = {
 # Configuración moderna de almacenamiento (Django 4.2+)
 STORAGES = {
     # Archivos subidos por usuarios (Media) -> Cloudinary
+    # (envuelto para registrar cada operación en las trazas, ver app1Backend/trazas.py)
     "default": {
-        "BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage",
+        "BACKEND": "app1Backend.trazas.AlmacenamientoTrazado",
+        "OPTIONS": {"backend": "cloudinary_storage.storage.MediaCloudinaryStorage"},
     },
-    # Archivos estáticos (CSS/JS) -> Local (Django por defecto)
+    # Certificados de entrega (HTML, ver app1Backend/certificados.py) -> Cloudinary como archivos 'raw'
+    "certificados": {
+        "BACKEND": "app1Backend.trazas.AlmacenamientoTrazado",
+        "OPTIONS": {"backend": "cloudinary_storage.storage.RawMediaCloudinaryStorage"},
+    },
+    # Archivos estáticos (CSS/JS) -> Local, con hash en el nombre (manifiesto)
+    # y precomprimidos en gzip y brotli al ejecutar collectstatic (WhiteNoise)
     "staticfiles": {
-        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
 }
 
@@ -217,4 +256,121 @@ EMAIL_PORT = config('EMAIL_PORT', cast=int)
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
-DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
\ No newline at end of file
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
+
+# Ventana (en segundos) durante la cual se acumulan las actualizaciones de un
+# ticket de soporte antes de enviar un único correo resumen a la institución
+# (una tarea por institución en la cola, ver app1Backend/notificaciones.py).
+NOTIFICACION_SOPORTE_VENTANA = config('NOTIFICACION_SOPORTE_VENTANA', default=300, cast=int)
+
+# Plazo (horas) para resolver un ticket de soporte según su tipo. El comando
+# `revisar_sla` marca y notifica los tickets abiertos que lo superan.
+SOPORTE_SLA_HORAS = {
+    'Tecnico': config('SLA_TECNICO_HORAS', default=48, cast=int),
+    'Funcional': config('SLA_FUNCIONAL_HORAS', default=72, cast=int),
+    'Logistico': config('SLA_LOGISTICO_HORAS', default=120, cast=int),
+}
+SOPORTE_SLA_HORAS_POR_DEFECTO = config('SLA_HORAS_POR_DEFECTO', default=72, cast=int)
+
+# Horas que puede permanecer un equipo reclamado desde la cola de trabajo sin
+# registrar avances antes de ser liberado (comando `liberar_reclamos`).
+COLA_RECLAMO_HORAS = config('COLA_RECLAMO_HORAS', default=24, cast=int)
+
+# Días que se conservan en el feed de cambios de la API (comando `purgar_cambios`).
+# Los sistemas que sincronicen con menos frecuencia deberán resincronizar completo.
+CAMBIOS_DIAS_RETENCION = config('CAMBIOS_DIAS_RETENCION', default=90, cast=int)
+
+# Días desde el cierre tras los cuales soportes resueltos, asignaciones entregadas
+# y reacondicionamientos terminados pasan a las tablas de archivo (`archivar_registros`).
+ARCHIVO_DIAS = config('ARCHIVO_DIAS', default=365, cast=int)
+
+# Cola de tareas en segundo plano (ver app1Backend/tareas.py). Las ejecuta
+# `python manage.py runworker`; con TAREAS_EN_LINEA=True se ejecutan en el mismo
+# proceso al confirmar la transacción (desarrollo sin worker). Si runworker no
+# está corriendo, los correos se envían en un hilo del proceso web y se avisa en la consola.
+TAREAS_EN_LINEA = config('TAREAS_EN_LINEA', default=False, cast=bool)
+TAREAS_CONCURRENCIA = config('TAREAS_CONCURRENCIA', default=4, cast=int)
+# Espera antes del primer reintento; se duplica en cada intento fallido
+TAREAS_REINTENTO_SEGUNDOS = config('TAREAS_REINTENTO_SEGUNDOS', default=30, cast=int)
+# Una tarea 'En Curso' por más de este tiempo se considera abandonada y vuelve a la cola
+TAREAS_TIEMPO_MAXIMO = config('TAREAS_TIEMPO_MAXIMO', default=600, cast=int)
+TAREAS_DIAS_RETENCION = config('TAREAS_DIAS_RETENCION', default=7, cast=int)
+
+# Eliminaciones en cascada (ej: una donación con sus equipos) que afectan más filas
+# que esto se hacen en la cola de tareas en vez de en la petición
+ELIMINACION_SEGUNDO_PLANO_FILAS = config('ELIMINACION_SEGUNDO_PLANO_FILAS', default=2000, cast=int)
+
+# Lado mayor (px) al que se reducen las fotos de equipos en segundo plano
+EQUIPO_IMAGEN_LADO_MAXIMO = config('EQUIPO_IMAGEN_LADO_MAXIMO', default=1600, cast=int)
+
+# Procesos que dibujan las hojas de etiquetas de los equipos (app1Backend/etiquetas.py),
+# por proceso web. 0 = se dibujan en el hilo de la petición
+ETIQUETAS_PROCESOS = config('ETIQUETAS_PROCESOS', default=2, cast=int)
+
+# Caché de Django. Guarda el índice de facetas, las respuestas de la API y sus
+# contadores de generación (app1Backend/cache_api.py) y el dashboard. Dos niveles
+# (app1Backend/cache_niveles.py): un LRU de CACHE_LOCAL_ENTRADAS entradas en cada
+# proceso, que puede ir hasta CACHE_LOCAL_SEGUNDOS atrasado, delante de la caché
+# 'compartida' por todos los procesos (workers web + runworker). Por defecto es un
+# directorio local; con varios servidores, usar Redis o Memcached, ej:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
+    'default': {
+        'BACKEND': 'app1Backend.cache_niveles.CacheEnNiveles',
+        'LOCATION': 'local',
+        'OPTIONS': {
+            'COMPARTIDA': 'compartida',
+            'MAX_ENTRIES': config('CACHE_LOCAL_ENTRADAS', default=500, cast=int),
+            'SEGUNDOS_LOCAL': config('CACHE_LOCAL_SEGUNDOS', default=5, cast=float),
+        },
+    },
+    'compartida': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'reconectatec_cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRADAS', default=5000, cast=int),
+        },
+    },
+}
+# Tamaño máximo (bytes) de una respuesta de la API para guardarla en la caché
+CACHE_API_MAX_BYTES = config('CACHE_API_MAX_BYTES', default=2 * 1024 * 1024, cast=int)
+# El dashboard se recalcula cada DASHBOARD_CACHE_SEGUNDOS; durante DASHBOARD_CACHE_GRACIA
+# segundos más, mientras una petición lo recalcula, las demás reciben el anterior
+DASHBOARD_CACHE_SEGUNDOS = config('DASHBOARD_CACHE_SEGUNDOS', default=60, cast=int)
+DASHBOARD_CACHE_GRACIA = config('DASHBOARD_CACHE_GRACIA', default=300, cast=int)
+
+# Métricas en formato Prometheus (/metricas/, ver app1Backend/metricas.py). Cada proceso
+# vuelca sus totales cada METRICAS_INTERVALO segundos a un archivo en METRICAS_DIRECTORIO,
+# que deben compartir todos los procesos del servidor (y conviene vaciar al desplegar).
+# Prometheus se autentica con 'Authorization: Bearer <METRICAS_TOKEN>'; sin token solo
+# pueden verlas los administradores con sesión iniciada.
+METRICAS_DIRECTORIO = config('METRICAS_DIRECTORIO', default=os.path.join(tempfile.gettempdir(), 'reconectatec_metricas'))
+METRICAS_INTERVALO = config('METRICAS_INTERVALO', default=5, cast=float)
+METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+
+# Trazas de las peticiones y tareas (ver app1Backend/trazas.py). Los spans se agregan en
+# formato OTLP/JSON (una línea por volcado) a TRAZAS_ARCHIVO; vacío = desactivadas.
+# TRAZAS_MUESTREO es la fracción de trazas que se registran (0 a 1) y TRAZAS_MAX_SPANS
+# el máximo de spans por traza. Con TRAZAS_CONFIAR_TRACEPARENT=True se continúa la traza
+# del encabezado 'traceparent' entrante (solo detrás de un gateway que lo controle).
+TRAZAS_ARCHIVO = config('TRAZAS_ARCHIVO', default='')
+TRAZAS_MUESTREO = config('TRAZAS_MUESTREO', default=1.0, cast=float)
+TRAZAS_MAX_SPANS = config('TRAZAS_MAX_SPANS', default=1000, cast=int)
+TRAZAS_CONFIAR_TRACEPARENT = config('TRAZAS_CONFIAR_TRACEPARENT', default=False, cast=bool)
+
+# Perfil de memoria con tracemalloc (ver app1Backend/memoria.py). MEMORIA_MUESTREO es la
+# fracción de peticiones perfiladas (0 = desactivado). Las que superan MEMORIA_PRESUPUESTO_MB
+# de pico se escriben en el log con las MEMORIA_TOP rutas de código que más memoria retienen.
+# tracemalloc hace la petición perfilada varias veces más lenta, tanto más cuantos más
+# frames por asignación guarde (MEMORIA_PROFUNDIDAD): conviene un muestreo bajo (ej: 0.01).
+# tracemalloc es global al proceso: solo se perfila con workers WSGI de un hilo (ej:
+# gunicorn sync). Con hilos (runserver, gthread) o ASGI se ignora y se avisa en la consola;
+# ahí usar `python manage.py perfil_memoria`.
+MEMORIA_MUESTREO = config('MEMORIA_MUESTREO', default=0.0, cast=float)
+MEMORIA_PRESUPUESTO_MB = config('MEMORIA_PRESUPUESTO_MB', default=50, cast=int)
+MEMORIA_TOP = config('MEMORIA_TOP', default=10, cast=int)
+MEMORIA_PROFUNDIDAD = config('MEMORIA_PROFUNDIDAD', default=10, cast=int)
+
+# Presupuesto (ms) para el arranque de Django; `python manage.py perfil_arranque`
+# falla si la mediana lo supera. Sirve como chequeo de regresión en CI.
+ARRANQUE_PRESUPUESTO_MS = config('ARRANQUE_PRESUPUESTO_MS', default=300, cast=int)
@@ -28,21 +28,10 @@ Este archivo enruta las URLs a las vistas correspondientes definidas
 en la aplicación app1Backend.
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import include, path
 from django.contrib.auth import views as auth_views
 from app1Backend import views
-from rest_framework.routers import DefaultRouter
-from app1Backend import api_views
-
-# Configuración del Router de la API
-router = DefaultRouter()
-router.register(r'instituciones', api_views.InstitucionViewSet)
-router.register(r'usuarios', api_views.UsuarioViewSet)
-router.register(r'donaciones', api_views.DonacionViewSet)
-router.register(r'equipos', api_views.EquipoViewSet)
-router.register(r'asignaciones', api_views.AsignacionViewSet)
-router.register(r'reacondicionamientos', api_views.ReacondicionamientoViewSet)
-router.register(r'soportes', api_views.SoporteViewSet)
+
 
 urlpatterns = [
     # ----------------------------------------------------
@@ -65,6 +54,15 @@ urlpatterns = [
     # El dashboard de admin ahora vive en /dashboard/
     path('dashboard/', views.dashboard, name='dashboard'), # cambioo
 
+    # Estadísticas (leen solo las tablas de resumen diario)
+    path('estadisticas/', views.estadisticas, name='estadisticas'),
+
+    # Métricas para Prometheus (token METRICAS_TOKEN o sesión de administrador)
+    path('metricas/', views.metricas, name='metricas'),
+
+    # Historial de cambios (auditoría) de Equipo, Donación y Soporte
+    path('historial/<str:modelo>/<str:pk>/', views.historial, name='historial'),
+
     # ----------------------------------------------------
     # 3. RUTAS CRUD (INSTITUCION) - PK es CharField (RUT) -> Usar <str:pk>
     # ----------------------------------------------------
@@ -91,6 +89,7 @@ urlpatterns = [
     path('donaciones/crear/', views.DonacionCreateView.as_view(), name='donacion-create'),
     path('donaciones/modificar/<int:pk>/', views.DonacionUpdateView.as_view(), name='donacion-update'),
     path('donaciones/eliminar/<int:pk>/', views.DonacionDeleteView.as_view(), name='donacion-delete'),
+    path('donaciones/etiquetas/<int:pk>/', views.etiquetas_donacion, name='donacion-etiquetas'),
 
     # ----------------------------------------------------
     # 6. RUTAS CRUD (EQUIPO) - PK es AutoField -> Usar <int:pk>
@@ -99,6 +98,7 @@ urlpatterns = [
     path('equipos/crear/', views.EquipoCreateView.as_view(), name='equipo-create'),
     path('equipos/modificar/<int:pk>/', views.EquipoUpdateView.as_view(), name='equipo-update'),
     path('equipos/eliminar/<int:pk>/', views.EquipoDeleteView.as_view(), name='equipo-delete'),
+    path('equipos/codigo/', views.equipo_codigo, name='equipo-codigo'),
 
     # ----------------------------------------------------
     # 7. RUTAS CRUD (ASIGNACION) - PK es AutoField -> Usar <int:pk>
@@ -107,6 +107,9 @@ urlpatterns = [
     path('asignaciones/crear/', views.AsignacionCreateView.as_view(), name='asignacion-create'),
     path('asignaciones/modificar/<int:pk>/', views.AsignacionUpdateView.as_view(), name='asignacion-update'),
     path('asignaciones/eliminar/<int:pk>/', views.AsignacionDeleteView.as_view(), name='asignacion-delete'),
+    path('asignaciones/certificados/', views.certificados_entrega, name='certificados-entrega'),
+    path('asignaciones/certificados/zip/', views.certificados_zip, name='certificados-zip'),
+    path('asignaciones/certificados/verificar/', views.certificado_verificar, name='certificado-verificar'),
 
     # ----------------------------------------------------
     # 8. RUTAS CRUD (REACONDICIONAMIENTO) - PK es AutoField -> Usar <int:pk>
@@ -116,6 +119,16 @@ urlpatterns = [
     path('reacondicionamientos/modificar/<int:pk>/', views.ReacondicionamientoUpdateView.as_view(), name='reacondicionamiento-update'),
     path('reacondicionamientos/eliminar/<int:pk>/', views.ReacondicionamientoDeleteView.as_view(), name='reacondicionamiento-delete'),
 
+    # Acciones masivas sobre las filas marcadas de un listado (donacion, asignacion, reacondicionamiento)
+    path('acciones-masivas/<str:listado>/', views.accion_masiva, name='accion-masiva'),
+
+    # Cola de trabajo: "Tomar siguiente" asigna el equipo pendiente más antiguo
+    path('reacondicionamientos/cola/', views.cola_trabajo, name='cola-trabajo'),
+    path('reacondicionamientos/cola/reclamar/', views.cola_reclamar, name='cola-reclamar'),
+
+    # Eventos en vivo (SSE) para los listados; requiere servir con la app ASGI
+    path('eventos/', views.eventos, name='eventos'),
+
     # ----------------------------------------------------
     # 9. RUTAS CRUD (SOPORTE) - PK es AutoField -> Usar <int:pk>
     # ----------------------------------------------------
@@ -124,6 +137,6 @@ urlpatterns = [
     path('soportes/modificar/<int:pk>/', views.SoporteUpdateView.as_view(), name='soporte-update'),
     path('soportes/eliminar/<int:pk>/', views.SoporteDeleteView.as_view(), name='soporte-delete'),
 
-    # --- RUTA PARA LA API ---
-    path('api/', include((router.urls, 'api'), namespace='api')),
+    # --- RUTA PARA LA API --- (rutas en app1Backend/api_urls.py, namespace 'api')
+    path('api/', include('app1Backend.api_urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,33 @@
+// Casillas de selección para las acciones masivas de los listados (_acciones_masivas.html).
+// Usa delegación de eventos: las filas pueden reemplazarse en vivo (eventos_vivo.js).
+document.addEventListener('DOMContentLoaded', function () {
+    const formulario = document.getElementById('accionMasiva');
+    if (!formulario) {
+        return;
+    }
+    const boton = formulario.querySelector('[data-acciones-aplicar]');
+    const cantidad = formulario.querySelector('[data-acciones-cantidad]');
+    const todas = document.querySelector('[data-seleccionar-todo]');
+
+    function casillas() {
+        return document.querySelectorAll('input[name="seleccion"][form="accionMasiva"]');
+    }
+
+    function actualizar() {
+        const marcadas = Array.from(casillas()).filter(function (casilla) { return casilla.checked; }).length;
+        cantidad.textContent = marcadas;
+        boton.disabled = marcadas === 0;
+    }
+
+    if (todas) {
+        todas.addEventListener('change', function () {
+            casillas().forEach(function (casilla) { casilla.checked = todas.checked; });
+            actualizar();
+        });
+    }
+    document.addEventListener('change', function (evento) {
+        if (evento.target.matches('input[name="seleccion"][form="accionMasiva"]')) {
+            actualizar();
+        }
+    });
+});
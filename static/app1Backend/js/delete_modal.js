@@ -36,6 +36,27 @@ document.addEventListener('DOMContentLoaded', function () {
             // Actualizamos el atributo 'action' del formulario con la URL de eliminación.
             // Esto asegura que cuando se presione "Sí, eliminar", la solicitud se envíe al lugar correcto.
             deleteForm.action = deleteUrl;
+
+            // Si el botón indica 'data-bs-impacto-url', mostramos lo que arrastra la eliminación
+            // (equipos, reacondicionamientos, etc.) antes de confirmar. Si algún registro
+            // la impide, se deshabilita el botón de confirmar.
+            const impacto = deleteModal.querySelector('.modal-body-impacto');
+            const botonConfirmar = deleteModal.querySelector('#deleteSubmit');
+            impacto.innerHTML = '';
+            botonConfirmar.disabled = false;
+            const impactoUrl = button.getAttribute('data-bs-impacto-url');
+            if (impactoUrl) {
+                impacto.textContent = 'Calculando registros asociados...';
+                fetch(impactoUrl, { credentials: 'same-origin' })
+                    .then(function (respuesta) { return respuesta.ok ? respuesta.text() : ''; })
+                    .then(function (html) {
+                        impacto.innerHTML = html;
+                        if (impacto.querySelector('[data-bloqueada]')) {
+                            botonConfirmar.disabled = true;
+                        }
+                    })
+                    .catch(function () { impacto.innerHTML = ''; });
+            }
         });
     }
 });
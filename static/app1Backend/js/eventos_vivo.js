@@ -0,0 +1,60 @@
+// Actualización en vivo de los listados (Soporte, Asignación, Reacondicionamiento).
+// Se conecta al flujo de eventos del servidor (Server-Sent Events) y reemplaza,
+// agrega o quita la fila afectada, en lugar de recargar el listado completo.
+
+document.addEventListener('DOMContentLoaded', function () {
+
+    // El <tbody> del listado indica qué modelo escuchar y el rol del usuario.
+    const cuerpo = document.querySelector('tbody[data-eventos]');
+    if (!cuerpo || !window.EventSource) {
+        return;
+    }
+
+    const modelo = cuerpo.dataset.eventos;
+    const rol = cuerpo.dataset.rol;
+    // Con una búsqueda activa no se agregan filas nuevas (podrían no coincidir con el filtro).
+    const filtrado = cuerpo.hasAttribute('data-filtrado');
+
+    // EventSource se reconecta solo y envía Last-Event-ID para recibir lo pendiente.
+    // Si el servidor responde 204 (sin soporte de eventos), deja de intentarlo.
+    const fuente = new EventSource(cuerpo.dataset.eventosUrl);
+
+    function resaltar(fila) {
+        fila.classList.add('table-warning');
+        setTimeout(function () { fila.classList.remove('table-warning'); }, 3000);
+    }
+
+    fuente.addEventListener(modelo, function (event) {
+        const evento = JSON.parse(event.data);
+        const actual = cuerpo.querySelector('tr[data-fila="' + CSS.escape(String(evento.id)) + '"]');
+
+        if (evento.accion === 'eliminado') {
+            if (actual) {
+                actual.remove();
+            }
+            return;
+        }
+
+        // La fila llega ya renderizada por el servidor, una versión por rol.
+        const html = evento.filas[rol];
+        if (!html) {
+            return;
+        }
+        const plantilla = document.createElement('template');
+        plantilla.innerHTML = html.trim();
+        const nueva = plantilla.content.firstElementChild;
+
+        if (actual) {
+            actual.replaceWith(nueva);
+        } else if (!filtrado) {
+            const vacio = cuerpo.querySelector('tr[data-vacio]');
+            if (vacio) {
+                vacio.remove();
+            }
+            cuerpo.appendChild(nueva);
+        } else {
+            return;
+        }
+        resaltar(nueva);
+    });
+});